@@ -1,6 +1,7 @@
 // Production Hero Customer Discovery Actor
 import { Actor } from 'apify';
 import { CheerioCrawler, log } from 'crawlee';
+import { createHash } from 'crypto';
 
 await Actor.init();
 
@@ -15,7 +16,8 @@ try {
         searchDepth = 3,
         includeTestimonials = true,
         includeCaseStudies = true,
-        includeReviews = true
+        includeReviews = true,
+        previousPages = {}
     } = input || {};
 
     if (!companyName) {
@@ -27,6 +29,8 @@ try {
     // Real implementation - web scraping for actual customer data
     const discoveredCustomers = [];
     const searchUrls = [];
+    // Per-URL validators and content hashes, returned so the next run can skip unchanged pages
+    const pages = {};
     
     // Build comprehensive search strategy
     if (companyWebsite) {
@@ -54,10 +58,38 @@ try {
     const crawler = new CheerioCrawler({
         maxRequestsPerCrawl: searchDepth * 10,
         maxConcurrency: 3,
+        postNavigationHooks: [acceptNotModified],
         
-        async requestHandler({ $, request }) {
+        async requestHandler({ $, request, response, body }) {
             log.info(`Processing: ${request.url}`);
             
+            const previous = previousPages[request.url];
+            if (response && response.statusCode === 304) {
+                // The server may rotate validators even when the page is the same
+                pages[request.url] = {
+                    ...previous,
+                    etag: response.headers.etag || (previous && previous.etag) || null,
+                    lastModified: response.headers['last-modified'] || (previous && previous.lastModified) || null,
+                    status: 'unchanged'
+                };
+                log.info(`Not modified since last audit: ${request.url}`);
+                return;
+            }
+            
+            const contentHash = createHash('sha256').update(body).digest('hex');
+            const headers = (response && response.headers) || {};
+            const unchanged = previous && previous.contentHash === contentHash;
+            pages[request.url] = {
+                etag: headers.etag || null,
+                lastModified: headers['last-modified'] || null,
+                contentHash,
+                status: unchanged ? 'unchanged' : (previous ? 'changed' : 'new')
+            };
+            if (unchanged) {
+                log.info(`Content unchanged since last audit: ${request.url}`);
+                return;
+            }
+            
             const customers = [];
             
             // Extract customer names from various page elements
@@ -96,7 +128,7 @@ try {
         }
     });
     
-    await crawler.addRequests(searchUrls.map(url => ({ url })));
+    await crawler.addRequests(searchUrls.map(url => ({ url, headers: conditionalHeaders(previousPages[url]) })));
     await crawler.run();
     
     // Process and deduplicate results
@@ -114,8 +146,10 @@ try {
             totalCustomersFound: finalCustomers.length,
             averageConfidence: finalCustomers.length > 0 ? 
                 (finalCustomers.reduce((sum, c) => sum + c.confidence, 0) / finalCustomers.length).toFixed(3) : 0,
-            urlsProcessed: searchUrls.length
+            urlsProcessed: searchUrls.length,
+            pagesUnchanged: Object.values(pages).filter(page => page.status === 'unchanged').length
         },
+        pages,
         status: 'SUCCESS'
     };
     
@@ -153,6 +187,26 @@ function calculateConfidence(text, customerName) {
     return Math.min(confidence, 0.99);
 }
 
+function acceptNotModified({ response }) {
+    // A 304 has no body and usually no Content-Type. Crawlee would take it
+    // for application/octet-stream and fail the request before requestHandler
+    // could record the page as unchanged.
+    if (response && response.statusCode === 304 && !response.headers['content-type']) {
+        response.headers['content-type'] = 'text/html';
+    }
+}
+
+function conditionalHeaders(previous) {
+    const headers = {};
+    if (previous && previous.etag) {
+        headers['If-None-Match'] = previous.etag;
+    }
+    if (previous && previous.lastModified) {
+        headers['If-Modified-Since'] = previous.lastModified;
+    }
+    return headers;
+}
+
 function deduplicateCustomers(customers) {
     const seen = new Map();
     return customers.filter(customer => {
@@ -1,15 +1,26 @@
+import time
+RERUN_STARTED = time.perf_counter()
+
+import os
+from pathlib import Path
+
 import streamlit as st
 import streamlit.components.v1 as components
+from streamlit.logger import get_logger
 
-# Set page config
-st.set_page_config(
-    page_title="Hero Making Brand Audit",
-    page_icon="🦸‍♂️",
-    layout="wide"
-)
+logger = get_logger(__name__)
+
+INDEX_PATH = Path(__file__).parent / 'index.html'
+
+# Strip indentation and blank lines from index.html once when it's loaded
+MINIFY_HTML = os.getenv('HERO_MINIFY_HTML', '1') == '1'
+
+# Versions of a page kept in the cache, so copies from earlier edits of
+# index.html don't pile up in a long-running server
+HTML_CACHE_ENTRIES = 2
 
 # Hide Streamlit default elements
-st.markdown("""
+HIDE_STREAMLIT_CSS = """
 <style>
     .reportview-container .main .block-container {
         padding-top: 0rem;
@@ -17,40 +28,71 @@ st.markdown("""
         padding-left: 0rem;
         padding-bottom: 0rem;
     }
-    
+
     .reportview-container .main {
         padding: 0rem;
     }
-    
+
     header[data-testid="stHeader"] {
         display: none;
     }
-    
+
     div[data-testid="stToolbar"] {
         display: none;
     }
-    
+
     div[data-testid="stDecoration"] {
         display: none;
     }
-    
+
     footer {
         display: none;
     }
-    
+
     #MainMenu {
         display: none;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+
+def minify_html(html):
+    """Drop indentation and blank lines; every line break is kept so inline JS is unaffected"""
+    return '\n'.join(line.strip() for line in html.splitlines() if line.strip())
+
+
+@st.cache_resource(max_entries=HTML_CACHE_ENTRIES)
+def load_html(path, mtime_ns, size, minify):
+    """Read a page once per file version; mtime and size are part of the cache key"""
+    with open(path, 'r', encoding='utf-8') as f:
+        html = f.read()
+    return minify_html(html) if minify else html
+
+
+@st.cache_resource
+def load_css(css, minify):
+    return minify_html(css) if minify else css
+
+
+# Set page config
+st.set_page_config(
+    page_title="Hero Making Brand Audit",
+    page_icon="🦸‍♂️",
+    layout="wide"
+)
+
+st.markdown(load_css(HIDE_STREAMLIT_CSS, MINIFY_HTML), unsafe_allow_html=True)
 
 # Read the HTML file
 try:
-    with open('index.html', 'r', encoding='utf-8') as f:
-        html_content = f.read()
-    
+    # A stat per rerun is all it takes to notice an edited index.html
+    stat = os.stat(INDEX_PATH)
+    html_content = load_html(str(INDEX_PATH), stat.st_mtime_ns, stat.st_size, MINIFY_HTML)
+
     # Display the HTML (full viewport)
     components.html(html_content, height=800, scrolling=True)
-    
+
 except FileNotFoundError:
-    st.error("index.html file not found. Please make sure it's in the same directory as app.py")
\ No newline at end of file
+    st.error("index.html file not found. Please make sure it's in the same directory as app.py")
+
+logger.info("Rerun took %.1f ms", (time.perf_counter() - RERUN_STARTED) * 1000)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Hero Making Auditor - Batch Audit
+Runs customer discovery for every company in a CSV or JSONL file
+"""
+
+import argparse
+import sys
+from config import Config
+from utils.apify_client import ApifyClient
+from utils.batch_runner import BatchAuditRunner, read_companies
+from utils.incremental_audit import IncrementalAuditor
+from utils.parallel_scoring import ParallelScorer
+from utils.result_cache import CachedApifyClient
+from utils.single_flight import CoalescingApifyClient, RunLease
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit a portfolio of companies in one run")
+    parser.add_argument("input", help="CSV or JSONL file with companyName, companyWebsite, maxResults, searchDepth")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL file, or directory for parquet")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--workers", type=int, default=Config.MAX_CONCURRENT_ACTORS)
+    parser.add_argument("--checkpoint", help="Checkpoint file (defaults to <output>.checkpoint)")
+    parser.add_argument("--no-cache", action="store_true", help="Always run the actor")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-crawl pages changed since each company's last audit (kept in the history store)")
+    parser.add_argument("--scoring-workers", type=int, default=Config.SCORING_WORKERS,
+                        help="Processes scoring pages with the local backend (0 = one per core)")
+    args = parser.parse_args()
+
+    Config.validate()
+
+    # Duplicate rows, and batches running in parallel, share one actor run
+    lease = RunLease() if Config.LEASE_PATH else None
+    # Locally crawled pages are scored on every core while the crawl goes on
+    scorer = ParallelScorer(args.scoring_workers) if Config.DISCOVERY_BACKEND == "local" else None
+    apify_client = CoalescingApifyClient(ApifyClient(Config.APIFY_TOKEN, scorer=scorer), lease=lease)
+    if not args.no_cache:
+        apify_client = CachedApifyClient(apify_client)
+    if args.incremental:
+        apify_client = IncrementalAuditor(apify_client)
+
+    companies = read_companies(args.input)
+    runner = BatchAuditRunner(apify_client, args.output, args.format, args.workers, args.checkpoint)
+    try:
+        stats = runner.run(companies)
+    finally:
+        if scorer is not None:
+            scorer.close()
+
+    print(f"\nAudited {stats['succeeded'] + stats['failed']} companies "
+          f"({stats['succeeded']} succeeded, {stats['failed']} failed, {stats['skipped']} already done) "
+          f"at {stats['companies_per_minute']:.1f} companies/min")
+    return 1 if stats["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
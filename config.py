@@ -4,6 +4,9 @@ from pathlib import Path
 # Configuration settings for the Hero Making Auditor
 class Config:
     APIFY_TOKEN = os.getenv("APIFY_TOKEN")
+    # Apify API base URL (unset = api.apify.com); point it at
+    # fake_apify_server.py to test offline
+    APIFY_API_URL = os.getenv("HERO_APIFY_API_URL")
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     
     # Actor IDs (update these with your actual actor IDs)
@@ -17,9 +20,66 @@ class Config:
     MAX_CONCURRENT_ACTORS = 3
     DEFAULT_TIMEOUT = 300  # 5 minutes
     
+    # Account memory budget until the real limits are read from Apify
+    # (the free plan's 8 GB)
+    ACCOUNT_MEMORY_MBYTES = int(os.getenv("HERO_APIFY_MEMORY_MBYTES", "8192"))
+    
+    # Where customer discovery runs: "apify" (hosted actor) or "local"
+    # (crawl from this process; needs selectolax)
+    DISCOVERY_BACKEND = os.getenv("HERO_DISCOVERY_BACKEND", "apify")
+    CRAWL_MAX_CONCURRENCY = 3
+    CRAWL_MAX_PER_HOST = 2
+    CRAWL_DELAY_SECS = 0.25  # between requests to the same host
+    CRAWL_TIMEOUT_SECS = 20
+    
+    # Processes scoring locally crawled pages in batch runs (0 = one per core)
+    SCORING_WORKERS = int(os.getenv("HERO_SCORING_WORKERS", "0"))
+    
+    # Result cache settings
+    CACHE_PATH = os.getenv("HERO_CACHE_PATH", str(Path(".cache") / "results.sqlite3"))
+    CACHE_MAX_ENTRIES = int(os.getenv("HERO_CACHE_MAX_ENTRIES", "1000"))
+    CACHE_DEFAULT_TTL = 6 * 60 * 60  # 6 hours
+    CACHE_TTLS = {
+        CUSTOMER_DISCOVERY_ACTOR: 24 * 60 * 60  # 1 day
+    }
+    
+    # Audit history store
+    HISTORY_PATH = os.getenv("HERO_HISTORY_PATH", str(Path(".cache") / "history.sqlite3"))
+    HISTORY_PAGE_SIZE = 10
+    
+    # Background audit queue
+    JOB_QUEUE_PATH = os.getenv("HERO_JOB_QUEUE_PATH", str(Path(".cache") / "jobs.sqlite3"))
+    JOB_WORKERS = int(os.getenv("HERO_JOB_WORKERS", str(MAX_CONCURRENT_ACTORS)))
+    JOB_POLL_SECS = 2
+    # Each queue heart-beats the jobs it owns while its process is alive, so
+    # jobs silent for JOB_STALE_SECS lost their process (and their token)
+    JOB_HEARTBEAT_SECS = 30
+    JOB_STALE_SECS = 4 * JOB_HEARTBEAT_SECS
+    
+    # Shared SQLite file that coalesces identical runs across processes
+    # (unset = only callers within one process share a run)
+    LEASE_PATH = os.getenv("HERO_LEASE_PATH")
+    
+    # Outbound HTTP connection pools, shared by every session in the process
+    HTTP_POOL_SIZE = int(os.getenv("HERO_HTTP_POOL_SIZE", "20"))
+    HTTP_MAX_PER_HOST = int(os.getenv("HERO_HTTP_MAX_PER_HOST", "10"))
+    # waitForFinish long-polls sit on a connection for up to a minute, so
+    # they get their own per-host cap instead of starving other requests
+    HTTP_MAX_LONG_POLLS_PER_HOST = int(os.getenv("HERO_HTTP_MAX_LONG_POLLS_PER_HOST", "10"))
+    HTTP_KEEPALIVE_SECS = 60
+    HTTP_RETRIES = 3
+    HTTP_BACKOFF_SECS = 0.5
+    
+    # Port for the Prometheus /metrics endpoint of the app process (0 = off)
+    METRICS_PORT = int(os.getenv("HERO_METRICS_PORT", "0"))
+    
     @classmethod
-    def validate(cls):
-        """Validate required configuration"""
-        if not cls.APIFY_TOKEN:
+    def validate(cls, backend=None):
+        """Validate required configuration for a discovery backend"""
+        backend = backend or cls.DISCOVERY_BACKEND
+        if backend not in ("apify", "local"):
+            raise ValueError(f"Unknown discovery backend: {backend}")
+        # The local backend never talks to Apify
+        if backend == "apify" and not cls.APIFY_TOKEN:
             raise ValueError("APIFY_TOKEN environment variable is required")
         return True
\ No newline at end of file
@@ -7,7 +7,7 @@ This script helps deploy the complete system to GitHub and Apify
 import os
 import subprocess
 import json
-import requests
+from utils.http_session import HTTP_SESSIONS
 from pathlib import Path
 
 class HeroMakingAuditorDeployer:
@@ -58,9 +58,12 @@ class HeroMakingAuditorDeployer:
         self.write_file("streamlit-app/config.py", self.get_config_code())
         
         # Utility files
-        self.write_file("streamlit-app/utils/apify_client.py", self.get_apify_client_code())
-        self.write_file("streamlit-app/utils/data_processor.py", self.get_data_processor_code())
-        self.write_file("streamlit-app/utils/report_generator.py", self.get_report_generator_code())
+        self.copy_app_modules()
+    
+    def copy_app_modules(self):
+        """Copy the repository's utils/ package into the app scaffold"""
+        for module in sorted((Path(__file__).parent / "utils").glob("*.py")):
+            self.write_file(f"streamlit-app/utils/{module.name}", self.read_source(f"utils/{module.name}"))
     
     def create_documentation(self):
         """Create documentation files"""
@@ -78,176 +81,13 @@ class HeroMakingAuditorDeployer:
             f.write(content)
         print(f"Created file: {filepath}")
     
+    def read_source(self, filepath):
+        """Read a file from this repository so the scaffold ships the current code"""
+        return (Path(__file__).parent / filepath).read_text(encoding='utf-8')
+    
     def get_customer_discovery_code(self):
         """Returns the production customer discovery code"""
-        return '''// Production Hero Customer Discovery Actor
-import { Actor } from 'apify';
-import { CheerioCrawler, log } from 'crawlee';
-
-await Actor.init();
-
-try {
-    const input = await Actor.getInput();
-    log.info('Hero Customer Discovery Actor started');
-    
-    const {
-        companyName,
-        companyWebsite,
-        maxResults = 50,
-        searchDepth = 3,
-        includeTestimonials = true,
-        includeCaseStudies = true,
-        includeReviews = true
-    } = input || {};
-
-    if (!companyName) {
-        throw new Error('companyName is required');
-    }
-
-    log.info(`Analyzing customers for: ${companyName}`);
-    
-    // Real implementation - web scraping for actual customer data
-    const discoveredCustomers = [];
-    const searchUrls = [];
-    
-    // Build comprehensive search strategy
-    if (companyWebsite) {
-        const baseUrl = new URL(companyWebsite).origin;
-        searchUrls.push(
-            `${baseUrl}/customers`,
-            `${baseUrl}/case-studies`,
-            `${baseUrl}/testimonials`,
-            `${baseUrl}/success-stories`
-        );
-    }
-    
-    // Google search for customer mentions
-    const searchQueries = [
-        `"${companyName}" customer case study`,
-        `"${companyName}" client testimonial`,
-        `"${companyName}" success story`,
-        `site:${companyWebsite} customer`
-    ];
-    
-    searchQueries.forEach(query => {
-        searchUrls.push(`https://www.google.com/search?q=${encodeURIComponent(query)}&num=10`);
-    });
-    
-    const crawler = new CheerioCrawler({
-        maxRequestsPerCrawl: searchDepth * 10,
-        maxConcurrency: 3,
-        
-        async requestHandler({ $, request }) {
-            log.info(`Processing: ${request.url}`);
-            
-            const customers = [];
-            
-            // Extract customer names from various page elements
-            const customerSections = $('[class*="customer"], [class*="client"], [class*="testimonial"], [class*="case-study"]');
-            
-            customerSections.each((i, element) => {
-                const $element = $(element);
-                const text = $element.text().trim();
-                
-                // Extract company names using regex
-                const companyPattern = /\\b([A-Z][a-zA-Z\\s&.,-]{2,40}(?:\\s(?:Inc|LLC|Corp|Company|Ltd))?)\\b/g;
-                let match;
-                
-                while ((match = companyPattern.exec(text)) !== null) {
-                    const customerName = match[1].trim();
-                    
-                    if (customerName.length > 2 && 
-                        customerName.length < 50 && 
-                        !customerName.toLowerCase().includes(companyName.toLowerCase())) {
-                        
-                        customers.push({
-                            name: customerName,
-                            source: request.url,
-                            context: text.substring(0, 200),
-                            confidence: calculateConfidence(text, customerName),
-                            discoveredAt: new Date().toISOString()
-                        });
-                    }
-                }
-            });
-            
-            if (customers.length > 0) {
-                discoveredCustomers.push(...customers);
-                log.info(`Found ${customers.length} customers on ${request.url}`);
-            }
-        }
-    });
-    
-    await crawler.addRequests(searchUrls.map(url => ({ url })));
-    await crawler.run();
-    
-    // Process and deduplicate results
-    const uniqueCustomers = deduplicateCustomers(discoveredCustomers);
-    const finalCustomers = uniqueCustomers
-        .sort((a, b) => b.confidence - a.confidence)
-        .slice(0, maxResults);
-    
-    const result = {
-        companyName,
-        companyWebsite,
-        timestamp: new Date().toISOString(),
-        customers: finalCustomers,
-        summary: {
-            totalCustomersFound: finalCustomers.length,
-            averageConfidence: finalCustomers.length > 0 ? 
-                (finalCustomers.reduce((sum, c) => sum + c.confidence, 0) / finalCustomers.length).toFixed(3) : 0,
-            urlsProcessed: searchUrls.length
-        },
-        status: 'SUCCESS'
-    };
-    
-    await Actor.pushData(result);
-    log.info(`Discovery completed. Found ${finalCustomers.length} customers.`);
-    
-} catch (error) {
-    log.error(`Actor failed: ${error.message}`);
-    
-    await Actor.pushData({
-        companyName: input?.companyName || 'Unknown',
-        timestamp: new Date().toISOString(),
-        status: 'ERROR',
-        error: error.message,
-        customers: []
-    });
-    
-    throw error;
-}
-
-function calculateConfidence(text, customerName) {
-    let confidence = 0.5;
-    
-    const positiveKeywords = ['customer', 'client', 'testimonial', 'case study', 'success'];
-    positiveKeywords.forEach(keyword => {
-        if (text.toLowerCase().includes(keyword)) {
-            confidence += 0.1;
-        }
-    });
-    
-    if (/\\b(Inc|LLC|Corp|Company|Ltd)\\b/.test(customerName)) {
-        confidence += 0.1;
-    }
-    
-    return Math.min(confidence, 0.99);
-}
-
-function deduplicateCustomers(customers) {
-    const seen = new Map();
-    return customers.filter(customer => {
-        const key = customer.name.toLowerCase().trim();
-        if (seen.has(key)) {
-            return false;
-        }
-        seen.set(key, customer);
-        return true;
-    });
-}
-
-await Actor.exit();'''
+        return self.read_source("actors/hero-customer-discovery/main.js")
     
     def get_package_json(self, actor_name):
         return json.dumps({
@@ -268,42 +108,7 @@ await Actor.exit();'''
     
     def get_input_schema(self, actor_type):
         if actor_type == "customer-discovery":
-            return json.dumps({
-                "title": "Hero Customer Discovery Input",
-                "type": "object",
-                "schemaVersion": 1,
-                "properties": {
-                    "companyName": {
-                        "title": "Company Name",
-                        "type": "string",
-                        "description": "Name of the company to analyze",
-                        "editor": "textfield"
-                    },
-                    "companyWebsite": {
-                        "title": "Company Website", 
-                        "type": "string",
-                        "description": "Website URL",
-                        "editor": "textfield"
-                    },
-                    "maxResults": {
-                        "title": "Maximum Results",
-                        "type": "integer",
-                        "default": 50,
-                        "minimum": 1,
-                        "maximum": 200,
-                        "editor": "number"
-                    },
-                    "searchDepth": {
-                        "title": "Search Depth",
-                        "type": "integer", 
-                        "default": 3,
-                        "minimum": 1,
-                        "maximum": 10,
-                        "editor": "number"
-                    }
-                },
-                "required": ["companyName"]
-            }, indent=2)
+            return self.read_source("actors/hero-customer-discovery/INPUT_SCHEMA.json")
     
     def get_actor_json(self, actor_name):
         return json.dumps({
@@ -320,10 +125,13 @@ await Actor.exit();'''
     
     def get_streamlit_app_code(self):
         return '''import streamlit as st
-import pandas as pd
-from utils.apify_client import ApifyClient
-from utils.data_processor import DataProcessor
-from utils.report_generator import ReportGenerator
+import uuid
+from config import Config
+from utils.job_queue import ACTIVE_JOB_STATUSES
+from utils.report_exporter import MIME_TYPES, available_formats
+
+# Everything else is imported where it's first used, so the first page
+# renders before the Apify SDK or pandas are loaded
 
 st.set_page_config(
     page_title="Hero Making Auditor",
@@ -331,6 +139,145 @@ st.set_page_config(
     layout="wide"
 )
 
+@st.cache_resource
+def get_result_cache():
+    from utils.result_cache import ResultCache
+    return ResultCache()
+
+@st.cache_resource
+def get_run_lease():
+    # Only needed when several app processes share a host or volume
+    if Config.LEASE_PATH:
+        from utils.single_flight import RunLease
+        return RunLease()
+
+@st.cache_resource
+def get_history_store():
+    from utils.history_store import HistoryStore
+    return HistoryStore()
+
+@st.cache_resource
+def get_job_queue():
+    from utils.job_queue import AuditJobHandler, JobQueue
+    from utils.result_cache import CachedApifyClient
+    from utils.single_flight import CoalescingApifyClient
+    
+    # Workers live as long as the process and serve every session
+    result_cache = get_result_cache()
+    lease = get_run_lease()
+    
+    def client_factory(apify_token):
+        # Runs on a worker thread once the first job starts
+        from utils.apify_client import ApifyClient
+        
+        # Identical audits started together share one actor run
+        return CachedApifyClient(CoalescingApifyClient(ApifyClient(apify_token), lease=lease), result_cache)
+    
+    return JobQueue(AuditJobHandler(client_factory, get_history_store())).start()
+
+@st.cache_resource
+def get_report_exporter():
+    from utils.data_processor import DataProcessor
+    from utils.report_exporter import ReportExporter
+    from utils.report_generator import ReportGenerator
+    return ReportExporter(DataProcessor(), ReportGenerator())
+
+@st.cache_data(max_entries=50, show_spinner=False)
+def render_report(job_id, export_format, _discovery, _customers_df):
+    # A finished job never changes, so its export is rendered once per
+    # format instead of on every poll of the jobs fragment
+    return get_report_exporter().render(_discovery, export_format, _customers_df)
+
+@st.cache_resource
+def get_metrics_server():
+    # One /metrics endpoint per process, shared by every session
+    if Config.METRICS_PORT:
+        from utils.metrics import start_metrics_server
+        return start_metrics_server(Config.METRICS_PORT)
+
+def show_history(history_store):
+    """Paginated list of past audits, newest first"""
+    # Each page starts below the last id of the page before it
+    cursors = st.session_state.setdefault("history_cursors", [None])
+    audits = history_store.recent_audits(before_id=cursors[-1])
+    
+    if not audits:
+        st.info("Analysis history will appear here.")
+        return
+    
+    for audit in audits:
+        avg_confidence = audit["avg_confidence"] or 0
+        st.markdown(
+            f"**{audit['company_name']}** · {audit['total_customers']} customers · "
+            f"avg {avg_confidence:.2f}  \\n{audit['created_at']}"
+        )
+    
+    newer, older = st.columns(2)
+    if newer.button("Newer", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if older.button("Older", disabled=len(audits) < Config.HISTORY_PAGE_SIZE):
+        cursors.append(audits[-1]["id"])
+        st.rerun()
+
+def show_job(job, job_queue, data_processor, report_exporter, export_format, expanded):
+    """One audit job: its progress while running, its results once done"""
+    company_name = job["input"]["companyName"]
+    discovery = job["progress"].get("discovery")
+    customers = (discovery or {}).get("customers") or []
+    
+    if job["status"] == "FAILED":
+        st.error(f"{company_name}: {job['error']}")
+        return
+    
+    if job["status"] == "CANCELLED":
+        st.warning(f"{company_name}: cancelled")
+        return
+    
+    if job["status"] in ACTIVE_JOB_STATUSES:
+        found = f", {len(customers)} customers found" if discovery else ""
+        st.info(f"{company_name}: {job['status'].lower()}{found}...")
+        if job["status"] == "QUEUED" and st.button("Cancel", key=f"cancel-{job['id']}"):
+            job_queue.cancel(job["id"])
+            st.rerun()
+        if customers:
+            st.dataframe(data_processor.process_customers(customers))
+        return
+    
+    with st.expander(f"{company_name}: {len(customers)} hero customers", expanded=expanded):
+        customers_df = data_processor.process_customers(customers)
+        st.dataframe(customers_df)
+        
+        try:
+            report = render_report(job["id"], export_format, discovery or {}, customers_df)
+        except Exception as e:
+            # One export failing must not take the rest of the jobs list down
+            st.error(f"Could not render the {export_format} report: {e}")
+        else:
+            st.download_button(
+                "Download Report",
+                report,
+                file_name=f"{company_name}_hero_customers.{export_format}",
+                mime=MIME_TYPES[export_format],
+                key=f"download-{job['id']}"
+            )
+        
+        # Where this audit's time went: Apify, the network or our own code
+        timings = job["result"]["timings"]
+        if timings:
+            st.caption(f"Timing breakdown ({job['result']['total_seconds']:.1f}s total)")
+            st.table(timings)
+
+def show_jobs(job_queue, data_processor, report_exporter, export_format, refreshing):
+    """This session's audits; refreshes itself while any of them is running"""
+    jobs = job_queue.session_jobs(st.session_state["session_id"], limit=5)
+    if refreshing and not any(job["status"] in ACTIVE_JOB_STATUSES for job in jobs):
+        # Everything finished: rerun the page once to stop polling and refresh history
+        st.rerun()
+    
+    for i, job in enumerate(jobs):
+        show_job(job, job_queue, data_processor, report_exporter, export_format, expanded=i == 0)
+
 def main():
     st.title("Hero Making Auditor")
     st.subheader("Universal B2B Brand Intelligence Platform")
@@ -344,9 +291,13 @@ def main():
         return
     
     # Initialize clients
-    apify_client = ApifyClient(apify_token)
-    data_processor = DataProcessor()
-    report_generator = ReportGenerator()
+    result_cache = get_result_cache()
+    job_queue = get_job_queue()
+    history_store = get_history_store()
+    get_metrics_server()
+    report_exporter = get_report_exporter()
+    data_processor = report_exporter.data_processor
+    session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
     
     # Main interface
     col1, col2 = st.columns([2, 1])
@@ -355,174 +306,39 @@ def main():
         st.header("Company Analysis")
         company_name = st.text_input("Company Name")
         company_website = st.text_input("Company Website")
+        # Formats whose optional package isn't installed aren't offered
+        export_format = st.selectbox("Report format", available_formats())
+        incremental = st.checkbox("Only re-crawl pages changed since the last audit")
         
         if st.button("Discover Hero Customers", type="primary"):
             if company_name:
-                with st.spinner("Discovering hero customers..."):
-                    try:
-                        # Run customer discovery actor
-                        result = apify_client.run_customer_discovery({
-                            "companyName": company_name,
-                            "companyWebsite": company_website,
-                            "maxResults": 50
-                        })
-                        
-                        if result and result.get("customers"):
-                            st.success(f"Found {len(result['customers'])} hero customers!")
-                            
-                            # Display results
-                            customers_df = pd.DataFrame(result["customers"])
-                            st.dataframe(customers_df)
-                            
-                            # Generate report
-                            report = report_generator.generate_report(result)
-                            st.download_button(
-                                "Download Report",
-                                report,
-                                file_name=f"{company_name}_hero_customers.html",
-                                mime="text/html"
-                            )
-                        else:
-                            st.error("No customers found or actor failed.")
-                            
-                    except Exception as e:
-                        st.error(f"Error: {str(e)}")
+                # Audits run on the queue's workers, so reruns and navigation don't lose them
+                job_queue.submit({
+                    "companyName": company_name,
+                    "companyWebsite": company_website,
+                    "maxResults": 50,
+                    "incremental": incremental
+                }, session_id=session_id, secret=apify_token)
             else:
                 st.error("Please enter a company name.")
+        
+        refreshing = any(job["status"] in ACTIVE_JOB_STATUSES for job in job_queue.session_jobs(session_id, limit=5))
+        st.fragment(show_jobs, run_every=Config.JOB_POLL_SECS if refreshing else None)(
+            job_queue, data_processor, report_exporter, export_format, refreshing
+        )
     
     with col2:
         st.header("Recent Analyses")
-        st.info("Analysis history will appear here.")
+        show_history(history_store)
+        
+        cache_stats = result_cache.stats()
+        st.caption(f"Result cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['entries']} entries")
 
 if __name__ == "__main__":
     main()'''
     
     def get_requirements_txt(self):
-        return '''streamlit>=1.28.0
-pandas>=1.5.0
-requests>=2.28.0
-apify-client>=1.6.0
-plotly>=5.15.0
-beautifulsoup4>=4.12.0
-python-dotenv>=1.0.0'''
-    
-    def get_apify_client_code(self):
-        return '''from apify_client import ApifyClient as BaseApifyClient
-import time
-
-class ApifyClient:
-    def __init__(self, token):
-        self.client = BaseApifyClient(token)
-        
-    def run_customer_discovery(self, input_data):
-        """Run the hero customer discovery actor"""
-        actor_id = "your-username/hero-customer-discovery"
-        
-        try:
-            run = self.client.actor(actor_id).call(run_input=input_data)
-            
-            # Wait for completion
-            while run["status"] in ["RUNNING", "READY"]:
-                time.sleep(5)
-                run = self.client.run(run["id"]).get()
-            
-            if run["status"] == "SUCCEEDED":
-                # Get dataset items
-                dataset_id = run["defaultDatasetId"]
-                items = self.client.dataset(dataset_id).list_items()
-                return items.items[0] if items.items else None
-            else:
-                raise Exception(f"Actor run failed with status: {run['status']}")
-                
-        except Exception as e:
-            raise Exception(f"Failed to run actor: {str(e)}")'''
-    
-    def get_data_processor_code(self):
-        return '''import pandas as pd
-
-class DataProcessor:
-    def __init__(self):
-        pass
-        
-    def process_customers(self, customers_data):
-        """Process raw customer data"""
-        if not customers_data:
-            return pd.DataFrame()
-            
-        df = pd.DataFrame(customers_data)
-        
-        # Clean and enhance data
-        if "confidence" in df.columns:
-            df["confidence"] = df["confidence"].round(3)
-            
-        if "discoveredAt" in df.columns:
-            df["discoveredAt"] = pd.to_datetime(df["discoveredAt"])
-            
-        return df
-        
-    def generate_summary(self, customers_data):
-        """Generate summary statistics"""
-        if not customers_data:
-            return {}
-            
-        df = pd.DataFrame(customers_data)
-        
-        return {
-            "total_customers": len(df),
-            "avg_confidence": df["confidence"].mean() if "confidence" in df.columns else 0,
-            "high_confidence_count": len(df[df["confidence"] > 0.8]) if "confidence" in df.columns else 0
-        }'''
-    
-    def get_report_generator_code(self):
-        return '''import json
-
-class ReportGenerator:
-    def __init__(self):
-        pass
-        
-    def generate_report(self, data):
-        """Generate HTML report"""
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Hero Customer Report - {data.get('companyName', 'Unknown')}</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 40px; }}
-                .header {{ background: #f0f0f0; padding: 20px; border-radius: 5px; }}
-                .customer {{ border: 1px solid #ddd; margin: 10px 0; padding: 15px; border-radius: 5px; }}
-                .confidence {{ font-weight: bold; color: #007bff; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>Hero Customer Report</h1>
-                <h2>{data.get('companyName', 'Unknown Company')}</h2>
-                <p>Generated: {data.get('timestamp', 'Unknown')}</p>
-                <p>Total Customers Found: {len(data.get('customers', []))}</p>
-            </div>
-            
-            <div class="customers">
-                <h3>Discovered Hero Customers</h3>
-        """
-        
-        for customer in data.get('customers', []):
-            html += f"""
-                <div class="customer">
-                    <h4>{customer.get('name', 'Unknown')}</h4>
-                    <p><span class="confidence">Confidence: {customer.get('confidence', 0):.3f}</span></p>
-                    <p>Source: {customer.get('source', 'Unknown')}</p>
-                    <p>Context: {customer.get('context', 'No context available')[:200]}...</p>
-                </div>
-            """
-        
-        html += """
-            </div>
-        </body>
-        </html>
-        """
-        
-        return html'''
+        return self.read_source("requirements.txt")
     
     def get_readme_content(self):
         return '''# Hero Making Auditor
@@ -587,7 +403,8 @@ venv/
 .DS_Store
 *.log
 node_modules/
-apify_storage/'''
+apify_storage/
+.cache/'''
     
     def get_license(self):
         return '''MIT License
@@ -676,31 +493,7 @@ Output: Comprehensive HTML/PDF reports'''
 3. Run application'''
     
     def get_config_code(self):
-        return '''import os
-from pathlib import Path
-
-# Configuration settings for the Hero Making Auditor
-class Config:
-    APIFY_TOKEN = os.getenv("APIFY_TOKEN")
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    
-    # Actor IDs (update these with your actual actor IDs)
-    CUSTOMER_DISCOVERY_ACTOR = "your-username/hero-customer-discovery"
-    LINKEDIN_ANALYZER_ACTOR = "your-username/hero-linkedin-analyzer"
-    CONTENT_ANALYZER_ACTOR = "your-username/hero-content-analyzer"
-    SIGNAL_DETECTOR_ACTOR = "your-username/hero-signal-detector"
-    REPORT_GENERATOR_ACTOR = "your-username/hero-report-generator"
-    
-    # Application settings
-    MAX_CONCURRENT_ACTORS = 3
-    DEFAULT_TIMEOUT = 300  # 5 minutes
-    
-    @classmethod
-    def validate(cls):
-        """Validate required configuration"""
-        if not cls.APIFY_TOKEN:
-            raise ValueError("APIFY_TOKEN environment variable is required")
-        return True'''
+        return self.read_source("config.py")
     
     def init_git_repo(self):
         """Initialize git repository"""
@@ -730,7 +523,7 @@ class Config:
             'auto_init': False
         }
         
-        response = requests.post('https://api.github.com/user/repos', json=data, headers=headers)
+        response = HTTP_SESSIONS.session().post('https://api.github.com/user/repos', json=data, headers=headers)
         
         if response.status_code == 201:
             repo_data = response.json()
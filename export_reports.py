@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Hero Making Auditor - Report Export
+Renders report and data exports for every company in a batch result
+"""
+
+import argparse
+import sys
+from config import Config
+from utils.report_exporter import EXPORT_FORMATS, export_batch, iter_batch_results, iter_dataset_results, require_format
+
+def main():
+    parser = argparse.ArgumentParser(description="Export reports for a batch of audits in parallel")
+    parser.add_argument("input", help="batch_audit.py output (JSONL file or parquet directory), or a dataset ID")
+    parser.add_argument("--dataset", action="store_true",
+                        help="Read discovery results from the Apify dataset named by input")
+    parser.add_argument("--output-dir", default="reports", help="Directory the exports are written into")
+    parser.add_argument("--formats", default="html", help=f"Comma-separated list of {', '.join(EXPORT_FORMATS)}")
+    parser.add_argument("--workers", type=int, help="Worker processes (defaults to the CPU count)")
+    args = parser.parse_args()
+
+    formats = [fmt.strip().lower() for fmt in args.formats.split(",") if fmt.strip()]
+    for fmt in formats:
+        try:
+            require_format(fmt)
+        except Exception as e:
+            parser.error(str(e))
+
+    if args.dataset:
+        from utils.apify_client import ApifyClient
+
+        Config.validate("apify")
+        results = iter_dataset_results(ApifyClient(Config.APIFY_TOKEN), args.input)
+    else:
+        results = iter_batch_results(args.input)
+
+    stats = export_batch(results, args.output_dir, formats, args.workers)
+
+    print(f"\nExported {stats['exported']} companies ({stats['files']} files, {stats['failed']} failed) "
+          f"to {args.output_dir}")
+    return 1 if stats["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
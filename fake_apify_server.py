@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Hero Making Auditor - Fake Apify API
+Serves the Apify endpoints the auditor uses from memory, for offline load tests
+"""
+
+import argparse
+import sys
+import time
+from utils.fake_apify import FakeApify, start_fake_apify_server
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Apify API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--address", default="127.0.0.1")
+    parser.add_argument("--run-secs", type=float, default=1.0, help="How long every actor run takes")
+    parser.add_argument("--run-jitter-secs", type=float, default=0.0, help="Random extra run time, for tail latency")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of runs that end FAILED")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests refused with a 429")
+    parser.add_argument("--dataset-size", type=int, default=20, help="Customers in every discovery result")
+    parser.add_argument("--max-concurrent-runs", type=int, default=25, help="Account limit reported to the client")
+    parser.add_argument("--seed", type=int, help="Seed for repeatable failures and 429s")
+    args = parser.parse_args()
+
+    fake = FakeApify(
+        run_secs=args.run_secs,
+        run_jitter_secs=args.run_jitter_secs,
+        failure_rate=args.failure_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        dataset_size=args.dataset_size,
+        max_concurrent_runs=args.max_concurrent_runs,
+        seed=args.seed
+    )
+    server = start_fake_apify_server(args.port, args.address, fake)
+    print(f"Fake Apify API on {server.url} - run with HERO_APIFY_API_URL={server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Hero Making Auditor - Import Profile
+Summarizes `python -X importtime` for the app's startup imports
+"""
+
+import argparse
+import sys
+from utils.import_profile import HEAVY_MODULES, STARTUP_MODULES, profile_imports, summarize
+
+def main():
+    parser = argparse.ArgumentParser(description="Show where cold-start import time goes")
+    parser.add_argument("modules", nargs="*", help=f"Modules to import (defaults to {', '.join(STARTUP_MODULES)})")
+    parser.add_argument("--top", type=int, default=15, help="Slowest top-level imports to list")
+    parser.add_argument("--check", action="store_true",
+                        help=f"Exit 1 if any of {', '.join(HEAVY_MODULES)} is loaded at import time")
+    args = parser.parse_args()
+
+    summary = summarize(profile_imports(args.modules or None), args.top)
+
+    print(f"Total import time: {summary['total_ms']:.1f} ms\n")
+    for module, cumulative_ms in summary["slowest"]:
+        print(f"{cumulative_ms:9.1f} ms  {module}")
+    print(f"\nHeavy libraries loaded: {', '.join(summary['heavy_loaded']) or 'none'}")
+    return 1 if args.check and summary["heavy_loaded"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,229 @@
 #!/usr/bin/env python3
+import argparse
+import gzip
+import hashlib
 import http.server
-import socketserver
+import mimetypes
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+from utils.metrics import REGISTRY
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 PORT = int(os.environ.get('PORT', 8000))
+WORKERS = int(os.environ.get('WEB_CONCURRENCY', 16))
+
+# Only these files, and assets under STATIC_DIR, are served; everything else
+# in the tree (exported reports included) stays private
+PUBLIC_FILES = ['index.html']
+STATIC_DIR = 'static'
+STATIC_EXTENSIONS = {'.html', '.css', '.js', '.svg', '.png', '.jpg', '.jpeg', '.gif', '.ico', '.webp', '.woff2'}
+COMPRESSIBLE_EXTENSIONS = {'.html', '.css', '.js', '.svg'}
+
+# Files with a content hash in their name (app.3f2a9c1b.js) never change
+FINGERPRINT_PATTERN = re.compile(r'\.[0-9a-f]{8,}\.[a-z0-9]+$')
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE = 'public, max-age=3600'
+# HTML must revalidate so deploys show up, but a 304 makes that cheap
+HTML_CACHE = 'no-cache'
+
+HTTP_REQUESTS = REGISTRY.counter('hero_http_requests_total', 'Static server responses by status code')
+HTTP_BYTES = REGISTRY.counter('hero_http_response_bytes_total', 'Static server response body bytes by encoding')
+
+# Idle keep-alive connections are dropped after this many seconds so a
+# slow or idle client can't hold a worker forever
+KEEPALIVE_TIMEOUT = 5
+
+
+class Asset:
+    def __init__(self, path, url_path):
+        with open(path, 'rb') as f:
+            self.body = f.read()
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if self.content_type.startswith('text/') or self.content_type in ('application/javascript', 'image/svg+xml'):
+            self.content_type += '; charset=utf-8'
+
+        mtime = int(os.path.getmtime(path))
+        self.last_modified = formatdate(mtime, usegmt=True)
+        self.mtime = mtime
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:16] + '"'
+
+        ext = os.path.splitext(path)[1].lower()
+        if ext == '.html':
+            self.cache_control = HTML_CACHE
+        elif FINGERPRINT_PATTERN.search(url_path):
+            self.cache_control = IMMUTABLE_CACHE
+        else:
+            self.cache_control = DEFAULT_CACHE
+
+        # Precompress once at startup instead of on every request
+        self.encodings = {}
+        if ext in COMPRESSIBLE_EXTENSIONS:
+            self.encodings['gzip'] = gzip.compress(self.body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.encodings['br'] = brotli.compress(self.body, quality=11)
 
-class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
-    def end_headers(self):
-        # Add cache control headers
-        self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-        self.send_header('Pragma', 'no-cache')
-        self.send_header('Expires', '0')
-        super().end_headers()
+    def select(self, accept_encoding):
+        """Pick the smallest encoding the client accepts"""
+        accepted = set()
+        for part in (accept_encoding or '').split(','):
+            name, _, params = part.strip().partition(';')
+            if params.strip().replace(' ', '') in ('q=0', 'q=0.0'):
+                continue
+            accepted.add(name.strip().lower())
+
+        for encoding in ('br', 'gzip'):
+            if encoding in self.encodings and encoding in accepted:
+                return encoding, self.encodings[encoding]
+        return None, self.body
+
+
+def load_assets(root):
+    """Read and precompress the public files and the assets under root/static"""
+    assets = {}
+    for filename in PUBLIC_FILES:
+        path = os.path.join(root, filename)
+        if os.path.isfile(path):
+            assets['/' + filename] = Asset(path, '/' + filename)
+
+    for dirpath, dirnames, filenames in os.walk(os.path.join(root, STATIC_DIR)):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        for filename in filenames:
+            if os.path.splitext(filename)[1].lower() not in STATIC_EXTENSIONS:
+                continue
+            path = os.path.join(dirpath, filename)
+            url_path = '/' + os.path.relpath(path, root).replace(os.sep, '/')
+            assets[url_path] = Asset(path, url_path)
+    return assets
+
+
+class StaticAssetHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEPALIVE_TIMEOUT
+    assets = {}
 
     def do_GET(self):
+        self.send_asset(include_body=True)
+
+    def do_HEAD(self):
+        self.send_asset(include_body=False)
+
+    def send_asset(self, include_body):
+        path = self.path.split('?', 1)[0]
         # Serve index.html for root path
-        if self.path == '/':
-            self.path = '/index.html'
-        return super().do_GET()
+        if path == '/':
+            path = '/index.html'
+
+        if path == '/healthz':
+            self.send_bytes(200, b'ok', 'text/plain; charset=utf-8', include_body)
+            return
+
+        if path == '/metrics':
+            body = REGISTRY.expose().encode('utf-8')
+            self.send_bytes(200, body, 'text/plain; version=0.0.4; charset=utf-8', include_body)
+            return
+
+        asset = self.assets.get(path)
+        if asset is None:
+            self.send_bytes(404, b'Not Found', 'text/plain; charset=utf-8', include_body)
+            return
+
+        if self.not_modified(asset):
+            self.send_response(304)
+            self.send_cache_headers(asset)
+            self.end_headers()
+            return
+
+        encoding, body = asset.select(self.headers.get('Accept-Encoding'))
+        self.send_response(200)
+        self.send_header('Content-Type', asset.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_cache_headers(asset)
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+            HTTP_BYTES.inc(len(body), encoding=encoding or 'identity')
+
+    def not_modified(self, asset):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            return '*' in tags or asset.etag in tags
+
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since).timestamp() >= asset.mtime
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def send_response(self, code, message=None):
+        HTTP_REQUESTS.inc(code=code)
+        super().send_response(code, message)
+
+    def send_cache_headers(self, asset):
+        self.send_header('ETag', asset.etag)
+        self.send_header('Last-Modified', asset.last_modified)
+        self.send_header('Cache-Control', asset.cache_control)
+        if asset.encodings:
+            self.send_header('Vary', 'Accept-Encoding')
+
+    def send_bytes(self, status, body, content_type, include_body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+
+class PooledHTTPServer(http.server.HTTPServer):
+    """HTTP server that handles connections on a fixed-size thread pool"""
+
+    def __init__(self, server_address, handler_class, workers):
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http-worker')
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the Hero Making Auditor static site')
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--workers', type=int, default=WORKERS, help='Connections handled concurrently')
+    parser.add_argument('--root', default=os.path.dirname(os.path.abspath(__file__)), help='Directory to serve')
+    args = parser.parse_args()
+
+    StaticAssetHandler.assets = load_assets(args.root)
+
+    with PooledHTTPServer(("", args.port), StaticAssetHandler, args.workers) as httpd:
+        print(f"🚀 Hero Making Auditor serving at port {args.port} with {args.workers} workers")
+        print(f"📦 {len(StaticAssetHandler.assets)} assets cached in memory (brotli {'on' if brotli else 'off'})")
+        print(f"📱 Visit: http://localhost:{args.port}")
+        httpd.serve_forever()
+
 
 if __name__ == "__main__":
-    with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
-        print(f"🚀 Hero Making Auditor serving at port {PORT}")
-        print(f"📱 Visit: http://localhost:{PORT}")
-        httpd.serve_forever()
\ No newline at end of file
+    main()
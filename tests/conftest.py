@@ -0,0 +1,34 @@
+from pathlib import Path
+import sys
+
+# Tests import the app modules the same way app.py does
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+from synthetic import synthetic_customers
+
+# Dataset sizes benchmarked on every run, plus the one behind --bench-large
+DEFAULT_SIZES = [100, 10_000]
+LARGE_SIZE = 1_000_000
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-large",
+        action="store_true",
+        default=False,
+        help=f"also benchmark the {LARGE_SIZE:,} customer dataset"
+    )
+
+def pytest_generate_tests(metafunc):
+    if "dataset_size" in metafunc.fixturenames:
+        sizes = DEFAULT_SIZES + ([LARGE_SIZE] if metafunc.config.getoption("--bench-large") else [])
+        metafunc.parametrize("dataset_size", sizes, ids=[f"{size:_}" for size in sizes], scope="session")
+
+_datasets = {}
+
+@pytest.fixture(scope="session")
+def customers(dataset_size):
+    """Synthetic discovery customers, generated once per size per session"""
+    if dataset_size not in _datasets:
+        _datasets[dataset_size] = synthetic_customers(dataset_size)
+    return _datasets[dataset_size]
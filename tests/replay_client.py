@@ -0,0 +1,89 @@
+from pathlib import Path
+from types import SimpleNamespace
+from utils.apify_client import ApifyClient
+from utils.result_cache import cache_key
+import asyncio
+import itertools
+import json
+
+MOCK_DATA_DIR = Path(__file__).parent / "mock_data"
+
+def replay_key(actor_id, input_data):
+    """Key recorded runs like the result cache, ignoring the account owning the actor"""
+    return cache_key(actor_id.rsplit("/", 1)[-1], input_data)
+
+def load_recordings(directory=MOCK_DATA_DIR):
+    """Recorded actor runs from a directory of JSON files"""
+    recordings = {}
+    for path in sorted(Path(directory).glob("*.json")):
+        recording = json.loads(path.read_text(encoding="utf-8"))
+        recordings[replay_key(recording["actorId"], recording["input"])] = recording
+    return recordings
+
+class ReplayDataset:
+    def __init__(self, items):
+        self.items = items
+
+    def list_items(self, offset=0, limit=None):
+        end = None if limit is None else offset + limit
+        return SimpleNamespace(items=self.items[offset:end])
+
+class AsyncReplayDataset(ReplayDataset):
+    async def list_items(self, offset=0, limit=None):
+        return ReplayDataset.list_items(self, offset=offset, limit=limit)
+
+class ReplaySdk:
+    """Offline stand-in for the apify-client SDK that replays recorded runs"""
+
+    def __init__(self, recordings, run_seconds=0):
+        self.recordings = recordings
+        self.run_seconds = run_seconds
+        self.runs = {}
+        self.datasets = {}
+        self._ids = itertools.count(1)
+
+    def actor(self, actor_id):
+        return SimpleNamespace(start=lambda run_input, **kwargs: self._start(actor_id, run_input))
+
+    def user(self, user_id=None):
+        return SimpleNamespace(limits=self._limits)
+
+    async def _limits(self):
+        return None
+
+    def run(self, run_id):
+        return SimpleNamespace(wait_for_finish=lambda wait_secs=None: self._finish(run_id), abort=lambda: self._abort(run_id))
+
+    def dataset(self, dataset_id):
+        return AsyncReplayDataset(self.datasets[dataset_id])
+
+    async def _start(self, actor_id, run_input):
+        recording = self.recordings.get(replay_key(actor_id, run_input))
+        if recording is None:
+            raise Exception(f"No recorded run for {actor_id} with input {run_input}")
+
+        run_id = f"replay-{next(self._ids)}"
+        dataset_id = f"{run_id}-dataset"
+        self.datasets[dataset_id] = recording["items"]
+        self.runs[run_id] = {**recording["run"], "id": run_id, "defaultDatasetId": dataset_id}
+        return {"id": run_id, "status": "RUNNING", "defaultDatasetId": dataset_id}
+
+    async def _finish(self, run_id):
+        if self.run_seconds:
+            await asyncio.sleep(self.run_seconds)
+        return self.runs[run_id]
+
+    async def _abort(self, run_id):
+        self.runs[run_id] = {**self.runs[run_id], "status": "ABORTED"}
+        return self.runs[run_id]
+
+class ReplayApifyClient(ApifyClient):
+    """ApifyClient whose platform calls are answered from tests/mock_data"""
+
+    def __init__(self, recordings=None, run_seconds=0, timeout=None):
+        super().__init__("replay-token", timeout=timeout)
+        self.sdk = ReplaySdk(load_recordings() if recordings is None else recordings, run_seconds)
+        self.client = SimpleNamespace(dataset=lambda dataset_id: ReplayDataset(self.sdk.datasets[dataset_id]))
+
+    def _get_async_client(self, fail_on_limits=False):
+        return self.sdk
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+import numpy as np
+
+# Name parts combined into company names, so sizes up to millions of rows
+# still produce realistic spellings, suffixes and repeats
+NAME_PREFIXES = ["Acme", "Globex", "Initech", "Umbrella", "Stark", "Wayne", "Hooli", "Vandelay", "Wonka", "Cyberdyne",
+                 "Soylent", "Tyrell", "Aperture", "Massive", "Oscorp", "Gringotts", "Monarch", "Nakatomi", "Pied", "Dunder"]
+NAME_SUFFIXES = ["Industries", "Systems", "Labs", "Corp", "Inc", "LLC", "Ltd", "Company", "Group", "Technologies"]
+SOURCE_PATHS = ["/customers", "/case-studies", "/testimonials", "/clients", "/success-stories"]
+CONTEXTS = [
+    "{name} has been a happy customer since 2019 and relies on the platform daily.",
+    "Read the case study on how {name} cut onboarding time in half.",
+    "\"Switching was the best decision we made\" - VP Engineering, {name}",
+    "{name} is one of our enterprise clients across three regions.",
+    "Success story: {name} scaled to millions of users with our help.",
+]
+
+def synthetic_customers(size, seed=0, website="https://example.com"):
+    """Discovery actor customer records with the actor's output schema"""
+    rng = np.random.default_rng(seed)
+    prefixes = rng.integers(len(NAME_PREFIXES), size=size)
+    suffixes = rng.integers(len(NAME_SUFFIXES), size=size)
+    # Numbered names keep most rows distinct, like a real crawl
+    numbers = rng.integers(max(size // 4, 1), size=size)
+    sources = rng.integers(len(SOURCE_PATHS), size=size)
+    contexts = rng.integers(len(CONTEXTS), size=size)
+    confidences = np.round(rng.uniform(0.5, 0.99, size=size), 3)
+    offsets = rng.integers(0, 30 * 24 * 3600, size=size)
+
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    customers = []
+    for prefix, suffix, number, source, context, confidence, offset in zip(
+        prefixes.tolist(), suffixes.tolist(), numbers.tolist(), sources.tolist(),
+        contexts.tolist(), confidences.tolist(), offsets.tolist()
+    ):
+        name = f"{NAME_PREFIXES[prefix]} {number} {NAME_SUFFIXES[suffix]}"
+        discovered = start + timedelta(seconds=offset)
+        customers.append({
+            "name": name,
+            "source": website + SOURCE_PATHS[source],
+            "context": CONTEXTS[context].format(name=name),
+            "confidence": confidence,
+            "discoveredAt": discovered.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+        })
+    return customers
+
+def synthetic_result(size, company_name="Example", seed=0):
+    """A full discovery result record wrapping synthetic customers"""
+    customers = synthetic_customers(size, seed=seed)
+    return {
+        "companyName": company_name,
+        "companyWebsite": "https://example.com",
+        "timestamp": "2025-02-01T00:00:00.000Z",
+        "customers": customers,
+        "summary": {
+            "totalCustomersFound": len(customers),
+            "averageConfidence": round(sum(c["confidence"] for c in customers) / len(customers), 3) if customers else 0,
+            "urlsProcessed": len(SOURCE_PATHS)
+        },
+        "status": "SUCCESS"
+    }
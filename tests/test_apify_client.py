@@ -0,0 +1,129 @@
+from config import Config
+from utils.apify_client import ApifyClient, limit_error
+from utils.fake_apify import FakeApify, start_fake_apify_server
+from utils.run_scheduler import ActorLimitError, RunScheduler
+import asyncio
+import pytest
+import time
+
+ACTOR = "user/discovery"
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    server = start_fake_apify_server(fake=FakeApify(run_secs=10, dataset_size=3))
+    monkeypatch.setattr(Config, "APIFY_API_URL", server.url)
+    yield server
+    server.shutdown()
+
+@pytest.fixture
+def windows(fake_api, monkeypatch):
+    """waitForFinish windows the API was asked for, in seconds"""
+    asked = []
+    wait_for_run = fake_api.fake.wait_for_run
+
+    def recording(run_id, wait_secs):
+        asked.append(wait_secs)
+        return wait_for_run(run_id, wait_secs)
+
+    monkeypatch.setattr(fake_api.fake, "wait_for_run", recording)
+    return asked
+
+def client(**kwargs):
+    return ApifyClient("fake-token", scheduler=RunScheduler(max_runs=5, max_memory_mbytes=8192), **kwargs)
+
+async def start(apify_client):
+    return await apify_client._get_async_client().actor(ACTOR).start(run_input={"companyName": "Example"})
+
+def test_poll_windows_double_until_the_run_finishes(fake_api, windows):
+    fake_api.fake.run_secs = 3.5
+    apify_client = client()
+
+    async def scenario():
+        run = await start(apify_client)
+        return await apify_client.wait_for_run_async(run, asyncio.get_running_loop().time() + 30)
+
+    run = asyncio.run(scenario())
+
+    assert run["status"] == "SUCCEEDED"
+    # 1s, then 2s, then the 4s window the run finishes inside of
+    assert windows == [1, 2, 4]
+
+def test_runs_past_the_deadline_are_aborted(fake_api, windows):
+    apify_client = client()
+
+    async def scenario():
+        run = await start(apify_client)
+        with pytest.raises(Exception, match="exceeded timeout of 3s"):
+            await apify_client.wait_for_run_async(run, asyncio.get_running_loop().time() + 3.5, timeout_secs=3)
+        return run["id"]
+
+    run_id = asyncio.run(scenario())
+
+    assert fake_api.fake.runs[run_id]["outcome"] == "ABORTED"
+    # The third window is cut from 4s to what is left before the deadline
+    assert windows == [1, 2, 1]
+
+def test_runs_are_aborted_when_the_caller_gives_up(fake_api):
+    apify_client = client()
+
+    async def scenario():
+        discovery = asyncio.ensure_future(apify_client.run_customer_discovery_async({"companyName": "Example"}))
+        await asyncio.sleep(1)
+        discovery.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await discovery
+
+    asyncio.run(scenario())
+
+    (run,) = fake_api.fake.runs.values()
+    assert run["outcome"] == "ABORTED"
+    assert apify_client.scheduler.running == 0
+
+class SdkError(Exception):
+    def __init__(self, status_code, error_type=None, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.type = error_type
+        self.retry_after = retry_after
+
+def test_limit_errors_are_recognised():
+    error = limit_error(SdkError(429, "rate-limit-exceeded", retry_after=3))
+    assert isinstance(error, ActorLimitError)
+    assert error.retry_after == 3
+
+    assert limit_error(SdkError(402)).retry_after is None
+    assert isinstance(limit_error(SdkError(400, "actor-memory-limit-exceeded")), ActorLimitError)
+    assert limit_error(SdkError(400, "invalid-input")) is None
+
+def test_refused_starts_back_off_for_retry_after(fake_api, monkeypatch):
+    fake_api.fake.run_secs = 0.2
+    admit = fake_api.fake.admit
+
+    def refuse_the_first_start():
+        # Requests go: account limits, then the run start
+        return admit() and fake_api.fake.requests != 2
+
+    monkeypatch.setattr(fake_api.fake, "admit", refuse_the_first_start)
+    apify_client = client()
+
+    started = time.monotonic()
+    result = apify_client.run_customer_discovery({"companyName": "Example"})
+
+    assert result["companyName"] == "Example"
+    # Retried by the scheduler after the fake's Retry-After of 1s, not the 30s default
+    assert 1 <= time.monotonic() - started < 5
+    assert apify_client.scheduler.running == 0
+
+def test_runs_refused_throughout_raise_limit_errors(fake_api, monkeypatch):
+    monkeypatch.setattr("utils.run_scheduler.MAX_LIMIT_RETRIES", 2)
+    fake_api.fake.rate_limit_rate = 1.0
+    apify_client = client()
+
+    started = time.monotonic()
+    with pytest.raises(ActorLimitError):
+        apify_client.run_customer_discovery({"companyName": "Example"})
+
+    # One limits check and three starts, none retried inside the SDK
+    assert fake_api.fake.requests == 4
+    assert 2 <= time.monotonic() - started < 5
+    assert apify_client.scheduler.running == 0
@@ -0,0 +1,57 @@
+import os
+import pytest
+
+pytest.importorskip("streamlit")
+
+# Importing the app runs its script once in Streamlit's bare mode
+import app
+
+def load(path, minify=True):
+    stat = os.stat(path)
+    return app.load_html(str(path), stat.st_mtime_ns, stat.st_size, minify)
+
+def write(path, html, version):
+    path.write_text(html, encoding="utf-8")
+    # Distinct mtimes even on filesystems with coarse timestamps
+    os.utime(path, ns=(version * 10 ** 9, version * 10 ** 9))
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    app.load_html.clear()
+    yield
+    app.load_html.clear()
+
+def test_page_is_minified_once_per_version(tmp_path):
+    page = tmp_path / "index.html"
+    write(page, "<html>\n    <body>\n\n        <p>v1</p>\n    </body>\n</html>\n", 1)
+    assert load(page) == "<html>\n<body>\n<p>v1</p>\n</body>\n</html>"
+    assert load(page, minify=False).startswith("<html>\n    <body>")
+
+    # Same mtime and size: the cached copy is served without reading the file
+    page.write_text("<html>\n    <body>\n\n        <p>v2</p>\n    </body>\n</html>\n", encoding="utf-8")
+    os.utime(page, ns=(10 ** 9, 10 ** 9))
+    assert "<p>v1</p>" in load(page)
+
+def test_edits_invalidate_the_cache(tmp_path):
+    page = tmp_path / "index.html"
+    write(page, "<p>first</p>", 1)
+    assert load(page) == "<p>first</p>"
+    write(page, "<p>second, longer</p>", 2)
+    assert load(page) == "<p>second, longer</p>"
+
+def test_old_versions_are_evicted(tmp_path):
+    page = tmp_path / "index.html"
+    versions = []
+    for version in range(1, app.HTML_CACHE_ENTRIES + 2):
+        write(page, f"<p>{version}</p>", version)
+        load(page)
+        stat = os.stat(page)
+        versions.append((stat.st_mtime_ns, stat.st_size))
+
+    # The oldest version fell out, so asking for it reads the file again
+    mtime_ns, size = versions[0]
+    assert app.load_html(str(page), mtime_ns, size, True) == f"<p>{len(versions)}</p>"
+    # The newest is still cached
+    page.write_text("<p>x</p>", encoding="utf-8")
+    mtime_ns, size = versions[-1]
+    assert app.load_html(str(page), mtime_ns, size, True) == f"<p>{len(versions)}</p>"
@@ -0,0 +1,73 @@
+from config import Config
+from utils.batch_runner import BatchAuditRunner
+import json
+import pytest
+import threading
+
+class StubClient:
+    """Discovery that returns None for companies named in missing"""
+
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.calls = []
+        self.threads = set()
+
+    async def run_customer_discovery_async(self, input_data):
+        self.calls.append(input_data["companyName"])
+        self.threads.add(threading.current_thread().name)
+        if input_data["companyName"] in self.missing:
+            return None
+        return {"companyName": input_data["companyName"], "customers": [{"name": "Acme Inc"}]}
+
+def read_records(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return {record["companyName"]: record for record in map(json.loads, f)}
+
+def test_missing_results_are_failures_and_retried(tmp_path):
+    output = tmp_path / "results.jsonl"
+    companies = [{"companyName": "Found"}, {"companyName": "Missing"}]
+    client = StubClient(missing={"Missing"})
+
+    stats = BatchAuditRunner(client, output, workers=2).run(companies, progress=lambda message: None)
+    assert (stats["succeeded"], stats["failed"]) == (1, 1)
+    records = read_records(output)
+    assert records["Found"]["status"] == "SUCCEEDED"
+    assert records["Found"]["customerCount"] == 1
+    assert records["Missing"]["status"] == "FAILED"
+    assert records["Missing"]["error"] == "Discovery returned no result"
+
+    # Only the failure runs again
+    client.calls.clear()
+    stats = BatchAuditRunner(client, output, workers=2).run(companies, progress=lambda message: None)
+    assert client.calls == ["Missing"]
+    assert stats["skipped"] == 1
+
+def test_batch_results_merge_spellings_of_one_company(tmp_path):
+    class SpellingsClient(StubClient):
+        async def run_customer_discovery_async(self, input_data):
+            return {"companyName": input_data["companyName"],
+                    "customers": [{"name": "Acme Corp", "confidence": 0.9}, {"name": "ACME Corporation", "confidence": 0.7}]}
+
+    output = tmp_path / "results.jsonl"
+    BatchAuditRunner(SpellingsClient(), output).run([{"companyName": "Example"}], progress=lambda message: None)
+
+    record = read_records(output)["Example"]
+    assert record["customerCount"] == 1
+    assert record["result"]["customers"][0]["mentions"] == 2
+
+def test_batches_run_on_the_shared_http_loop(tmp_path):
+    client = StubClient()
+    for name in ("first", "second"):
+        BatchAuditRunner(client, tmp_path / f"{name}.jsonl").run([{"companyName": name}], progress=lambda message: None)
+    assert client.threads == {"http-loop"}
+
+def test_validate_only_requires_a_token_for_apify(monkeypatch):
+    monkeypatch.setattr(Config, "APIFY_TOKEN", None)
+    assert Config.validate("local")
+    with pytest.raises(ValueError, match="APIFY_TOKEN"):
+        Config.validate("apify")
+    with pytest.raises(ValueError, match="Unknown discovery backend"):
+        Config.validate("elsewhere")
+
+    monkeypatch.setattr(Config, "DISCOVERY_BACKEND", "local")
+    assert Config.validate()
@@ -0,0 +1,130 @@
+"""Offline regression benchmarks for the Python pipeline
+
+    pip install -r requirements-dev.txt
+    pytest tests/ --benchmark-autosave                 # record a baseline
+    pytest tests/ --benchmark-compare                  # compare against it
+    pytest tests/ --bench-large                        # include 1M customers
+"""
+import asyncio
+import pytest
+import time
+
+pytest.importorskip("pytest_benchmark")
+
+from config import Config
+from replay_client import ReplayApifyClient, load_recordings
+from utils.apify_client import ApifyClient
+from utils.data_processor import DataProcessor
+from utils.fake_apify import FakeApify, start_fake_apify_server
+from utils.import_profile import STARTUP_MODULES, profile_imports
+from utils.report_generator import ReportGenerator
+
+# Concurrent audits per round against the fake Apify API
+FAKE_API_AUDITS = 20
+
+# Whole-dataset operations on a million rows take seconds; a few rounds is
+# enough to see a regression without making the run take minutes
+LARGE_ROUNDS = 3
+
+def run_benchmark(benchmark, size, function, *args):
+    if size >= 1_000_000:
+        return benchmark.pedantic(function, args=args, rounds=LARGE_ROUNDS, iterations=1)
+    return benchmark(function, *args)
+
+def test_process_customers(benchmark, customers, dataset_size):
+    benchmark.group = f"process_customers[{dataset_size:_}]"
+    df = run_benchmark(benchmark, dataset_size, DataProcessor().process_customers, customers)
+    assert len(df) == dataset_size
+
+def test_generate_summary(benchmark, customers, dataset_size):
+    benchmark.group = f"generate_summary[{dataset_size:_}]"
+    summary = run_benchmark(benchmark, dataset_size, DataProcessor().generate_summary, customers)
+    assert summary["total_customers"] == dataset_size
+
+def test_generate_summary_from_frame(benchmark, customers, dataset_size):
+    benchmark.group = f"generate_summary[{dataset_size:_}]"
+    df = DataProcessor().process_customers(customers)
+    summary = run_benchmark(benchmark, dataset_size, DataProcessor().generate_summary, df)
+    assert summary["total_customers"] == dataset_size
+
+def test_generate_report(benchmark, customers, dataset_size):
+    benchmark.group = f"generate_report[{dataset_size:_}]"
+    data = {"companyName": "Example", "timestamp": "2025-02-01T00:00:00.000Z", "customers": customers}
+    html = run_benchmark(benchmark, dataset_size, ReportGenerator().generate_report, data)
+    assert html.count('class="customer"') == dataset_size
+
+def test_generate_report_from_frame(benchmark, customers, dataset_size):
+    benchmark.group = f"generate_report[{dataset_size:_}]"
+    df = DataProcessor().process_customers(customers)
+    data = {"companyName": "Example", "timestamp": "2025-02-01T00:00:00.000Z", "customers": df}
+    html = run_benchmark(benchmark, dataset_size, ReportGenerator().generate_report, data)
+    assert html.count('class="customer"') == dataset_size
+
+@pytest.fixture(scope="module")
+def recordings():
+    recordings = load_recordings()
+    assert recordings, "tests/mock_data has no recorded runs"
+    return recordings
+
+def test_replayed_discovery(benchmark, recordings):
+    client = ReplayApifyClient(recordings)
+    inputs = [recording["input"] for recording in recordings.values()]
+
+    def discover_all():
+        return [client.run_customer_discovery(input_data) for input_data in inputs]
+
+    results = benchmark(discover_all)
+    assert all(result["status"] == "SUCCESS" for result in results)
+
+def test_replayed_audit(benchmark, recordings):
+    """Discovery through report, as the app runs one audit"""
+    client = ReplayApifyClient(recordings)
+    processor = DataProcessor()
+    generator = ReportGenerator()
+    recording = next(iter(recordings.values()))
+    input_data = recording["input"]
+
+    def audit():
+        result = client.run_customer_discovery(input_data)
+        df = processor.process_customers(result["customers"])
+        summary = processor.generate_summary(df)
+        report = generator.generate_report({**result, "customers": df})
+        return summary, report
+
+    summary, report = benchmark(audit)
+    assert summary["total_customers"] == len(recording["items"][0]["customers"])
+    assert report.startswith("\n        <!DOCTYPE html>")
+
+def test_fake_api_audit_throughput(benchmark, monkeypatch):
+    """Concurrent discoveries over HTTP: polling, scheduling and pooling included"""
+    server = start_fake_apify_server(fake=FakeApify(run_secs=0.05, run_jitter_secs=0.2, dataset_size=50, seed=0))
+    monkeypatch.setattr(Config, "APIFY_API_URL", server.url)
+    client = ApifyClient("fake-token")
+    latencies = []
+
+    async def timed(input_data):
+        started = time.perf_counter()
+        result = await client.run_customer_discovery_async(input_data)
+        latencies.append(time.perf_counter() - started)
+        return result
+
+    async def audit_all():
+        return await asyncio.gather(*(
+            timed({"companyName": f"Company {i}", "companyWebsite": f"https://company{i}.example"})
+            for i in range(FAKE_API_AUDITS)
+        ))
+
+    try:
+        results = benchmark.pedantic(lambda: asyncio.run(audit_all()), rounds=3, iterations=1)
+    finally:
+        server.shutdown()
+
+    assert all(len(result["customers"]) == 50 for result in results)
+    latencies.sort()
+    benchmark.extra_info["p50_secs"] = latencies[len(latencies) // 2]
+    benchmark.extra_info["p95_secs"] = latencies[int(len(latencies) * 0.95) - 1]
+
+def test_cold_start_imports(benchmark):
+    """A fresh interpreter importing what the app needs for its first page"""
+    entries = benchmark.pedantic(profile_imports, args=(STARTUP_MODULES,), rounds=5, iterations=1)
+    benchmark.extra_info["import_ms"] = sum(cumulative_us for _, _, cumulative_us, depth in entries if depth == 0) / 1000
@@ -0,0 +1,33 @@
+from synthetic import synthetic_customers
+from utils.customer_records import CustomerRecords
+from utils.data_processor import DataProcessor
+from utils.report_generator import ReportGenerator
+import pickle
+
+def test_round_trips_dicts_json_and_frames():
+    customers = synthetic_customers(500)
+    customers[7] = {"name": "Partial Co", "sources": ["https://example.com/a"], "mentions": 2}
+    records = CustomerRecords.from_dicts(customers)
+
+    assert len(records) == len(customers)
+    assert records.to_dicts() == customers
+    assert CustomerRecords.from_json(records.to_json()).to_dicts() == customers
+    assert pickle.loads(pickle.dumps(records)).to_dicts() == customers
+    assert CustomerRecords.from_frame(records.to_frame()).to_dicts() == customers
+
+def test_sources_are_interned():
+    records = CustomerRecords.from_dicts(synthetic_customers(1000))
+    assert len(records.sources) == len({customer["source"] for customer in records})
+
+def test_processor_and_report_accept_records():
+    customers = synthetic_customers(300)
+    records = CustomerRecords.from_dicts(customers)
+    processor = DataProcessor()
+    generator = ReportGenerator()
+
+    frame = processor.process_customers(records)
+    assert frame["confidence"].dtype == "float32"
+    assert frame["source"].dtype == "category"
+    assert processor.generate_summary(records) == processor.generate_summary(customers)
+    assert generator.generate_report({"companyName": "Example", "customers": records}) == \
+        generator.generate_report({"companyName": "Example", "customers": customers})
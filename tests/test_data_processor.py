@@ -0,0 +1,89 @@
+from synthetic import synthetic_customers
+from utils.data_processor import DataProcessor
+from utils.report_generator import ReportGenerator
+import importlib.util
+import pandas as pd
+import pytest
+
+requires_arrow = pytest.mark.skipif(importlib.util.find_spec("pyarrow") is None, reason="pyarrow not installed")
+
+def both_paths(customers):
+    return (
+        DataProcessor(use_arrow=True).build_frame(customers),
+        DataProcessor(use_arrow=False).build_frame(customers)
+    )
+
+def assert_same_frame(arrow, plain):
+    assert list(arrow.columns) == list(plain.columns)
+    for column in arrow.columns:
+        assert arrow[column].dtype == plain[column].dtype, column
+        assert arrow[column].astype(object).where(arrow[column].notna(), None).tolist() == \
+            plain[column].astype(object).where(plain[column].notna(), None).tolist(), column
+
+@requires_arrow
+def test_arrow_and_pandas_paths_agree():
+    arrow, plain = both_paths(synthetic_customers(300))
+    assert arrow["source"].dtype == "category"
+    assert arrow["confidence"].dtype == "float32"
+    assert str(arrow["discoveredAt"].dt.tz) == "UTC"
+    assert_same_frame(arrow, plain)
+
+@requires_arrow
+def test_timestamps_parse_the_same_with_and_without_offsets():
+    customers = [
+        {"name": "A", "discoveredAt": "2025-01-01T10:00:00.000Z"},
+        {"name": "B", "discoveredAt": "2025-01-01T10:00:00"},
+        {"name": "C", "discoveredAt": "2025-01-01T12:00:00+02:00"},
+        {"name": "D", "discoveredAt": None}
+    ]
+    arrow, plain = both_paths(customers)
+    assert_same_frame(arrow, plain)
+    expected = pd.Timestamp("2025-01-01T10:00:00Z")
+    assert arrow["discoveredAt"].tolist()[:3] == [expected] * 3
+    assert arrow["discoveredAt"].isna().tolist() == [False, False, False, True]
+
+@requires_arrow
+def test_chunk_without_sources():
+    customers = [{"name": "A", "source": None, "confidence": None}, {"name": "B", "source": None, "confidence": 0.9}]
+    arrow, plain = both_paths(customers)
+    assert arrow["source"].dtype == "category"
+    assert arrow["source"].isna().all()
+    assert_same_frame(arrow, plain)
+
+@requires_arrow
+def test_merged_sources_stay_lists():
+    customers = synthetic_customers(50) + [dict(customer) for customer in synthetic_customers(50)[:10]]
+    merged = DataProcessor(use_arrow=True).resolve_entities(customers)
+    assert isinstance(merged["sources"].iloc[0], list)
+    assert_same_frame(merged, DataProcessor(use_arrow=False).resolve_entities(customers))
+
+@pytest.mark.parametrize("chunk_size", [7, 10000])
+def test_streamed_summary_matches_frame_summary(chunk_size):
+    customers = synthetic_customers(100)
+    customers[3] = {"name": "No Score Inc"}
+    processor = DataProcessor(chunk_size=chunk_size)
+
+    streamed = processor.generate_summary(iter(customers))
+    assert streamed == processor.generate_summary(processor.build_frame(customers))
+    assert streamed["total_customers"] == 100
+    assert streamed["confidence_stats"]["count"] == 99
+
+def test_summary_without_confidence_or_customers():
+    processor = DataProcessor()
+    assert processor.generate_summary(iter([])) == {}
+    assert processor.generate_summary([{"name": "A"}]) == {
+        "total_customers": 1, "avg_confidence": 0, "high_confidence_count": 0
+    }
+
+def test_report_renders_multi_source_customers():
+    customers = [
+        {"name": "Acme Inc", "source": "https://example.com/customers", "context": "Acme Inc uses us", "confidence": 0.9},
+        {"name": "Acme, Inc.", "source": "https://example.com/case-studies", "context": "Acme again", "confidence": 0.8},
+        {"name": "Globex", "source": "https://example.com/customers", "context": "Globex too", "confidence": 0.7}
+    ]
+    merged = DataProcessor().resolve_entities(customers)
+    assert any(len(sources) > 1 for sources in merged["sources"])
+
+    report = ReportGenerator().generate_report({"companyName": "Example", "customers": merged})
+    assert report.count('class="customer"') == 2
+    assert "Total Customers Found: 2" in report
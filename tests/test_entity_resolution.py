@@ -0,0 +1,83 @@
+from utils.data_processor import DataProcessor, EntityResolver, canonical_name
+import pytest
+
+@pytest.mark.parametrize("name, canonical", [
+    ("Acme Inc", "acme"),
+    ("ACME, Inc.", "acme"),
+    ("Acme Co., Ltd.", "acme"),
+    ("Acme Corporation", "acme"),
+    ("Co-op Bank", "co op bank"),
+    ("Incorporated Widgets LLC", "incorporated widgets"),
+    ("Acme Corporation of America", "acme corporation of america"),
+    ("Company Inc", "company"),
+    ("Inc.", "inc"),
+])
+def test_canonical_name_strips_trailing_suffixes_only(name, canonical):
+    assert canonical_name(name) == canonical
+
+def test_cluster_joins_near_duplicates_only():
+    keys = ["globex industries", "globex industriess", "initech", "acme"]
+    roots = EntityResolver().cluster(keys)
+    assert roots[0] == roots[1]
+    assert len({roots[0], roots[2], roots[3]}) == 3
+    assert EntityResolver().cluster([]) == []
+
+def mention(name, source, confidence, discovered_at):
+    return {"name": name, "source": source, "context": f"{name} is a customer", "confidence": confidence,
+            "discoveredAt": discovered_at}
+
+def test_resolve_merges_the_evidence_of_each_company():
+    customers = [
+        mention("Acme Inc", "https://example.com/customers", 0.7, "2025-01-03T00:00:00.000Z"),
+        mention("ACME, Inc.", "https://example.com/case-studies", 0.9, "2025-01-02T00:00:00.000Z"),
+        mention("Acme Inc", "https://example.com/customers", 0.6, "2025-01-01T00:00:00.000Z"),
+        mention("Initech", "https://example.com/customers", 0.8, "2025-01-05T00:00:00.000Z"),
+        mention("Inc.", "https://example.com/clients", 0.5, "2025-01-05T00:00:00.000Z"),
+        {"name": "", "source": "https://example.com/clients"}
+    ]
+    merged = {customer["canonicalName"]: customer for customer in EntityResolver().resolve(customers)}
+
+    assert sorted(merged) == ["acme", "inc", "initech"]
+    acme = merged["acme"]
+    assert acme["name"] == "Acme Inc"  # the most frequent spelling
+    assert acme["confidence"] == 0.9
+    assert acme["context"] == "ACME, Inc. is a customer"  # from the best mention
+    assert acme["sources"] == ["https://example.com/customers", "https://example.com/case-studies"]
+    assert acme["mentions"] == 3
+    assert acme["discoveredAt"] == "2025-01-01T00:00:00.000Z"
+    assert merged["initech"]["mentions"] == 1
+
+def test_resolving_merged_customers_again_keeps_their_counts():
+    customers = [mention("Acme Inc", f"https://example.com/{i}", 0.8, "2025-01-01T00:00:00.000Z") for i in range(3)]
+    once = EntityResolver().resolve(customers)
+    twice = EntityResolver().resolve(once + [mention("Acme", "https://example.com/new", 0.5, "2025-01-02T00:00:00.000Z")])
+
+    assert len(twice) == 1
+    assert twice[0]["mentions"] == 4
+    assert twice[0]["sources"] == [f"https://example.com/{i}" for i in range(3)] + ["https://example.com/new"]
+
+def test_processor_resolves_into_a_frame():
+    frame = DataProcessor().resolve_entities([
+        mention("Acme Inc", "https://example.com/a", 0.7, "2025-01-01T00:00:00.000Z"),
+        mention("Acme LLC", "https://example.com/b", 0.8, "2025-01-01T00:00:00.000Z")
+    ])
+    assert len(frame) == 1
+    assert frame["mentions"].tolist() == [2]
+    assert frame["confidence"].dtype == "float32"
+
+def test_results_are_resolved_before_they_are_stored():
+    result = {
+        "companyName": "Example",
+        "customers": [
+            mention("ACME Corporation", "https://example.com/b", 0.7, "2025-01-01T00:00:00.000Z"),
+            mention("Globex", "https://example.com/a", 0.6, "2025-01-01T00:00:00.000Z"),
+            mention("Acme Corp", "https://example.com/a", 0.9, "2025-01-01T00:00:00.000Z")
+        ],
+        "summary": {"totalCustomersFound": 3, "urlsProcessed": 2}
+    }
+
+    resolved = DataProcessor().resolve_result(result)
+
+    assert [customer["name"] for customer in resolved["customers"]] == ["Acme Corp", "Globex"]
+    assert resolved["summary"] == {"totalCustomersFound": 2, "averageConfidence": 0.75, "urlsProcessed": 2}
+    assert len(result["customers"]) == 3
@@ -0,0 +1,54 @@
+from pathlib import Path
+from utils.extraction_engine import ExtractionEngine
+import json
+import re
+import shutil
+import subprocess
+import pytest
+
+ACTOR_PATH = Path(__file__).resolve().parent.parent / "actors" / "hero-customer-discovery" / "main.js"
+
+# Scraped text keeps &nbsp; and friends as Unicode whitespace
+TEXTS = [
+    "  Acme\u00a0Corp: 40% faster onboarding with Example, says the customer.\u00a0 ",
+    "Our client Acme Corp shared a case study. ",
+    "Globex\u2009Inc, Initech Ltd & Umbrella Company: testimonial",
+    "Success story from\u3000Stark Industries and Wayne Enterprises LLC",
+    "\ufeffExample Inc works with Hooli\u202fInc and Pied Piper Company\n\tcustomer",
+    "no capitalised names at all"
+]
+
+def actor_extraction(company_name, texts):
+    """The actor's own regex, trim and calculateConfidence run under node"""
+    source = ACTOR_PATH.read_text(encoding="utf-8")
+    pattern = re.search(r"const companyPattern = (/.*/g);", source).group(1)
+    confidence = re.search(r"^function calculateConfidence.*?^}", source, re.M | re.S).group(0)
+    script = f"""
+        {confidence}
+        const texts = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+        const companyName = {json.dumps(company_name)};
+        const found = [];
+        for (const raw of texts) {{
+            const text = raw.trim();
+            const companyPattern = {pattern};
+            let match;
+            while ((match = companyPattern.exec(text)) !== null) {{
+                const customerName = match[1].trim();
+                if (customerName.length > 2 && customerName.length < 50 &&
+                    !customerName.toLowerCase().includes(companyName.toLowerCase())) {{
+                    found.push([customerName, calculateConfidence(text, customerName)]);
+                }}
+            }}
+        }}
+        console.log(JSON.stringify(found));
+    """
+    completed = subprocess.run(["node", "-e", script], input=json.dumps(texts), capture_output=True, text=True, check=True)
+    return [(name, round(score, 3)) for name, score in json.loads(completed.stdout)]
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_extraction_matches_the_actor():
+    mentions = ExtractionEngine("Example").extract([("https://example.com", text) for text in TEXTS])
+
+    assert [(mention["name"], mention["confidence"]) for mention in mentions] == actor_extraction("Example", TEXTS)
+    # A non-breaking space doesn't split a name in two
+    assert mentions[0]["name"] == "Acme\u00a0Corp"
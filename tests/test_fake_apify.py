@@ -0,0 +1,56 @@
+from config import Config
+from utils.apify_client import ApifyClient
+from utils.fake_apify import FakeApify, start_fake_apify_server
+from utils.report_exporter import export_batch, iter_dataset_results
+import httpx
+import pytest
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    server = start_fake_apify_server(fake=FakeApify(run_secs=0.2, dataset_size=5, seed=0))
+    monkeypatch.setattr(Config, "APIFY_API_URL", server.url)
+    yield server
+    server.shutdown()
+
+def test_discovery_runs_against_fake_api(fake_api):
+    result = ApifyClient("fake-token").run_customer_discovery(
+        {"companyName": "Example", "companyWebsite": "https://example.com"}
+    )
+
+    assert result["companyName"] == "Example"
+    assert len(result["customers"]) == 5
+    assert fake_api.fake.runs, "the run was not started on the fake API"
+
+def test_failed_runs_surface_as_errors(fake_api):
+    fake_api.fake.failure_rate = 1.0
+    with pytest.raises(Exception, match="FAILED"):
+        ApifyClient("fake-token").run_customer_discovery({"companyName": "Example"})
+
+def test_rate_limit_injection(fake_api):
+    fake_api.fake.rate_limit_rate = 1.0
+    response = httpx.post(f"{fake_api.url}/v2/acts/user~actor/runs", json={})
+
+    assert response.status_code == 429
+    assert response.json()["error"]["type"] == "rate-limit-exceeded"
+    assert fake_api.fake.rate_limited == 1
+
+def test_dataset_items_stream_page_by_page(fake_api):
+    fake = fake_api.fake
+    fake.datasets["history"] = [fake.result({"companyName": f"Company {i}"}, 0) for i in range(7)]
+    requests_before = fake.requests
+
+    items = list(ApifyClient("fake-token").iter_dataset_items("history", page_size=3))
+
+    assert [item["companyName"] for item in items] == [f"Company {i}" for i in range(7)]
+    # Two full pages and the short one that ends the stream
+    assert fake.requests - requests_before == 3
+
+def test_reports_export_from_a_dataset(fake_api, tmp_path):
+    fake = fake_api.fake
+    fake.datasets["history"] = [fake.result({"companyName": f"Company {i}"}, 0) for i in range(3)]
+
+    results = iter_dataset_results(ApifyClient("fake-token"), "history")
+    stats = export_batch(results, tmp_path, ["html"], workers=1, progress=lambda message: None)
+
+    assert stats == {"exported": 3, "failed": 0, "files": 3}
+    assert sorted(path.name for path in tmp_path.iterdir()) == [f"company-{i}.html" for i in range(3)]
@@ -0,0 +1,92 @@
+from synthetic import synthetic_customers
+from utils.data_processor import DataProcessor
+from utils.history_store import HistoryStore
+import pytest
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path / "history.sqlite3"))
+
+def result(company, customers, timestamp="2025-02-01T00:00:00.000Z"):
+    return {"companyName": company, "companyWebsite": "https://example.com", "timestamp": timestamp,
+            "status": "SUCCESS", "customers": customers}
+
+def query_plan(store, sql, params):
+    return " ".join(row[3] for row in store._conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall())
+
+def test_audits_round_trip_from_lists_and_frames(store):
+    customers = synthetic_customers(20)
+    processor = DataProcessor()
+    frame = processor.process_customers(customers)
+    summary = processor.generate_summary(frame)
+
+    from_list = store.save_audit(result("Example", customers), summary)
+    from_frame = store.save_audit(result("Example", customers), summary, customers=frame)
+
+    for audit_id in (from_list, from_frame):
+        audit = store.get_audit(audit_id)
+        assert audit["total_customers"] == 20
+        assert audit["avg_confidence"] == pytest.approx(summary["avg_confidence"])
+        assert audit["summary"]["high_confidence_count"] == summary["high_confidence_count"]
+        assert [customer["confidence"] for customer in audit["customers"]] == \
+            sorted((customer["confidence"] for customer in audit["customers"]), reverse=True)
+        assert {customer["name"] for customer in audit["customers"]} == {customer["name"] for customer in customers}
+
+    by_name = {customer["name"]: customer for customer in store.get_audit(from_frame)["customers"]}
+    original = customers[0]
+    assert by_name[original["name"]]["discoveredAt"] == original["discoveredAt"]
+    assert store.get_audit(12345) is None
+
+def test_recent_audits_page_by_id_and_filter_by_company(store):
+    ids = [store.save_audit(result(name, [])) for name in ("Acme", "Globex", "acme ", "Acme", "Initech")]
+
+    first = store.recent_audits(limit=2)
+    assert [audit["id"] for audit in first] == ids[:-3:-1]
+    second = store.recent_audits(limit=2, before_id=first[-1]["id"])
+    assert [audit["id"] for audit in second] == [ids[2], ids[1]]
+
+    assert [audit["id"] for audit in store.recent_audits(company="ACME")] == [ids[3], ids[2], ids[0]]
+    assert store.latest_audit("acme")["id"] == ids[3]
+    assert store.latest_audit("Nobody") is None
+
+def test_find_customers_filters(store):
+    store.save_audit(result("Example", [
+        {"name": "Acme Inc", "source": "https://example.com/a", "confidence": 0.9, "discoveredAt": "2025-01-10T00:00:00.000Z"},
+        {"name": "Globex", "source": "https://example.com/b", "confidence": 0.6, "discoveredAt": "2025-01-01T00:00:00.000Z"},
+        {"name": None, "source": "https://example.com/c", "confidence": 0.99}
+    ]))
+    store.save_audit(result("Other", [
+        {"name": "ACME  inc", "source": "https://other.com/a", "confidence": 0.7, "discoveredAt": "2025-01-20T00:00:00.000Z"}
+    ]))
+
+    acme = store.find_customers(name="acme inc")
+    assert [(customer["company_name"], customer["confidence"]) for customer in acme] == [("Example", 0.9), ("Other", 0.7)]
+    assert [customer["name"] for customer in store.find_customers(min_confidence=0.65)] == ["Acme Inc", "ACME  inc"]
+    assert [customer["name"] for customer in store.find_customers(since="2025-01-05T00:00:00.000Z")] == ["Acme Inc", "ACME  inc"]
+    assert [customer["name"] for customer in store.find_customers(limit=1, offset=1)] == ["ACME  inc"]
+
+def test_queries_use_indexes(store):
+    assert "idx_audits_company" in query_plan(
+        store, "SELECT id FROM audits WHERE company_key = ? ORDER BY id DESC LIMIT 10", ("acme",)
+    )
+    assert "idx_customers_name" in query_plan(
+        store, "SELECT name FROM customers WHERE name_key = ? ORDER BY confidence DESC", ("acme",)
+    )
+    assert "idx_customers_audit" in query_plan(
+        store, "SELECT name FROM customers WHERE audit_id = ? ORDER BY confidence DESC", (1,)
+    )
+    assert "idx_customers_discovered" in query_plan(
+        store, "SELECT name FROM customers WHERE discovered_at >= ?", ("2025-01-01",)
+    )
+
+def test_page_states_upsert_per_company(store):
+    store.save_page_states("Acme", {
+        "https://acme.com/customers": {"etag": '"1"', "contentHash": "a"},
+        "https://acme.com/broken": {"etag": '"2"'}
+    })
+    store.save_page_states("ACME", {"https://acme.com/customers": {"lastModified": "Mon", "contentHash": "b"}})
+
+    assert store.page_states("acme") == {
+        "https://acme.com/customers": {"etag": None, "lastModified": "Mon", "contentHash": "b"}
+    }
+    assert store.page_states("Globex") == {}
@@ -0,0 +1,99 @@
+from utils.fake_apify import FakeApify, start_fake_apify_server
+from utils.http_session import HostLimitedAsyncTransport, HostLimitedTransport, HostLimiter, PooledSession, is_long_poll
+import asyncio
+import httpx
+import pytest
+import threading
+import time
+
+@pytest.fixture
+def fake_api():
+    server = start_fake_apify_server(fake=FakeApify(run_secs=1.5))
+    yield server
+    server.shutdown()
+
+def start_run(fake_api):
+    return fake_api.fake.start_run("test/actor", {"companyName": "Example"})["id"]
+
+def test_long_polls_are_recognised():
+    assert is_long_poll({"waitForFinish": "60"})
+    assert not is_long_poll({"waitForFinish": "0"})
+    assert not is_long_poll({})
+
+def test_long_polls_do_not_hold_request_slots(fake_api):
+    run_id = start_run(fake_api)
+    client = httpx.Client(transport=HostLimitedTransport(HostLimiter(max_per_host=1, max_long_polls=1)))
+    poll = threading.Thread(
+        target=client.get, args=(f"{fake_api.url}/v2/actor-runs/{run_id}",), kwargs={"params": {"waitForFinish": 60}}
+    )
+    poll.start()
+    time.sleep(0.2)
+
+    started = time.monotonic()
+    response = client.get(f"{fake_api.url}/v2/actor-runs/{run_id}")
+    elapsed = time.monotonic() - started
+    poll.join()
+
+    assert response.json()["data"]["status"] == "RUNNING"
+    assert elapsed < 1.0
+
+def test_async_long_polls_do_not_hold_request_slots(fake_api):
+    run_id = start_run(fake_api)
+    url = f"{fake_api.url}/v2/actor-runs/{run_id}"
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=HostLimitedAsyncTransport(1, max_long_polls=1)) as client:
+            async def timed(**params):
+                await client.get(url, params=params)
+                return time.monotonic() - started
+
+            started = time.monotonic()
+            poll = asyncio.create_task(timed(waitForFinish=60))
+            await asyncio.sleep(0.2)
+            plain = await timed()
+            return plain, await poll
+
+    plain, poll = asyncio.run(scenario())
+
+    assert plain < 1.0
+    assert poll >= 1.4
+
+def test_pooled_session_waits_out_retry_after(fake_api, monkeypatch):
+    admit = fake_api.fake.admit
+    refused = []
+
+    def refuse_once():
+        # The fake answers a refusal with a 429 and Retry-After: 1
+        if not refused:
+            refused.append(True)
+            return False
+        return admit()
+
+    monkeypatch.setattr(fake_api.fake, "admit", refuse_once)
+
+    started = time.monotonic()
+    response = PooledSession(HostLimiter()).get(f"{fake_api.url}/v2/users/me/limits", timeout=5)
+
+    assert response.status_code == 200
+    assert refused == [True]
+    assert time.monotonic() - started >= 1
+
+def test_deploy_creates_the_repo_through_the_shared_session(monkeypatch, capsys):
+    import deploy
+
+    posted = []
+
+    class Refusing:
+        status_code = 422
+        text = "name already exists"
+
+    class Session:
+        def post(self, url, **kwargs):
+            posted.append(url)
+            return Refusing()
+
+    monkeypatch.setattr(deploy.HTTP_SESSIONS, "session", lambda: Session())
+    deploy.HeroMakingAuditorDeployer(github_token="token").create_github_repo()
+
+    assert posted == ["https://api.github.com/user/repos"]
+    assert "name already exists" in capsys.readouterr().out
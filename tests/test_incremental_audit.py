@@ -0,0 +1,165 @@
+from pathlib import Path
+from utils.batch_runner import BatchAuditRunner
+from utils.history_store import HistoryStore
+from utils.incremental_audit import IncrementalAuditor
+from utils.job_queue import AuditJobHandler
+from utils.result_cache import cache_key
+from utils.single_flight import CoalescingApifyClient, SingleFlight
+import asyncio
+import json
+import pytest
+import re
+import shutil
+import subprocess
+
+ACTOR = "user/discovery"
+ACTOR_PATH = Path(__file__).resolve().parent.parent / "actors" / "hero-customer-discovery" / "main.js"
+CUSTOMERS_URL = "https://example.com/customers"
+CASES_URL = "https://example.com/case-studies"
+
+def customer(name, source, confidence):
+    return {"name": name, "source": source, "context": f"{name} uses Example", "confidence": confidence,
+            "discoveredAt": "2025-01-01T00:00:00.000Z"}
+
+def page(status, content_hash):
+    return {"etag": f'"{content_hash}"', "lastModified": None, "contentHash": content_hash, "status": status}
+
+class DeltaClient:
+    """Discovery that replays queued results and records the inputs it got"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.inputs = []
+
+    async def run_customer_discovery_async(self, input_data):
+        self.inputs.append(input_data)
+        return self.results.pop(0)
+
+    def run_customer_discovery(self, input_data):
+        return asyncio.run(self.run_customer_discovery_async(input_data))
+
+FULL_RUN = {
+    "companyName": "Example",
+    "status": "SUCCESS",
+    "customers": [customer("Acme Inc", CUSTOMERS_URL, 0.9), customer("Globex", CASES_URL, 0.7)],
+    "pages": {CUSTOMERS_URL: page("new", "a1"), CASES_URL: page("new", "b1")}
+}
+
+DELTA_RUN = {
+    "companyName": "Example",
+    "status": "SUCCESS",
+    "customers": [customer("Initech", CASES_URL, 0.8)],
+    "pages": {CUSTOMERS_URL: page("unchanged", "a1"), CASES_URL: page("changed", "b2")}
+}
+
+@pytest.fixture
+def history(tmp_path):
+    return HistoryStore(str(tmp_path / "history.sqlite3"))
+
+def test_previous_pages_are_part_of_the_key():
+    input_data = {"companyName": "Example"}
+    pages = {CUSTOMERS_URL: {"etag": '"a1"', "contentHash": "a1"}}
+
+    assert cache_key(ACTOR, {**input_data, "previousPages": {}}) == cache_key(ACTOR, input_data)
+    assert cache_key(ACTOR, {**input_data, "previousPages": pages}) != cache_key(ACTOR, input_data)
+    assert cache_key(ACTOR, {**input_data, "previousPages": pages}) != \
+        cache_key(ACTOR, {**input_data, "previousPages": {CUSTOMERS_URL: {"etag": '"a2"', "contentHash": "a2"}}})
+
+def test_delta_runs_are_not_coalesced_with_full_runs():
+    class SlowClient:
+        calls = 0
+
+        async def run_customer_discovery_async(self, input_data):
+            SlowClient.calls += 1
+            await asyncio.sleep(0.05)
+            return {"previousPages": input_data.get("previousPages")}
+
+    client = CoalescingApifyClient(SlowClient(), single_flight=SingleFlight())
+
+    async def run_both():
+        return await asyncio.gather(
+            client.run_customer_discovery_async({"companyName": "Example"}),
+            client.run_customer_discovery_async({"companyName": "Example", "previousPages": {CUSTOMERS_URL: {"contentHash": "a1"}}})
+        )
+
+    full, delta = asyncio.run(run_both())
+    assert SlowClient.calls == 2
+    assert full["previousPages"] is None
+    assert delta["previousPages"] == {CUSTOMERS_URL: {"contentHash": "a1"}}
+
+def test_delta_is_merged_into_the_last_audit(history):
+    client = DeltaClient(FULL_RUN, DELTA_RUN)
+    auditor = IncrementalAuditor(client, history)
+
+    auditor.run({"companyName": "Example"})
+    assert client.inputs[0]["previousPages"] == {}
+    assert history.page_states("example")[CASES_URL]["contentHash"] == "b1"
+
+    result = auditor.run({"companyName": "Example"})
+    assert client.inputs[1]["previousPages"][CUSTOMERS_URL]["contentHash"] == "a1"
+    # Acme's page was unchanged, so it's kept; Globex's page changed and now lists Initech
+    assert [c["name"] for c in result["customers"]] == ["Acme Inc", "Initech"]
+    assert result["summary"]["pagesUnchanged"] == 1
+    assert history.page_states("example")[CASES_URL]["contentHash"] == "b2"
+
+    audits = history.recent_audits(company="Example")
+    assert len(audits) == 2
+    assert audits[0]["total_customers"] == 2
+    assert audits[0]["avg_confidence"] == pytest.approx(0.85)
+
+def test_other_spellings_in_the_delta_merge_with_kept_customers(history):
+    delta = {**DELTA_RUN, "customers": [customer("ACME Corporation", CASES_URL, 0.8)]}
+    auditor = IncrementalAuditor(DeltaClient(delta), history)
+
+    result = auditor.merge(FULL_RUN, delta)
+
+    (acme,) = result["customers"]
+    assert acme["name"] == "Acme Inc"
+    assert acme["sources"] == [CUSTOMERS_URL, CASES_URL]
+    assert result["summary"]["totalCustomersFound"] == 1
+
+def test_job_handler_runs_incremental_audits(history):
+    client = DeltaClient(FULL_RUN, DELTA_RUN)
+    handler = AuditJobHandler(lambda token: client, history)
+    reports = {}
+
+    handler({"companyName": "Example"}, "token", reports.__setitem__)
+    handler({"companyName": "Example", "incremental": True}, "token", reports.__setitem__)
+
+    assert "previousPages" not in client.inputs[0]
+    assert "incremental" not in client.inputs[1]
+    assert client.inputs[1]["previousPages"][CASES_URL]["contentHash"] == "b1"
+    assert [c["name"] for c in reports["discovery"]["customers"]] == ["Acme Inc", "Initech"]
+    # The handler stores the merged audit once, with its summary
+    assert [audit["avg_confidence"] is not None for audit in history.recent_audits()] == [True, True]
+
+def test_batch_audits_run_through_the_auditor(history, tmp_path):
+    client = DeltaClient(FULL_RUN, DELTA_RUN)
+    auditor = IncrementalAuditor(client, history)
+    for run in ("first", "second"):
+        stats = BatchAuditRunner(auditor, tmp_path / f"{run}.jsonl").run([{"companyName": "Example"}], progress=lambda message: None)
+        assert stats["succeeded"] == 1
+
+    assert client.inputs[1]["previousPages"]
+    assert history.latest_audit("Example")["total_customers"] == 2
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_actor_lets_not_modified_pages_reach_its_handler():
+    # Crawlee rejects responses without an HTML Content-Type before the
+    # request handler runs; the actor's hook has to label 304s first
+    source = ACTOR_PATH.read_text(encoding="utf-8")
+    assert "postNavigationHooks: [acceptNotModified]" in source
+    hook = re.search(r"^function acceptNotModified.*?^}", source, re.M | re.S).group(0)
+    script = hook + """
+        const responses = [
+            { statusCode: 304, headers: { etag: '"a2"' } },
+            { statusCode: 304, headers: { 'content-type': 'text/html; charset=utf-8' } },
+            { statusCode: 200, headers: {} }
+        ];
+        responses.forEach(response => acceptNotModified({ response }));
+        acceptNotModified({});
+        console.log(JSON.stringify(responses.map(response => response.headers['content-type'] || null)));
+    """
+    completed = subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True)
+
+    assert json.loads(completed.stdout) == ["text/html", "text/html; charset=utf-8", None]
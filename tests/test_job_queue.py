@@ -0,0 +1,92 @@
+from config import Config
+from utils.job_queue import AuditJobHandler, JobQueue
+import pytest
+import threading
+import time
+
+def never_called(input_data, token, report):
+    raise AssertionError("the job should not run")
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+def test_jobs_are_claimed_oldest_first(path):
+    queue = JobQueue(never_called, path=path)
+    first = queue.submit({"companyName": "A"}, secret="token")
+    second = queue.submit({"companyName": "B"}, secret="token")
+
+    assert queue.claim()["id"] == first
+    assert queue.claim()["id"] == second
+    assert queue.claim() is None
+    assert queue.get(first)["status"] == "RUNNING"
+
+def test_other_processes_do_not_claim_jobs_holding_a_token(path):
+    submitter = JobQueue(never_called, path=path)
+    other = JobQueue(never_called, path=path)
+    job_id = submitter.submit({"companyName": "A"}, secret="token")
+
+    assert other.claim() is None
+    assert submitter.claim()["id"] == job_id
+
+def test_orphaned_jobs_fail_instead_of_running_under_another_token(path):
+    gone = JobQueue(never_called, path=path)
+    queued = gone.submit({"companyName": "A"}, secret="token")
+    running = gone.submit({"companyName": "B"}, secret="token")
+    gone.claim()
+    time.sleep(0.05)
+
+    survivor = JobQueue(never_called, path=path)
+    assert survivor.fail_orphaned(stale_secs=0.01) == 2
+    assert survivor.claim() is None
+    for job_id in (queued, running):
+        job = survivor.get(job_id)
+        assert job["status"] == "FAILED"
+        assert "resubmit" in job["error"]
+
+def test_live_jobs_are_kept_by_the_heartbeat(path, monkeypatch):
+    monkeypatch.setattr(Config, "JOB_HEARTBEAT_SECS", 0.05)
+    release = threading.Event()
+
+    def slow(input_data, token, report):
+        # Reports nothing for longer than the stale threshold
+        release.wait(5)
+        return {"token": token}
+
+    queue = JobQueue(slow, path=path, workers=1).start()
+    try:
+        job_id = queue.submit({"companyName": "A"}, secret="token")
+        wait_for(lambda: queue.get(job_id)["status"] == "RUNNING")
+        time.sleep(0.3)
+
+        assert JobQueue(never_called, path=path).fail_orphaned(stale_secs=0.2) == 0
+        release.set()
+        wait_for(lambda: queue.get(job_id)["status"] == "SUCCEEDED")
+        assert queue.get(job_id)["result"] == {"token": "token"}
+    finally:
+        release.set()
+        queue.stop(timeout=5)
+
+def test_queued_jobs_can_be_cancelled(path):
+    queue = JobQueue(never_called, path=path)
+    cancelled = queue.submit({"companyName": "A"}, secret="token")
+    started = queue.submit({"companyName": "B"}, secret="token")
+
+    assert queue.cancel(cancelled)
+    assert queue.claim()["id"] == started
+    assert not queue.cancel(started)
+    assert queue.claim() is None
+    assert queue.get(cancelled)["status"] == "CANCELLED"
+
+def test_jobs_without_a_token_fail(monkeypatch):
+    monkeypatch.setattr(Config, "APIFY_TOKEN", "process-token")
+    handler = AuditJobHandler(lambda token: pytest.fail("no client should be built"), history_store=object())
+
+    with pytest.raises(Exception, match="No Apify token"):
+        handler({"companyName": "A"}, None, lambda stage, data: None)
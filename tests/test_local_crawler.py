@@ -0,0 +1,51 @@
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from utils.local_crawler import HostPoliteness, LocalDiscoveryCrawler
+import asyncio
+import functools
+import pytest
+import threading
+
+pytest.importorskip("selectolax")
+
+SITE_DIR = Path(__file__).parent / "mock_data" / "site"
+
+class SiteHandler(SimpleHTTPRequestHandler):
+    def translate_path(self, path):
+        # /customers -> customers.html, like a site with clean URLs
+        return super().translate_path(path.rstrip("/") + ".html")
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture(scope="module")
+def site_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(SiteHandler, directory=str(SITE_DIR)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+def discover(input_data):
+    crawler = LocalDiscoveryCrawler(politeness=HostPoliteness(delay_secs=0))
+    return asyncio.run(crawler.discover_async(input_data))
+
+def test_local_discovery_matches_actor_schema(site_url):
+    result = discover({"companyName": "Example Analytics", "companyWebsite": site_url + "/about"})
+
+    assert result["status"] == "SUCCESS"
+    names = [customer["name"] for customer in result["customers"]]
+    # The actor's name pattern is greedy, so names carry trailing words too
+    assert any(name.startswith("Globex Corp") for name in names)
+    assert not any("Example Analytics" in name for name in names)
+    for customer in result["customers"]:
+        assert set(customer) >= {"name", "source", "context", "confidence", "discoveredAt"}
+    # Pages that don't exist are skipped, like the actor does
+    assert set(result["pages"]) == {site_url + "/customers", site_url + "/case-studies"}
+    assert result["summary"]["totalCustomersFound"] == len(result["customers"])
+
+def test_unchanged_pages_are_not_reparsed(site_url):
+    first = discover({"companyName": "Example Analytics", "companyWebsite": site_url})
+    second = discover({"companyName": "Example Analytics", "companyWebsite": site_url, "previousPages": first["pages"]})
+
+    assert second["summary"]["pagesUnchanged"] == 2
+    assert second["customers"] == []
@@ -0,0 +1,78 @@
+from utils.http_session import HTTP_SESSIONS
+from utils.metrics import Registry, audit_timings, start_metrics_server, timer
+import asyncio
+import http.client
+import threading
+
+def test_exposition_format():
+    registry = Registry()
+    runs = registry.counter("test_runs_total", "Runs by status")
+    runs.inc(status="SUCCEEDED")
+    runs.inc(2, status='FAIL"ED\n')
+    durations = registry.histogram("test_seconds", "Durations", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        durations.observe(value, stage="run")
+
+    assert registry.counter("test_runs_total", "ignored") is runs
+    assert runs.value(status="SUCCEEDED") == 1
+    assert registry.expose().splitlines() == [
+        "# HELP test_runs_total Runs by status",
+        "# TYPE test_runs_total counter",
+        'test_runs_total{status="FAIL\\"ED\\n"} 2',
+        'test_runs_total{status="SUCCEEDED"} 1',
+        "# HELP test_seconds Durations",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{stage="run",le="0.1"} 1',
+        'test_seconds_bucket{stage="run",le="1"} 2',
+        'test_seconds_bucket{stage="run",le="+Inf"} 3',
+        'test_seconds_sum{stage="run"} 5.55',
+        'test_seconds_count{stage="run"} 3'
+    ]
+
+def test_metrics_endpoint():
+    server = start_metrics_server(0, "127.0.0.1")
+    try:
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=5)
+        connection.request("GET", "/metrics")
+        response = connection.getresponse()
+        body = response.read().decode("utf-8")
+        assert response.status == 200
+        assert response.getheader("Content-Type").startswith("text/plain; version=0.0.4")
+        assert "# TYPE hero_stage_duration_seconds histogram" in body
+
+        connection.request("GET", "/other")
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 404
+        connection.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_audit_timings_collect_stages_per_audit():
+    async def fetch():
+        with timer("actor_run"):
+            await asyncio.sleep(0.01)
+
+    results = {}
+
+    def audit(name):
+        with audit_timings() as timings:
+            with timer("dataframe_build"):
+                pass
+            # Stages run on the shared HTTP loop count towards the caller's audit
+            HTTP_SESSIONS.run(fetch())
+            with timer("dataframe_build"):
+                pass
+        results[name] = timings
+
+    threads = [threading.Thread(target=audit, args=(name,)) for name in ("first", "second")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for timings in results.values():
+        assert [row["stage"] for row in timings.as_rows()] == ["dataframe_build", "actor_run"]
+        assert timings.stages["actor_run"] >= 0.01
+        assert timings.total() >= timings.stages["actor_run"]
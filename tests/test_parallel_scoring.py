@@ -0,0 +1,36 @@
+from synthetic import synthetic_customers
+from utils.extraction_engine import ExtractionEngine
+from utils.parallel_scoring import ParallelScorer
+import asyncio
+import pytest
+
+def without_timestamps(customers):
+    return [{key: value for key, value in customer.items() if key != "discoveredAt"} for customer in customers]
+
+@pytest.fixture(scope="module")
+def blocks():
+    return [(customer["source"], f" {customer['context']} Example Inc ") for customer in synthetic_customers(3000)]
+
+@pytest.mark.parametrize("min_parallel_blocks", [10 ** 9, 0], ids=["inline", "pool"])
+def test_parallel_discovery_matches_extraction_engine(blocks, min_parallel_blocks):
+    expected = without_timestamps(ExtractionEngine("Example").discover(blocks, 200))
+    scorer = ParallelScorer(workers=2, chunk_blocks=700, min_parallel_blocks=min_parallel_blocks)
+    try:
+        assert without_timestamps(scorer.discover("Example", blocks, 200)) == expected
+        assert without_timestamps(asyncio.run(scorer.discover_async("Example", blocks, 200))) == expected
+    finally:
+        scorer.close()
+
+def test_extract_frame_is_typed(blocks):
+    frame = ParallelScorer(workers=1).extract_frame("Example", blocks)
+
+    assert len(frame) == len(ExtractionEngine("Example").extract(blocks))
+    assert frame["confidence"].dtype == "float32"
+    assert frame["source"].dtype == "category"
+
+def test_workers_are_not_forked_from_the_app():
+    scorer = ParallelScorer(workers=1)
+    try:
+        assert scorer.pool()._mp_context.get_start_method() in ("forkserver", "spawn")
+    finally:
+        scorer.close()
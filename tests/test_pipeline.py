@@ -0,0 +1,85 @@
+from config import Config
+from utils.pipeline import AuditPipeline
+import asyncio
+import pytest
+
+STAGE_SECS = 0.05
+
+class StageClient:
+    """Records when each stage's actor starts and finishes"""
+
+    def __init__(self, fail=None, durations=None):
+        self.fail = fail
+        self.durations = durations or {}
+        self.events = []
+        self.running = 0
+        self.max_running = 0
+        self.cancelled = []
+
+    async def _run(self, stage, input_data):
+        self.events.append(("start", stage))
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.durations.get(stage, STAGE_SECS))
+            if stage == self.fail:
+                raise Exception(f"{stage} failed")
+        except asyncio.CancelledError:
+            self.cancelled.append(stage)
+            raise
+        finally:
+            self.running -= 1
+        self.events.append(("end", stage))
+        return input_data
+
+    async def run_customer_discovery_async(self, input_data):
+        result = await self._run("discovery", input_data)
+        return {"companyName": result["companyName"], "customers": [{"name": "Acme Inc"}]}
+
+    async def run_actor_async(self, actor_id, input_data):
+        stages = {
+            Config.LINKEDIN_ANALYZER_ACTOR: "linkedin",
+            Config.CONTENT_ANALYZER_ACTOR: "content",
+            Config.SIGNAL_DETECTOR_ACTOR: "signals",
+            Config.REPORT_GENERATOR_ACTOR: "report"
+        }
+        await self._run(stages[actor_id], input_data)
+        return [{"stage": stages[actor_id]}]
+
+def position(events, event, stage):
+    return events.index((event, stage))
+
+def test_stages_start_as_soon_as_their_inputs_are_ready():
+    client = StageClient()
+    results = asyncio.run(AuditPipeline(client, max_concurrent=3).run_async({"companyName": "Example"}))
+    events = client.events
+
+    assert results["discovery"]["customers"] == [{"name": "Acme Inc"}]
+    assert results["report"] == [{"stage": "report"}]
+    for stage in ("linkedin", "content"):
+        assert position(events, "end", "discovery") < position(events, "start", stage)
+        assert position(events, "start", stage) < position(events, "end", "linkedin")
+        assert position(events, "end", stage) < position(events, "start", "signals")
+    assert position(events, "end", "signals") < position(events, "start", "report")
+    assert client.max_running == 2
+
+def test_concurrent_pipelines_share_the_stage_limit():
+    client = StageClient()
+    pipeline = AuditPipeline(client, max_concurrent=2)
+
+    async def run_all():
+        return await asyncio.gather(*(pipeline.run_async({"companyName": f"Company {i}"}) for i in range(3)))
+
+    results = asyncio.run(run_all())
+    assert [result["discovery"]["companyName"] for result in results] == ["Company 0", "Company 1", "Company 2"]
+    assert client.max_running == 2
+
+def test_failed_stage_cancels_the_rest():
+    # The content analyzer is still running when the LinkedIn stage fails
+    client = StageClient(fail="linkedin", durations={"content": 1.0})
+    with pytest.raises(Exception, match="linkedin failed"):
+        asyncio.run(AuditPipeline(client, max_concurrent=3).run_async({"companyName": "Example"}))
+
+    assert client.cancelled == ["content"]
+    started = {stage for event, stage in client.events if event == "start"}
+    assert started == {"discovery", "linkedin", "content"}
@@ -0,0 +1,25 @@
+from utils.report_exporter import EXPORT_FORMATS, available_formats, require_format
+import importlib.util
+import pytest
+
+def test_formats_without_their_package_are_not_offered(monkeypatch):
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(
+        importlib.util, "find_spec", lambda name, *args: None if name == "weasyprint" else find_spec(name, *args)
+    )
+
+    formats = available_formats()
+
+    assert "pdf" not in formats
+    assert "csv" in formats
+    assert all(fmt in EXPORT_FORMATS for fmt in formats)
+
+def test_offered_formats_can_be_rendered():
+    for fmt in available_formats():
+        require_format(fmt)
+
+def test_missing_package_is_reported():
+    if importlib.util.find_spec("weasyprint") is not None:
+        pytest.skip("weasyprint is installed")
+    with pytest.raises(Exception, match="pip install weasyprint"):
+        require_format("pdf")
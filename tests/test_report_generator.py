@@ -0,0 +1,47 @@
+from utils.report_generator import CUSTOMERS_PER_CHUNK, ReportGenerator
+import io
+
+HOSTILE = '<script>alert("x")</script>'
+
+def test_scraped_text_is_escaped():
+    data = {
+        "companyName": f"Example {HOSTILE}",
+        "timestamp": "<b>now</b>",
+        "customers": [{
+            "name": f"Acme {HOSTILE}",
+            "source": 'https://example.com/?q="><img src=x onerror=alert(1)>',
+            "context": f"Acme & Co said {HOSTILE}",
+            "confidence": 0.9
+        }]
+    }
+    report = ReportGenerator().generate_report(data)
+
+    assert "<script>" not in report
+    assert "<img" not in report
+    assert "<b>now</b>" not in report
+    assert "<h4>Acme &lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt;</h4>" in report
+    assert "Source: https://example.com/?q=&quot;&gt;&lt;img src=x onerror=alert(1)&gt;" in report
+    assert "Acme &amp; Co said &lt;script&gt;" in report
+    assert "<h2>Example &lt;script&gt;" in report
+
+def test_context_is_cut_before_escaping():
+    customer = {"name": "Acme", "context": "&" * 300}
+    block = ReportGenerator().render_customer(customer)
+    assert block.count("&amp;") == 200
+
+def test_iterators_stream_in_chunks_with_the_total_in_the_footer():
+    customers = [{"name": f"Customer {i}", "confidence": 0.5} for i in range(CUSTOMERS_PER_CHUNK + 10)]
+    generator = ReportGenerator()
+
+    chunks = list(generator.iter_report({"companyName": "Example", "customers": iter(customers)}))
+    report = "".join(chunks)
+    assert len(chunks) == 4  # header, a full chunk, the rest, footer
+    assert report.count('class="customer"') == len(customers)
+    assert report.rstrip().endswith("</html>")
+    assert f"Total Customers Found: {len(customers)}" in chunks[-1]
+
+    out = io.StringIO()
+    generator.write_report({"companyName": "Example", "customers": customers}, out)
+    # Lists know their size, so the total goes in the header
+    header = out.getvalue().split('class="customer"')[0]
+    assert f"Total Customers Found: {len(customers)}" in header
@@ -0,0 +1,110 @@
+from config import Config
+from utils.result_cache import CachedApifyClient, ResultCache, cache_key
+import asyncio
+import pytest
+
+ACTOR = "user/discovery"
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("utils.result_cache.time.time", clock)
+    return clock
+
+class CountingClient:
+    def __init__(self, result=None):
+        self.calls = 0
+        self.result = result
+
+    def result_for(self, input_data):
+        self.calls += 1
+        return self.result if self.result is not None else {"companyName": input_data["companyName"], "customers": []}
+
+    def run_customer_discovery(self, input_data):
+        return self.result_for(input_data)
+
+    async def run_customer_discovery_async(self, input_data):
+        return self.result_for(input_data)
+
+def test_key_ignores_formatting_and_defaults():
+    key = cache_key(ACTOR, {"companyName": "Example Inc", "companyWebsite": "https://example.com/"})
+    assert key == cache_key(ACTOR, {
+        "companyName": "  example   INC ", "companyWebsite": "www.Example.com", "maxResults": 50, "searchDepth": "3",
+        "proxyConfiguration": {"useApifyProxy": True}
+    })
+
+@pytest.mark.parametrize("change", [
+    {"companyName": "Other Inc"},
+    {"companyWebsite": "https://example.org"},
+    {"maxResults": 10},
+    {"searchDepth": 1}
+])
+def test_key_changes_with_inputs_that_matter(change):
+    input_data = {"companyName": "Example Inc", "companyWebsite": "https://example.com"}
+    assert cache_key(ACTOR, input_data) != cache_key(ACTOR, {**input_data, **change})
+
+def test_key_includes_actor():
+    input_data = {"companyName": "Example Inc"}
+    assert cache_key(ACTOR, input_data) != cache_key("user/other", input_data)
+
+def test_key_includes_backend_other_than_apify(monkeypatch):
+    input_data = {"companyName": "Example Inc"}
+    monkeypatch.setattr(Config, "DISCOVERY_BACKEND", "apify")
+    # Keys written before the backend was part of the input still match
+    apify_key = cache_key(ACTOR, input_data)
+    assert apify_key == "df7de9c33e41549ed16f253ffff3ae76b05f3dd031432a02fbb59716fa6a4265"
+
+    monkeypatch.setattr(Config, "DISCOVERY_BACKEND", "local")
+    assert cache_key(ACTOR, input_data) != apify_key
+
+def test_entries_expire_after_their_actor_ttl(clock):
+    cache = ResultCache(":memory:", ttls={ACTOR: 60}, default_ttl=3600)
+    cache.set(ACTOR, {"companyName": "A"}, {"customers": [1]})
+    cache.set("user/other", {"companyName": "A"}, {"customers": [2]})
+
+    clock.now += 59
+    assert cache.get(ACTOR, {"companyName": "A"}) == {"customers": [1]}
+    clock.now += 1
+    assert cache.get(ACTOR, {"companyName": "A"}) is None
+    assert cache.get("user/other", {"companyName": "A"}) == {"customers": [2]}
+    assert cache.stats() == {"hits": 2, "misses": 1, "hit_rate": 2 / 3, "entries": 1}
+
+def test_least_recently_used_entries_are_evicted(clock):
+    cache = ResultCache(":memory:", max_entries=2, ttls={}, default_ttl=3600)
+    for name in ("A", "B"):
+        cache.set(ACTOR, {"companyName": name}, {"name": name})
+        clock.now += 1
+    cache.get(ACTOR, {"companyName": "A"})
+    clock.now += 1
+    cache.set(ACTOR, {"companyName": "C"}, {"name": "C"})
+
+    assert cache.get(ACTOR, {"companyName": "B"}) is None
+    assert cache.get(ACTOR, {"companyName": "A"}) == {"name": "A"}
+    assert cache.get(ACTOR, {"companyName": "C"}) == {"name": "C"}
+
+def test_cached_client_reuses_results(clock):
+    client = CountingClient()
+    cached = CachedApifyClient(client, ResultCache(":memory:"))
+
+    first = cached.run_customer_discovery({"companyName": "Example"})
+    assert asyncio.run(cached.run_customer_discovery_async({"companyName": " example "})) == first
+    assert client.calls == 1
+
+    clock.now += cached.cache.ttl_for(Config.CUSTOMER_DISCOVERY_ACTOR)
+    cached.run_customer_discovery({"companyName": "Example"})
+    assert client.calls == 2
+
+def test_error_results_are_not_cached(clock):
+    client = CountingClient({"status": "ERROR", "customers": []})
+    cached = CachedApifyClient(client, ResultCache(":memory:"))
+
+    cached.run_customer_discovery({"companyName": "Example"})
+    cached.run_customer_discovery({"companyName": "Example"})
+    assert client.calls == 2
@@ -0,0 +1,130 @@
+from config import Config
+from utils.run_scheduler import MAX_RUN_MEMORY_MBYTES, MAX_RUN_TIMEOUT_SECS, ActorLimitError, RunScheduler, run_options, scheduling
+import asyncio
+import pytest
+import time
+
+def test_waiting_runs_are_served_by_priority_then_round_robin():
+    scheduler = RunScheduler(max_runs=1, max_memory_mbytes=8192)
+    order = []
+
+    async def run(priority, tenant, name):
+        with scheduling(priority, tenant):
+            await scheduler.acquire_async(1024)
+        order.append(name)
+        await asyncio.sleep(0.01)
+        scheduler.release(1024)
+
+    async def scenario():
+        await scheduler.acquire_async(1024)
+        runs = [
+            asyncio.ensure_future(run("batch", "a", "batch-a1")),
+            asyncio.ensure_future(run("batch", "a", "batch-a2")),
+            asyncio.ensure_future(run("batch", "b", "batch-b1")),
+            asyncio.ensure_future(run("interactive", "c", "interactive-c1"))
+        ]
+        await asyncio.sleep(0.01)
+        scheduler.release(1024)
+        await asyncio.gather(*runs)
+
+    asyncio.run(scenario())
+    assert order == ["interactive-c1", "batch-a1", "batch-b1", "batch-a2"]
+    assert scheduler.running == 0
+
+def test_cancelled_waiters_do_not_hold_slots():
+    scheduler = RunScheduler(max_runs=1, max_memory_mbytes=8192)
+
+    async def scenario():
+        await scheduler.acquire_async(1024)
+        gave_up = asyncio.ensure_future(scheduler.acquire_async(1024))
+        waiting = asyncio.ensure_future(scheduler.acquire_async(1024))
+        await asyncio.sleep(0.01)
+        gave_up.cancel()
+        await asyncio.sleep(0.01)
+        scheduler.release(1024)
+        await asyncio.wait_for(waiting, 1)
+
+    asyncio.run(scenario())
+    assert scheduler.running == 1
+    assert scheduler.memory_in_use == 1024
+
+def test_slots_granted_as_the_caller_gives_up_are_returned():
+    scheduler = RunScheduler(max_runs=1, max_memory_mbytes=8192)
+
+    async def scenario():
+        await scheduler.acquire_async(1024)
+        waiter = asyncio.ensure_future(scheduler.acquire_async(1024))
+        await asyncio.sleep(0.01)
+        # The slot is granted and the waiter cancelled before it wakes up
+        scheduler.release(1024)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert scheduler.running == 0
+    assert scheduler.memory_in_use == 0
+
+def test_run_options_scale_with_the_input():
+    assert run_options(Config.CUSTOMER_DISCOVERY_ACTOR, {}, 300) == {"memory_mbytes": 1024, "timeout_secs": 300}
+    # Four times the baseline work: twice the memory, four times the time
+    assert run_options(Config.CUSTOMER_DISCOVERY_ACTOR, {"maxResults": 200, "searchDepth": 3}, 300) == \
+        {"memory_mbytes": 2048, "timeout_secs": 1200}
+    assert run_options(Config.CUSTOMER_DISCOVERY_ACTOR, {"maxResults": 5000, "searchDepth": 10}, 300) == \
+        {"memory_mbytes": MAX_RUN_MEMORY_MBYTES, "timeout_secs": MAX_RUN_TIMEOUT_SECS}
+    assert run_options("user/other-actor", {"maxResults": 5000}, 300) == {"memory_mbytes": None, "timeout_secs": 300}
+
+def test_account_limits_leave_room_for_runs_started_elsewhere():
+    scheduler = RunScheduler(max_runs=25, max_memory_mbytes=32768)
+    scheduler.update_limits({
+        "limits": {"maxConcurrentActorJobs": 10, "maxActorMemoryGbytes": 8},
+        "current": {"activeActorJobCount": 3, "actorMemoryGbytes": 2}
+    })
+
+    assert scheduler.max_runs == 7
+    assert scheduler.max_memory_mbytes == 6 * 1024
+    assert not scheduler.limits_stale()
+
+    # Without account access the configured limits stay
+    scheduler.update_limits(None)
+    assert scheduler.max_runs == 7
+
+def test_used_up_compute_units_refuse_new_runs():
+    scheduler = RunScheduler(max_runs=5, max_memory_mbytes=8192)
+    scheduler.update_limits({
+        "limits": {"maxMonthlyActorComputeUnits": 100},
+        "current": {"monthlyActorComputeUnits": 100}
+    })
+
+    with pytest.raises(ActorLimitError, match="compute units") as raised:
+        asyncio.run(scheduler.acquire_async(1024))
+    assert not raised.value.retryable
+
+def test_refused_runs_back_off_for_retry_after_and_retry():
+    scheduler = RunScheduler(max_runs=1, max_memory_mbytes=8192)
+    attempts = []
+
+    async def start():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise ActorLimitError("Too many runs", retry_after=0.1)
+        return "started"
+
+    assert asyncio.run(scheduler.run_async(1024, start)) == "started"
+    assert [later - earlier >= 0.1 for earlier, later in zip(attempts, attempts[1:])] == [True, True]
+    # The slot isn't held while backing off
+    assert scheduler.running == 0
+
+def test_retries_stop_at_the_limit_or_on_permanent_refusals(monkeypatch):
+    monkeypatch.setattr("utils.run_scheduler.MAX_LIMIT_RETRIES", 1)
+    scheduler = RunScheduler(max_runs=1, max_memory_mbytes=8192)
+    attempts = []
+
+    async def refused(retryable):
+        attempts.append(retryable)
+        raise ActorLimitError("Refused", retry_after=0.01, retryable=retryable)
+
+    with pytest.raises(ActorLimitError):
+        asyncio.run(scheduler.run_async(1024, lambda: refused(True)))
+    with pytest.raises(ActorLimitError):
+        asyncio.run(scheduler.run_async(1024, lambda: refused(False)))
+    assert attempts == [True, True, False]
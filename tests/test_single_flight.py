@@ -0,0 +1,207 @@
+from utils.run_scheduler import ActorLimitError
+from utils.single_flight import CoalescingApifyClient, RunLease, SingleFlight
+import asyncio
+import pytest
+import threading
+import time
+
+class SlowClient:
+    """Discovery that takes a while and counts how often it really ran"""
+
+    def __init__(self, secs=0.1, error=None):
+        self.secs = secs
+        self.error = error
+        self.calls = 0
+        self.timeout = 5
+
+    async def run_customer_discovery_async(self, input_data):
+        self.calls += 1
+        await asyncio.sleep(self.secs)
+        if self.error:
+            raise Exception(self.error)
+        return {"companyName": input_data["companyName"], "run": self.calls}
+
+@pytest.fixture
+def lease(tmp_path):
+    return RunLease(str(tmp_path / "leases.sqlite3"))
+
+def test_identical_calls_share_one_run():
+    client = SlowClient()
+    coalescing = CoalescingApifyClient(client, single_flight=SingleFlight())
+
+    async def run_all():
+        return await asyncio.gather(
+            coalescing.run_customer_discovery_async({"companyName": "Example"}),
+            coalescing.run_customer_discovery_async({"companyName": " example "}),
+            coalescing.run_customer_discovery_async({"companyName": "Other"})
+        )
+
+    first, second, other = asyncio.run(run_all())
+    assert first == second
+    assert other["companyName"] == "Other"
+    assert client.calls == 2
+    assert coalescing.single_flight.in_flight() == []
+
+def test_calls_are_shared_across_threads_and_loops():
+    single_flight = SingleFlight()
+    client = SlowClient(secs=0.3)
+    results = []
+
+    def call():
+        coalescing = CoalescingApifyClient(client, single_flight=single_flight)
+        results.append(asyncio.run(coalescing.run_customer_discovery_async({"companyName": "Example"})))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert client.calls == 1
+    assert len(results) == 3 and all(result == results[0] for result in results)
+
+def test_errors_reach_every_caller():
+    client = SlowClient(error="actor failed")
+    coalescing = CoalescingApifyClient(client, single_flight=SingleFlight())
+
+    async def run_all():
+        return await asyncio.gather(
+            *(coalescing.run_customer_discovery_async({"companyName": "Example"}) for _ in range(2)),
+            return_exceptions=True
+        )
+
+    assert [str(error) for error in asyncio.run(run_all())] == ["actor failed", "actor failed"]
+    assert client.calls == 1
+
+def test_a_follower_takes_over_when_the_leader_gives_up():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def function():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return len(calls)
+
+    async def scenario():
+        leader = asyncio.ensure_future(single_flight.do_async("key", function))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(single_flight.do_async("key", function))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(scenario()) == 2
+
+def test_lease_lifecycle(lease):
+    token = lease.acquire("key", ttl=60)
+    assert token is not None
+    assert lease.acquire("key", ttl=60) is None
+    assert lease.poll("key") == ("running", None)
+
+    lease.complete("key", token, result={"customers": []})
+    assert lease.poll("key") == ("done", {"customers": []})
+    # A fresh outcome is served rather than rerun
+    assert lease.acquire("key", ttl=60) is None
+
+    other = lease.acquire("other", ttl=60)
+    lease.complete("other", other, error="actor failed")
+    with pytest.raises(Exception, match="actor failed"):
+        lease.poll("other")
+
+    released = lease.acquire("released", ttl=60)
+    lease.release("released", released)
+    assert lease.poll("released") == (None, None)
+    assert lease.acquire("released", ttl=60) is not None
+
+def test_expired_leases_are_taken_over(lease):
+    stale = lease.acquire("key", ttl=0.05)
+    time.sleep(0.1)
+    assert lease.poll("key") == (None, None)
+    fresh = lease.acquire("key", ttl=60)
+    assert fresh not in (None, stale)
+    # The old holder can no longer publish over the new one
+    lease.complete("key", stale, result={"stale": True})
+    assert lease.poll("key") == ("running", None)
+
+def test_processes_sharing_a_lease_run_once(lease, tmp_path, monkeypatch):
+    monkeypatch.setattr("utils.single_flight.LEASE_POLL_SECS", 0.02)
+    client = SlowClient(secs=0.2)
+    # Separate SingleFlights stand in for separate processes
+    first = CoalescingApifyClient(client, single_flight=SingleFlight(), lease=lease)
+    second = CoalescingApifyClient(client, single_flight=SingleFlight(), lease=RunLease(lease.path))
+
+    async def run_both():
+        return await asyncio.gather(
+            first.run_customer_discovery_async({"companyName": "Example"}),
+            second.run_customer_discovery_async({"companyName": "Example"})
+        )
+
+    a, b = asyncio.run(run_both())
+    assert a == b
+    assert client.calls == 1
+
+def test_lease_is_handed_over_when_the_holder_is_cancelled(lease, monkeypatch):
+    monkeypatch.setattr("utils.single_flight.LEASE_POLL_SECS", 0.02)
+    client = SlowClient(secs=0.2)
+    holder = CoalescingApifyClient(client, single_flight=SingleFlight(), lease=lease)
+    waiter = CoalescingApifyClient(client, single_flight=SingleFlight(), lease=RunLease(lease.path))
+
+    async def scenario():
+        leading = asyncio.ensure_future(holder.run_customer_discovery_async({"companyName": "Example"}))
+        await asyncio.sleep(0.05)
+        waiting = asyncio.ensure_future(waiter.run_customer_discovery_async({"companyName": "Example"}))
+        await asyncio.sleep(0.05)
+        leading.cancel()
+        return await waiting
+
+    assert asyncio.run(scenario())["run"] == 2
+    assert client.calls == 2
+
+def test_lease_is_renewed_while_the_run_goes_on(lease, monkeypatch):
+    monkeypatch.setattr("utils.single_flight.LEASE_POLL_SECS", 0.02)
+    monkeypatch.setattr("utils.single_flight.LEASE_TTL_SECS", 0.1)
+    monkeypatch.setattr("utils.single_flight.LEASE_RENEW_SECS", 0.02)
+    # The run outlasts the lease's TTL several times over
+    client = SlowClient(secs=0.5)
+    holder = CoalescingApifyClient(client, single_flight=SingleFlight(), lease=lease)
+    waiter = CoalescingApifyClient(client, single_flight=SingleFlight(), lease=RunLease(lease.path))
+
+    async def scenario():
+        leading = asyncio.ensure_future(holder.run_customer_discovery_async({"companyName": "Example"}))
+        await asyncio.sleep(0.05)
+        waiting = asyncio.ensure_future(waiter.run_customer_discovery_async({"companyName": "Example"}))
+        return await asyncio.gather(leading, waiting)
+
+    a, b = asyncio.run(scenario())
+    assert a == b
+    assert client.calls == 1
+
+def test_failures_are_not_replayed_to_later_callers(lease, monkeypatch):
+    monkeypatch.setattr("utils.single_flight.LEASE_POLL_SECS", 0.02)
+    client = SlowClient(secs=0.2, error="transient")
+    holder = CoalescingApifyClient(client, single_flight=SingleFlight(), lease=lease)
+    waiter = CoalescingApifyClient(client, single_flight=SingleFlight(), lease=RunLease(lease.path))
+
+    async def scenario():
+        leading = asyncio.ensure_future(holder.run_customer_discovery_async({"companyName": "Example"}))
+        await asyncio.sleep(0.05)
+        waiting = asyncio.ensure_future(waiter.run_customer_discovery_async({"companyName": "Example"}))
+        return await asyncio.gather(leading, waiting, return_exceptions=True)
+
+    # A caller already waiting on the failed run gets its error
+    outcomes = asyncio.run(scenario())
+    assert [str(outcome) for outcome in outcomes] == ["transient", "transient"]
+    assert client.calls == 1
+
+    # A retry after the failure runs the actor again
+    client.error = None
+    assert asyncio.run(waiter.run_customer_discovery_async({"companyName": "Example"}))["run"] == 2
+
+def test_limit_errors_keep_their_type_across_processes(lease):
+    token = lease.acquire("key", ttl=60)
+    lease.complete("key", token, error=ActorLimitError("Too many runs", retry_after=7))
+
+    with pytest.raises(ActorLimitError, match="Too many runs") as raised:
+        lease.poll("key")
+    assert raised.value.retry_after == 7
+    assert raised.value.retryable
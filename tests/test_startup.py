@@ -0,0 +1,22 @@
+from utils.import_profile import STARTUP_MODULES, parse_importtime, profile_imports, summarize
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     numpy._core\n"
+        "import time:       300 |        420 |   numpy\n"
+        "import time:        80 |        500 | utils.extraction_engine\n"
+    )
+    assert parse_importtime(output) == [
+        ("numpy._core", 120, 120, 2),
+        ("numpy", 300, 420, 1),
+        ("utils.extraction_engine", 80, 500, 0)
+    ]
+
+def test_startup_defers_heavy_libraries():
+    summary = summarize(profile_imports(STARTUP_MODULES))
+    assert summary["heavy_loaded"] == []
+
+def test_audit_modules_defer_heavy_libraries():
+    modules = ["utils.apify_client", "utils.data_processor", "utils.report_generator", "utils.customer_records"]
+    assert summarize(profile_imports(modules))["heavy_loaded"] == []
@@ -0,0 +1,98 @@
+from pathlib import Path
+import gzip
+import http.client
+import importlib.util
+import pytest
+import threading
+
+SERVER_PATH = Path(__file__).resolve().parent.parent / "serve.py.py"
+
+def load_server_module():
+    # The file name isn't a valid module name, so it is loaded by path
+    spec = importlib.util.spec_from_file_location("static_server", SERVER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+serve = load_server_module()
+
+PAGE = "<!DOCTYPE html><html><body>" + "<p>Hero customers</p>" * 200 + "</body></html>"
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    root = tmp_path_factory.mktemp("site")
+    (root / "index.html").write_text(PAGE, encoding="utf-8")
+    (root / "static").mkdir()
+    (root / "static" / "app.3f2a9c1b.js").write_text("console.log('hero')", encoding="utf-8")
+    (root / "secrets.py").write_text("TOKEN = 'x'", encoding="utf-8")
+    (root / "reports").mkdir()
+    (root / "reports" / "acme.html").write_text("<p>Acme's customers</p>", encoding="utf-8")
+
+    handler = type("TestHandler", (serve.StaticAssetHandler,), {"assets": serve.load_assets(str(root))})
+    httpd = serve.PooledHTTPServer(("127.0.0.1", 0), handler, workers=2)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+def request(server, path, method="GET", headers=None):
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=5)
+    try:
+        connection.request(method, path, headers=headers or {})
+        response = connection.getresponse()
+        return response, response.read()
+    finally:
+        connection.close()
+
+def test_index_is_served_with_validators(server):
+    response, body = request(server, "/")
+    assert response.status == 200
+    assert body.decode("utf-8") == PAGE
+    assert response.getheader("Content-Type") == "text/html; charset=utf-8"
+    assert response.getheader("Cache-Control") == "no-cache"
+    assert response.getheader("ETag")
+    assert response.getheader("Last-Modified")
+
+def test_matching_etag_or_date_gives_304(server):
+    response, _ = request(server, "/index.html")
+    etag, last_modified = response.getheader("ETag"), response.getheader("Last-Modified")
+
+    for headers in ({"If-None-Match": etag}, {"If-None-Match": f'"other", W/{etag}'}, {"If-Modified-Since": last_modified}):
+        response, body = request(server, "/index.html", headers=headers)
+        assert response.status == 304
+        assert body == b""
+        assert response.getheader("ETag") == etag
+
+    response, _ = request(server, "/index.html", headers={"If-None-Match": '"other"'})
+    assert response.status == 200
+
+def test_gzip_is_negotiated(server):
+    response, body = request(server, "/index.html", headers={"Accept-Encoding": "gzip"})
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert response.getheader("Vary") == "Accept-Encoding"
+    assert gzip.decompress(body).decode("utf-8") == PAGE
+    assert len(body) < len(PAGE)
+
+    response, body = request(server, "/index.html", headers={"Accept-Encoding": "gzip;q=0"})
+    assert response.getheader("Content-Encoding") is None
+    assert body.decode("utf-8") == PAGE
+
+def test_head_sends_headers_only(server):
+    response, body = request(server, "/index.html", method="HEAD")
+    assert response.status == 200
+    assert int(response.getheader("Content-Length")) == len(PAGE)
+    assert body == b""
+
+def test_fingerprinted_assets_are_immutable(server):
+    response, _ = request(server, "/static/app.3f2a9c1b.js")
+    assert response.getheader("Cache-Control") == serve.IMMUTABLE_CACHE
+
+def test_healthz_and_private_files(server):
+    response, body = request(server, "/healthz")
+    assert (response.status, body) == (200, b"ok")
+    assert response.getheader("Cache-Control") == "no-store"
+
+    # Only allowlisted files are public, whatever their type
+    for path in ("/secrets.py", "/reports/acme.html"):
+        response, _ = request(server, path)
+        assert response.status == 404
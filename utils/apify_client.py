@@ -1,29 +1,175 @@
-from apify_client import ApifyClient as BaseApifyClient
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from utils.http_session import HTTP_SESSIONS, LIMIT_STATUS_CODES
+from utils.local_crawler import LocalDiscoveryCrawler
+from utils.metrics import ACTOR_RUNS, DATASET_ITEMS, record_stage, timer
+from utils.run_scheduler import ActorLimitError, get_scheduler, run_options
+import asyncio
+import math
 import time
 
+# Statuses the platform reports while a run is still in progress
+ACTIVE_STATUSES = ["READY", "RUNNING", "TIMING-OUT", "ABORTING"]
+
+# Long-poll window bounds in seconds (the API caps a single wait at 60s)
+MIN_WAIT_SECS = 1
+MAX_WAIT_SECS = 60
+
+# Items fetched per dataset page when streaming results
+DATASET_PAGE_SIZE = 1000
+
+def limit_error(error):
+    """Translate an SDK error into ActorLimitError when it is about account limits"""
+    status_code = getattr(error, "status_code", None)
+    error_type = getattr(error, "type", None) or ""
+    if status_code in LIMIT_STATUS_CODES or "limit" in error_type:
+        return ActorLimitError(f"Apify refused the run: {error}", retry_after=getattr(error, "retry_after", None))
+    return None
+
 class ApifyClient:
-    def __init__(self, token):
-        self.client = BaseApifyClient(token)
-        
-    def run_customer_discovery(self, input_data):
-        """Run the hero customer discovery actor"""
-        actor_id = "your-username/hero-customer-discovery"
-        
+    def __init__(self, token, timeout=None, scheduler=None, scorer=None):
+        self.token = token
+        # SDK clients are shared per token so connections outlive this object
+        self.client = HTTP_SESSIONS.apify_client(token)
+        self.timeout = timeout or Config.DEFAULT_TIMEOUT
+        self.scheduler = scheduler or get_scheduler(token)
+        self.local_crawler = LocalDiscoveryCrawler(scorer=scorer)
+
+    def _get_async_client(self, fail_on_limits=False):
+        """Return the shared async client bound to the running event loop"""
+        return HTTP_SESSIONS.apify_client_async(self.token, fail_on_limits)
+
+    async def wait_for_run_async(self, run, deadline, timeout_secs=None):
+        """Long-poll a run until it finishes or the deadline passes"""
+        loop = asyncio.get_running_loop()
+        client = self._get_async_client()
+        wait_secs = MIN_WAIT_SECS
+
+        while run["status"] in ACTIVE_STATUSES:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                await client.run(run["id"]).abort()
+                raise Exception(f"Actor run {run['id']} exceeded timeout of {timeout_secs or self.timeout}s")
+
+            # The server returns as soon as the run finishes, so a longer
+            # window never delays completion; it only saves round trips.
+            window = max(1, math.ceil(min(wait_secs, remaining)))
+            run = await client.run(run["id"]).wait_for_finish(wait_secs=window)
+            if run is None:
+                raise Exception("Actor run disappeared while waiting for it to finish")
+            wait_secs = min(wait_secs * 2, MAX_WAIT_SECS)
+
+        return run
+
+    async def refresh_limits_async(self):
+        """Re-read the account's limits into the scheduler when they are stale"""
+        if not self.scheduler.limits_stale():
+            return
         try:
-            run = self.client.actor(actor_id).call(run_input=input_data)
-            
-            # Wait for completion
-            while run["status"] in ["RUNNING", "READY"]:
-                time.sleep(5)
-                run = self.client.run(run["id"]).get()
-            
-            if run["status"] == "SUCCEEDED":
-                # Get dataset items
-                dataset_id = run["defaultDatasetId"]
-                items = self.client.dataset(dataset_id).list_items()
-                return items.items[0] if items.items else None
-            else:
-                raise Exception(f"Actor run failed with status: {run['status']}")
-                
+            account = await self._get_async_client(fail_on_limits=True).user().limits()
+        except Exception:
+            # Tokens without account access keep the configured defaults
+            account = None
+        self.scheduler.update_limits(account)
+
+    async def start_and_wait_async(self, actor_id, input_data):
+        """Start an actor, once the account has room for it, and wait for its run to succeed"""
+        options = run_options(actor_id, input_data, self.timeout)
+        await self.refresh_limits_async()
+        return await self.scheduler.run_async(
+            options["memory_mbytes"],
+            lambda: self._start_and_wait_async(actor_id, input_data, options)
+        )
+
+    async def _start_and_wait_async(self, actor_id, input_data, options):
+        client = self._get_async_client()
+        timeout_secs = options["timeout_secs"]
+        deadline = asyncio.get_running_loop().time() + timeout_secs
+
+        with timer("actor_start"):
+            try:
+                # Refusals come straight back so the scheduler handles them
+                run = await self._get_async_client(fail_on_limits=True).actor(actor_id).start(
+                    run_input=input_data,
+                    memory_mbytes=options["memory_mbytes"],
+                    timeout_secs=timeout_secs
+                )
+            except Exception as e:
+                error = limit_error(e)
+                if error is None:
+                    raise
+                ACTOR_RUNS.inc(actor=actor_id, status="LIMITED")
+                raise error
+        started = time.perf_counter()
+        try:
+            run = await self.wait_for_run_async(run, deadline, timeout_secs)
+        except asyncio.CancelledError:
+            # Don't leave the run burning credits when the caller gives up
+            await client.run(run["id"]).abort()
+            ACTOR_RUNS.inc(actor=actor_id, status="ABORTED")
+            raise
+        except Exception:
+            ACTOR_RUNS.inc(actor=actor_id, status="ERROR")
+            raise
+
+        # Whatever the platform didn't spend running the actor was spent
+        # queueing, starting the container or on the network
+        waited = time.perf_counter() - started
+        run_secs = min((run.get("stats") or {}).get("runTimeSecs") or waited, waited)
+        record_stage("actor_queue", waited - run_secs)
+        record_stage("actor_run", run_secs)
+        ACTOR_RUNS.inc(actor=actor_id, status=run["status"])
+
+        if run["status"] != "SUCCEEDED":
+            raise Exception(f"Actor run failed with status: {run['status']}")
+        return run
+
+    async def run_actor_async(self, actor_id, input_data, limit=None):
+        """Run an actor to completion and return its dataset items"""
+        run = await self.start_and_wait_async(actor_id, input_data)
+
+        # Get dataset items
+        dataset_id = run["defaultDatasetId"]
+        with timer("dataset_fetch"):
+            items = await self._get_async_client().dataset(dataset_id).list_items(limit=limit)
+        DATASET_ITEMS.inc(len(items.items))
+        return items.items
+
+    def iter_dataset_items(self, dataset_id, page_size=DATASET_PAGE_SIZE):
+        """Stream dataset items page by page, fetching the next page in the background"""
+        dataset = self.client.dataset(dataset_id)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            offset = 0
+            page = executor.submit(dataset.list_items, offset=offset, limit=page_size)
+
+            while True:
+                # Only time spent blocked on the network counts as fetch time
+                with timer("dataset_fetch"):
+                    items = page.result().items
+                DATASET_ITEMS.inc(len(items))
+                if len(items) < page_size:
+                    yield from items
+                    return
+
+                offset += len(items)
+                page = executor.submit(dataset.list_items, offset=offset, limit=page_size)
+                yield from items
+
+    async def run_customer_discovery_async(self, input_data):
+        """Run the hero customer discovery actor without blocking the event loop"""
+        if Config.DISCOVERY_BACKEND == "local":
+            return await self.local_crawler.discover_async(input_data)
+        try:
+            # The actor pushes a single result record, so fetch only that
+            items = await self.run_actor_async(Config.CUSTOMER_DISCOVERY_ACTOR, input_data, limit=1)
+            return items[0] if items else None
+        except ActorLimitError:
+            # Callers may wait and retry these, so keep them distinguishable
+            raise
         except Exception as e:
-            raise Exception(f"Failed to run actor: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Failed to run actor: {str(e)}")
+
+    def run_customer_discovery(self, input_data):
+        """Run the hero customer discovery actor"""
+        return HTTP_SESSIONS.run(self.run_customer_discovery_async(input_data))
@@ -0,0 +1,188 @@
+from config import Config
+from datetime import datetime, timezone
+from pathlib import Path
+from utils.data_processor import DataProcessor
+from utils.http_session import HTTP_SESSIONS
+from utils.result_cache import cache_key
+from utils.run_scheduler import scheduling
+import asyncio
+import csv
+import json
+import time
+
+# Columns read from a batch input file; everything else is ignored
+INPUT_FIELDS = ["companyName", "companyWebsite", "maxResults", "searchDepth"]
+
+# Rows buffered per Parquet part file
+PARQUET_BATCH_SIZE = 500
+
+def read_companies(path):
+    """Read company run inputs from a CSV or JSONL file"""
+    path = Path(path)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    companies = []
+    for row in rows:
+        company = {field: row[field] for field in INPUT_FIELDS if row.get(field) not in (None, "")}
+        if not company.get("companyName"):
+            continue
+        for field in ("maxResults", "searchDepth"):
+            if field in company:
+                company[field] = int(company[field])
+        companies.append(company)
+    return companies
+
+class JsonlResultWriter:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def write(self, record):
+        """Append one record and return the keys that are now durable"""
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        return [record["key"]]
+
+    def close(self):
+        """Flush and close the output file"""
+        self._file.close()
+        return []
+
+class ParquetResultWriter:
+    def __init__(self, path, batch_size=PARQUET_BATCH_SIZE):
+        import pyarrow  # noqa: F401 - fail early when the parquet extra is missing
+
+        # Parquet files can't be appended to, so each flush writes a new
+        # part file into the output directory
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self._rows = []
+
+    def write(self, record):
+        """Buffer one record and return the keys flushed to disk, if any"""
+        row = dict(record)
+        row["result"] = json.dumps(row["result"]) if row.get("result") is not None else None
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            return self.flush()
+        return []
+
+    def flush(self):
+        """Write buffered records as one part file"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._rows:
+            return []
+        part = self.path / f"part-{time.time_ns()}.parquet"
+        pq.write_table(pa.Table.from_pylist(self._rows), part)
+        keys = [row["key"] for row in self._rows]
+        self._rows = []
+        return keys
+
+    def close(self):
+        """Write any remaining buffered records"""
+        return self.flush()
+
+class BatchAuditRunner:
+    def __init__(self, apify_client, output_path, output_format="jsonl", workers=None, checkpoint_path=None, tenant=None,
+                 data_processor=None):
+        self.apify_client = apify_client
+        self.data_processor = data_processor or DataProcessor()
+        self.output_path = Path(output_path)
+        self.output_format = output_format
+        self.workers = workers or Config.MAX_CONCURRENT_ACTORS
+        self.checkpoint_path = Path(checkpoint_path or f"{self.output_path}.checkpoint")
+        self.tenant = tenant or f"batch:{self.output_path.name}"
+
+    def load_checkpoint(self):
+        """Keys of companies finished by earlier runs"""
+        if not self.checkpoint_path.exists():
+            return set()
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def open_writer(self):
+        """Open the result writer for the configured output format"""
+        if self.output_format == "parquet":
+            return ParquetResultWriter(self.output_path)
+        return JsonlResultWriter(self.output_path)
+
+    async def run_async(self, companies, progress=print):
+        """Audit companies on a bounded worker pool, resuming from the checkpoint"""
+        finished = self.load_checkpoint()
+        pending = []
+        for company in companies:
+            key = cache_key(Config.CUSTOMER_DISCOVERY_ACTOR, company)
+            if key not in finished:
+                finished.add(key)  # also drops duplicate rows in the input
+                pending.append((key, company))
+
+        queue = asyncio.Queue()
+        for item in pending:
+            queue.put_nowait(item)
+
+        stats = {"total": len(pending), "succeeded": 0, "failed": 0, "skipped": len(companies) - len(pending)}
+        writer = self.open_writer()
+        checkpoint = open(self.checkpoint_path, "a", encoding="utf-8")
+        started = time.monotonic()
+        succeeded_keys = set()
+
+        def record_done(keys):
+            # Only successes are checkpointed so failures are retried on rerun
+            for key in keys:
+                if key in succeeded_keys:
+                    checkpoint.write(key + "\n")
+            checkpoint.flush()
+
+        async def worker():
+            while True:
+                try:
+                    key, company = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                record = {"key": key, **{field: company.get(field) for field in INPUT_FIELDS}}
+                try:
+                    result = await self.apify_client.run_customer_discovery_async(company)
+                    if result is None:
+                        raise Exception("Discovery returned no result")
+                    result = self.data_processor.resolve_result(result)
+                    record.update(status="SUCCEEDED", error=None, result=result)
+                    record["customerCount"] = len(result.get("customers") or [])
+                    succeeded_keys.add(key)
+                    stats["succeeded"] += 1
+                except Exception as e:
+                    record.update(status="FAILED", error=str(e), result=None, customerCount=0)
+                    stats["failed"] += 1
+                record["finishedAt"] = datetime.now(timezone.utc).isoformat()
+
+                record_done(writer.write(record))
+
+                done = stats["succeeded"] + stats["failed"]
+                rate = done / max(time.monotonic() - started, 1e-9) * 60
+                progress(f"[{done}/{stats['total']}] {company['companyName']}: {record['status']} ({rate:.1f} companies/min)")
+
+        try:
+            # Batch runs queue behind interactive audits for account capacity
+            with scheduling("batch", tenant=self.tenant):
+                await asyncio.gather(*(worker() for _ in range(min(self.workers, len(pending)) or 1)))
+        finally:
+            record_done(writer.close())
+            checkpoint.close()
+
+        elapsed = time.monotonic() - started
+        stats["elapsed_seconds"] = elapsed
+        stats["companies_per_minute"] = (stats["succeeded"] + stats["failed"]) / elapsed * 60 if elapsed else 0
+        return stats
+
+    def run(self, companies, progress=print):
+        """Audit a list of companies"""
+        # The shared loop keeps the pooled Apify connections alive across batches
+        return HTTP_SESSIONS.run(self.run_async(companies, progress))
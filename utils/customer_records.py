@@ -0,0 +1,224 @@
+from array import array
+from datetime import datetime, timedelta, timezone
+from utils.lazy import lazy_import
+import json
+import math
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow", optional=True)
+
+# Fields of the discovery actor's customer records kept in typed columns;
+# anything else a record carries goes in a plain per-field list
+CORE_FIELDS = ["name", "source", "context", "confidence", "discoveredAt"]
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# numpy's NaT is the smallest int64, so missing timestamps convert for free
+MISSING_TIMESTAMP = -2 ** 63
+
+def to_micros(value):
+    """Microseconds since the epoch from an ISO timestamp (UTC if no offset)"""
+    # NaT is the only timestamp not equal to itself
+    if value is None or value != value:
+        return MISSING_TIMESTAMP
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+def from_micros(micros):
+    """ISO timestamp formatted like JavaScript's toISOString()"""
+    value = EPOCH + timedelta(microseconds=micros)
+    timespec = "milliseconds" if micros % 1000 == 0 else "microseconds"
+    return value.isoformat(timespec=timespec).replace("+00:00", "Z")
+
+class PackedStrings:
+    """Strings packed into one UTF-8 buffer with int64 offsets, Arrow's large_string layout"""
+
+    __slots__ = ("data", "offsets", "missing")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("q", [0])
+        self.missing = set()
+
+    def append(self, value):
+        if value is None:
+            self.missing.add(len(self.offsets) - 1)
+        else:
+            self.data += str(value).encode("utf-8")
+        self.offsets.append(len(self.data))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i in self.missing:
+            return None
+        return self.data[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def to_list(self):
+        if pa is not None and not self.missing:
+            values = pa.LargeStringArray.from_buffers(len(self), pa.py_buffer(self.offsets), pa.py_buffer(self.data))
+            return values.to_pylist()
+        return [self[i] for i in range(len(self))]
+
+class CustomerRecords:
+    """Customer mentions stored column-wise instead of one dict each
+
+    Names and contexts are packed into byte buffers, source URLs are
+    interned and stored as int32 codes, confidence as float32 and
+    discoveredAt as int64 microseconds. Iterating yields the usual dicts,
+    one at a time, so it can stand in wherever a list of customers goes.
+    """
+
+    __slots__ = ("names", "contexts", "source_codes", "sources", "_source_index",
+                 "confidence", "discovered_at", "extras", "fields", "_length")
+
+    def __init__(self):
+        self.names = PackedStrings()
+        self.contexts = PackedStrings()
+        self.source_codes = array("i")
+        self.sources = []
+        self._source_index = {}
+        self.confidence = array("f")
+        self.discovered_at = array("q")
+        self.extras = {}
+        # Fields seen in any record, in first-seen order
+        self.fields = {}
+        self._length = 0
+
+    @classmethod
+    def from_dicts(cls, customers):
+        """Build from customer dicts, consuming an iterator one record at a time"""
+        records = cls()
+        for customer in customers:
+            records.append(customer)
+        return records
+
+    @classmethod
+    def from_json(cls, text):
+        """Build from a JSON array of customer records"""
+        return cls.from_dicts(json.loads(text))
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build from a DataProcessor frame without going through row dicts"""
+        records = cls()
+        records._length = len(df)
+        records.fields = dict.fromkeys(df.columns)
+        # Columns the frame lacks are filled as missing, so every column
+        # stays as long as the records
+        missing = pd.Series([None] * len(df), index=df.index, dtype=object)
+
+        for field, column in (("name", records.names), ("context", records.contexts)):
+            for value in df.get(field, missing).tolist():
+                column.append(None if value is None or value != value else value)
+
+        codes, uniques = pd.factorize(df.get("source", missing))
+        records.sources = [str(source) for source in uniques]
+        records._source_index = {source: code for code, source in enumerate(records.sources)}
+        records.source_codes = array("i", codes.astype(np.int32).tobytes())
+
+        confidence = df["confidence"] if "confidence" in df.columns else missing.astype(np.float32)
+        records.confidence = array("f", confidence.to_numpy(dtype=np.float32, na_value=np.nan).tobytes())
+        discovered = pd.to_datetime(df.get("discoveredAt", missing), utc=True, format="ISO8601")
+        records.discovered_at = array("q", pd.DatetimeIndex(discovered).as_unit("us").asi8.tobytes())
+
+        for field in df.columns:
+            if field not in CORE_FIELDS:
+                records.extras[field] = [None if pd.api.types.is_scalar(value) and pd.isna(value) else value
+                                         for value in df[field].tolist()]
+        return records
+
+    def intern_source(self, source):
+        if source is None:
+            return -1
+        code = self._source_index.get(source)
+        if code is None:
+            code = self._source_index[source] = len(self.sources)
+            self.sources.append(source)
+        return code
+
+    def append(self, customer):
+        """Add one customer dict"""
+        for field in customer:
+            if field not in self.fields:
+                self.fields[field] = None
+                if field not in CORE_FIELDS:
+                    self.extras[field] = [None] * self._length
+
+        self.names.append(customer.get("name"))
+        self.contexts.append(customer.get("context"))
+        self.source_codes.append(self.intern_source(customer.get("source")))
+        confidence = customer.get("confidence")
+        self.confidence.append(math.nan if confidence is None else confidence)
+        self.discovered_at.append(to_micros(customer.get("discoveredAt")))
+        for field, values in self.extras.items():
+            values.append(customer.get(field))
+        self._length += 1
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i):
+        """The customer at position i as a dict, with only the fields it has"""
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError(i)
+
+        customer = {}
+        for field in self.fields:
+            if field == "name":
+                value = self.names[i]
+            elif field == "context":
+                value = self.contexts[i]
+            elif field == "source":
+                code = self.source_codes[i]
+                value = self.sources[code] if code >= 0 else None
+            elif field == "confidence":
+                value = self.confidence[i]
+                # float32 can't hold the actor's 3-decimal scores exactly
+                value = None if math.isnan(value) else round(value, 3)
+            elif field == "discoveredAt":
+                micros = self.discovered_at[i]
+                value = None if micros == MISSING_TIMESTAMP else from_micros(micros)
+            else:
+                value = self.extras[field][i]
+            if value is not None:
+                customer[field] = value
+        return customer
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield self[i]
+
+    def to_dicts(self):
+        return list(self)
+
+    def to_json(self):
+        """JSON array in the discovery actor's customer schema"""
+        return json.dumps(self.to_dicts())
+
+    def to_frame(self):
+        """A typed DataFrame like DataProcessor builds from dicts"""
+        columns = {}
+        for field in self.fields:
+            if field == "name":
+                columns[field] = self.names.to_list()
+            elif field == "context":
+                columns[field] = self.contexts.to_list()
+            elif field == "source":
+                codes = np.frombuffer(self.source_codes, dtype=np.int32)
+                columns[field] = pd.Categorical.from_codes(codes, categories=self.sources)
+            elif field == "confidence":
+                columns[field] = np.array(self.confidence, dtype=np.float32)
+            elif field == "discoveredAt":
+                micros = np.array(self.discovered_at, dtype=np.int64).view("datetime64[us]")
+                columns[field] = pd.DatetimeIndex(micros).tz_localize("UTC")
+            else:
+                columns[field] = self.extras[field]
+        return pd.DataFrame(columns)
@@ -1,34 +1,326 @@
-import pandas as pd
+import re
+import zlib
+from collections import defaultdict
+from itertools import islice
+from utils.customer_records import CustomerRecords
+from utils.extraction_engine import normalize_name
+from utils.lazy import lazy_import
+from utils.metrics import timer
+
+# Loaded on first use, so importing this module stays cheap at startup
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow", optional=True)
+pc = lazy_import("pyarrow.compute", optional=True)
+
+# Customers converted to a DataFrame at a time when consuming an iterator
+CHUNK_SIZE = 10000
+
+# Confidence above which a customer counts as high confidence
+HIGH_CONFIDENCE_THRESHOLD = 0.8
+
+# Legal suffixes from the discovery actor's company regex, plus the long
+# forms they abbreviate, stripped from the end of names before they are
+# compared ("Acme Co., Ltd." but not the "Co" of "Co-op Bank")
+LEGAL_SUFFIX_PATTERN = re.compile(
+    r"(?:[\s,]+(?:inc|incorporated|llc|corp|corporation|company|co|ltd|limited)\b\.?)+\s*$", re.IGNORECASE
+)
+NON_NAME_CHARACTERS = re.compile(r"[^\w&\s]")
+
+# MinHash/LSH blocking: SIGNATURE_SIZE hashes split into LSH_BANDS bands.
+# Names sharing any band become candidates, which are then confirmed by
+# trigram Jaccard similarity.
+SIGNATURE_SIZE = 32
+LSH_BANDS = 8
+SIMILARITY_THRESHOLD = 0.7
+MERSENNE_PRIME = (1 << 61) - 1
+
+def canonical_name(name):
+    """Lowercase a company name and drop punctuation and trailing legal suffixes
+
+    A name that is nothing but a suffix ("Inc.") keeps it, so it is still
+    compared rather than dropped.
+    """
+    canonical = " ".join(NON_NAME_CHARACTERS.sub(" ", LEGAL_SUFFIX_PATTERN.sub("", name).lower()).split())
+    return canonical or normalize_name(name)
+
+def name_shingles(name):
+    """Character trigrams of a canonical name, padded so short names still shingle"""
+    padded = f" {name} "
+    return {padded[i:i + 3] for i in range(max(len(padded) - 2, 1))}
+
+class EntityResolver:
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, signature_size=SIGNATURE_SIZE, bands=LSH_BANDS, seed=0):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = signature_size // bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_PRIME, size=(signature_size, 1), dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, size=(signature_size, 1), dtype=np.uint64)
+
+    def signatures(self, shingle_sets, batch_size=10000):
+        """MinHash signatures for many shingle sets, one row per set"""
+        rows = []
+        for start in range(0, len(shingle_sets), batch_size):
+            batch = shingle_sets[start:start + batch_size]
+            lengths = np.fromiter((len(shingles) for shingles in batch), dtype=np.int64, count=len(batch))
+            hashes = np.fromiter(
+                (zlib.crc32(shingle.encode("utf-8")) for shingles in batch for shingle in shingles),
+                dtype=np.uint64,
+                count=int(lengths.sum())
+            )
+            # uint64 arithmetic wraps, which is fine for hashing purposes
+            values = (self._a * hashes + self._b) % MERSENNE_PRIME
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            rows.append(np.minimum.reduceat(values, offsets, axis=1).T)
+        return np.concatenate(rows) if rows else np.empty((0, self.bands * self.rows), dtype=np.uint64)
+
+    def candidate_buckets(self, signatures):
+        """Yield groups of row indices that share at least one LSH band"""
+        for band in range(self.bands):
+            band_rows = signatures[:, band * self.rows:(band + 1) * self.rows]
+            _, bucket_ids = np.unique(band_rows, axis=0, return_inverse=True)
+            bucket_ids = bucket_ids.ravel()
+
+            # Most names sit alone in their bucket; skip those up front
+            shared = np.flatnonzero(np.bincount(bucket_ids)[bucket_ids] > 1)
+            if not shared.size:
+                continue
+            order = shared[np.argsort(bucket_ids[shared], kind="stable")]
+            boundaries = np.flatnonzero(np.diff(bucket_ids[order])) + 1
+            for members in np.split(order, boundaries):
+                yield members.tolist()
+
+    def cluster(self, keys):
+        """Group canonical names that are near-duplicates; returns a root per key"""
+        if not keys:
+            return []
+        parent = list(range(len(keys)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        shingles = [name_shingles(key) for key in keys]
+        buckets = self.candidate_buckets(self.signatures(shingles))
+
+        # Only names that share a bucket are ever compared
+        checked = set()
+        for members in buckets:
+            for position, i in enumerate(members):
+                for j in members[position + 1:]:
+                    if (i, j) in checked or find(i) == find(j):
+                        continue
+                    checked.add((i, j))
+                    overlap = len(shingles[i] & shingles[j])
+                    if overlap / (len(shingles[i]) + len(shingles[j]) - overlap) >= self.threshold:
+                        parent[find(j)] = find(i)
+
+        return [find(i) for i in range(len(keys))]
+
+    def resolve(self, customers):
+        """Merge customer mentions into one record per company"""
+        # Exact canonical matches collapse first, so the fuzzy pass only
+        # sees each distinct name once
+        groups = defaultdict(list)
+        for customer in customers:
+            key = canonical_name(customer.get("name", ""))
+            if key:
+                groups[key].append(customer)
+
+        keys = list(groups)
+        entities = defaultdict(list)
+        for key, root in zip(keys, self.cluster(keys)):
+            entities[root].extend(groups[key])
+
+        return [self.merge(mentions) for mentions in entities.values()]
+
+    def merge(self, mentions):
+        """Combine the evidence from every mention of one company"""
+        best = max(mentions, key=lambda mention: mention.get("confidence") or 0)
+        name_counts = defaultdict(int)
+        sources = []
+        seen_sources = set()
+        for mention in mentions:
+            name_counts[mention["name"]] += mention.get("mentions", 1)
+            for source in mention.get("sources") or [mention.get("source")]:
+                if source is not None and source not in seen_sources:
+                    seen_sources.add(source)
+                    sources.append(source)
+
+        discovered = [mention["discoveredAt"] for mention in mentions if mention.get("discoveredAt")]
+        merged = dict(best)
+        merged.update(
+            # The most frequently seen spelling wins, ties go to the best mention
+            name=max(name_counts, key=lambda name: (name_counts[name], name == best["name"])),
+            canonicalName=canonical_name(best["name"]),
+            sources=sources,
+            mentions=sum(name_counts.values())
+        )
+        if discovered:
+            merged["discoveredAt"] = min(discovered)
+        return merged
+
+def parse_timestamps(values):
+    """discoveredAt values as UTC timestamps; ones without an offset are taken as UTC"""
+    return pd.to_datetime(values, utc=True, format="ISO8601")
 
 class DataProcessor:
-    def __init__(self):
-        pass
-        
+    def __init__(self, chunk_size=CHUNK_SIZE, use_arrow=None):
+        self.chunk_size = chunk_size
+        # Default to the Arrow ingest path whenever pyarrow is installed
+        if use_arrow is None:
+            use_arrow = pa is not None
+        self.use_arrow = use_arrow and pa is not None
+
+    def iter_chunks(self, customers_data):
+        """Yield customer records in lists of at most chunk_size"""
+        if customers_data is None:
+            return
+        iterator = iter(customers_data)
+        while True:
+            chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _chunk_to_frame(self, chunk):
+        """Convert one chunk of customer dicts to a typed DataFrame"""
+        if self.use_arrow:
+            table = pa.Table.from_pylist(chunk)
+            names = table.column_names
+            if "source" in names:
+                source = table["source"]
+                # A chunk with no sources at all comes in as Arrow's null type,
+                # which pandas can't use as categories
+                if pa.types.is_null(source.type):
+                    source = source.cast(pa.string())
+                table = table.set_column(names.index("source"), "source", pc.dictionary_encode(source))
+            if "confidence" in names:
+                table = table.set_column(names.index("confidence"), "confidence", pc.cast(table["confidence"], pa.float32()))
+            df = table.to_pandas()
+            # Arrow hands list fields (like merged "sources") back as arrays
+            for name in names:
+                if pa.types.is_list(table[name].type):
+                    df[name] = table[name].to_pylist()
+        else:
+            df = pd.DataFrame(chunk)
+            if "source" in df.columns:
+                df["source"] = df["source"].astype("category")
+            if "confidence" in df.columns:
+                df["confidence"] = df["confidence"].astype("float32")
+
+        # Timestamps are parsed by pandas on both paths: Arrow's cast rejects
+        # ISO strings without an offset
+        if "discoveredAt" in df.columns:
+            df["discoveredAt"] = parse_timestamps(df["discoveredAt"])
+        return df
+
+    def build_frame(self, customers_data):
+        """Ingest customers once into a typed DataFrame
+
+        Accepts a list or iterator of customer dicts, CustomerRecords, or a
+        frame that was already built, which is returned as is.
+        """
+        if isinstance(customers_data, pd.DataFrame):
+            return customers_data
+
+        with timer("dataframe_build"):
+            if isinstance(customers_data, CustomerRecords):
+                return customers_data.to_frame()
+            return self._build_frame(customers_data)
+
+    def _build_frame(self, customers_data):
+        frames = [self._chunk_to_frame(chunk) for chunk in self.iter_chunks(customers_data)]
+        if not frames:
+            return pd.DataFrame()
+        if len(frames) == 1:
+            return frames[0]
+
+        df = pd.concat(frames, ignore_index=True)
+        # Chunks carry different source categories, which concat widens to object
+        if "source" in df.columns and not isinstance(df["source"].dtype, pd.CategoricalDtype):
+            df["source"] = df["source"].astype("category")
+        return df
+
+    def _stream_confidence(self, customers_data):
+        """Count customers chunk by chunk, keeping only their confidence column
+
+        Running totals keep memory flat when fed a dataset iterator: only
+        the float32 scores outlive each chunk, for the quartiles.
+        """
+        total = 0
+        scores = []
+        has_confidence = False
+        for chunk in self.iter_chunks(customers_data):
+            total += len(chunk)
+            has_confidence = has_confidence or any("confidence" in customer for customer in chunk)
+            values = pd.Series([customer.get("confidence") for customer in chunk], dtype="float32")
+            scores.append(values.to_numpy(na_value=np.nan))
+        if not has_confidence:
+            return total, None
+        return total, pd.Series(np.concatenate(scores), dtype="float32")
+
+    def resolve_entities(self, customers_data):
+        """Merge duplicate mentions of the same company into one row each"""
+        if isinstance(customers_data, pd.DataFrame):
+            customers_data = customers_data.to_dict("records")
+        return self.build_frame(EntityResolver().resolve(customers_data or []))
+
+    def resolve_customers(self, customers, max_results=None):
+        """Customer dicts with near-duplicate companies merged, best first"""
+        resolved = EntityResolver().resolve(customers or [])
+        resolved.sort(key=lambda customer: customer.get("confidence") or 0, reverse=True)
+        return resolved[:max_results]
+
+    def resolve_result(self, result, max_results=None):
+        """A discovery result with one customer per company
+
+        The actor only merges exact name matches, so "Acme Corp" and "ACME
+        Corporation" come back as two customers until they go through here.
+        """
+        if not result:
+            return result
+        customers = self.resolve_customers(result.get("customers"), max_results)
+        summary = dict(result.get("summary") or {})
+        summary["totalCustomersFound"] = len(customers)
+        summary["averageConfidence"] = (
+            round(sum(customer.get("confidence") or 0 for customer in customers) / len(customers), 3) if customers else 0
+        )
+        return {**result, "customers": customers, "summary": summary}
+
     def process_customers(self, customers_data):
         """Process raw customer data"""
-        if not customers_data:
-            return pd.DataFrame()
-            
-        df = pd.DataFrame(customers_data)
-        
-        # Clean and enhance data
+        df = self.build_frame(customers_data)
+
+        # Clean and enhance data without touching the caller's frame
         if "confidence" in df.columns:
-            df["confidence"] = df["confidence"].round(3)
-            
-        if "discoveredAt" in df.columns:
-            df["discoveredAt"] = pd.to_datetime(df["discoveredAt"])
-            
+            df = df.assign(confidence=df["confidence"].round(3))
+
         return df
-        
+
     def generate_summary(self, customers_data):
         """Generate summary statistics"""
-        if not customers_data:
+        if isinstance(customers_data, (pd.DataFrame, CustomerRecords)):
+            df = self.build_frame(customers_data)
+            total = len(df)
+            confidence = df["confidence"] if "confidence" in df.columns else None
+        else:
+            total, confidence = self._stream_confidence(customers_data)
+        if not total:
             return {}
-            
-        df = pd.DataFrame(customers_data)
-        
-        return {
-            "total_customers": len(df),
-            "avg_confidence": df["confidence"].mean() if "confidence" in df.columns else 0,
-            "high_confidence_count": len(df[df["confidence"] > 0.8]) if "confidence" in df.columns else 0
-        }
\ No newline at end of file
+
+        summary = {
+            "total_customers": total,
+            "avg_confidence": 0,
+            "high_confidence_count": 0
+        }
+
+        if confidence is not None:
+            summary["avg_confidence"] = float(confidence.mean())
+            summary["high_confidence_count"] = int((confidence > HIGH_CONFIDENCE_THRESHOLD).sum())
+            summary["confidence_stats"] = confidence.describe().astype(float).to_dict()
+
+        return summary
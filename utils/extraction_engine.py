@@ -0,0 +1,135 @@
+from datetime import datetime, timezone
+from utils.lazy import lazy_import
+import re
+
+np = lazy_import("numpy")
+
+# What JavaScript's \s matches and trim() strips: Unicode whitespace such as
+# the NBSP that &nbsp; turns into, unlike Python's \s under re.ASCII
+JS_WHITESPACE = "\t\n\v\f\r \u00a0\u1680" + "".join(map(chr, range(0x2000, 0x200b))) + "\u2028\u2029\u202f\u205f\u3000\ufeff"
+_JS_SPACE = re.escape(JS_WHITESPACE)
+
+# Same patterns and weights as the hero-customer-discovery actor (main.js).
+# re.ASCII keeps \b aligned with JavaScript's ASCII word boundaries.
+COMPANY_PATTERN = re.compile(
+    rf"\b([A-Z][a-zA-Z{_JS_SPACE}&.,-]{{2,40}}(?:[{_JS_SPACE}](?:Inc|LLC|Corp|Company|Ltd))?)\b", re.ASCII
+)
+LEGAL_SUFFIX_PATTERN = re.compile(r"\b(Inc|LLC|Corp|Company|Ltd)\b", re.ASCII)
+POSITIVE_KEYWORDS = ["customer", "client", "testimonial", "case study", "success"]
+
+# One pass over the text finds every keyword; the lookahead makes matches
+# zero-width so overlapping keywords are all seen, like separate includes()
+KEYWORD_PATTERN = re.compile("(?=(" + "|".join(re.escape(keyword) for keyword in POSITIVE_KEYWORDS) + "))")
+
+BASE_CONFIDENCE = 0.5
+KEYWORD_WEIGHT = 0.1
+LEGAL_SUFFIX_WEIGHT = 0.1
+MAX_CONFIDENCE = 0.99
+
+# Characters ignored when deciding whether two names are the same customer
+NAME_PUNCTUATION = re.compile(r"[^\w&\s]")
+
+def normalize_name(name):
+    """Canonical form used to spot duplicate customer names"""
+    return " ".join(NAME_PUNCTUATION.sub(" ", name.lower()).split())
+
+def js_trim(text):
+    """JavaScript's String.prototype.trim()"""
+    return text.strip(JS_WHITESPACE)
+
+def iso_timestamp():
+    """UTC timestamp formatted like JavaScript's toISOString()"""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+class ExtractionEngine:
+    def __init__(self, company_name):
+        self.company_name = company_name
+        self.company_key = company_name.lower()
+
+    def keyword_hits(self, texts):
+        """Number of distinct positive keywords in each text block"""
+        return np.fromiter(
+            (len(set(KEYWORD_PATTERN.findall(text.lower()))) for text in texts),
+            dtype=np.int8,
+            count=len(texts)
+        )
+
+    def score(self, keyword_hits, has_legal_suffix):
+        """Vectorized calculateConfidence over whole batches"""
+        confidence = BASE_CONFIDENCE + KEYWORD_WEIGHT * keyword_hits + LEGAL_SUFFIX_WEIGHT * has_legal_suffix
+        return np.minimum(confidence, MAX_CONFIDENCE)
+
+    def extract_columns(self, texts):
+        """Names found in stripped text blocks, as (names, block index, confidence)
+
+        Columnar so callers can ship the result around as arrays instead of
+        one dict per mention.
+        """
+        # Keyword scoring depends only on the block, so do it once per block
+        # rather than once per name found in it
+        block_hits = self.keyword_hits(texts)
+
+        names = []
+        block_index = []
+        for i, text in enumerate(texts):
+            for match in COMPANY_PATTERN.finditer(text):
+                name = js_trim(match.group(1))
+                if 2 < len(name) < 50 and self.company_key not in name.lower():
+                    names.append(name)
+                    block_index.append(i)
+
+        block_index = np.asarray(block_index, dtype=np.int32)
+        has_suffix = np.fromiter((LEGAL_SUFFIX_PATTERN.search(name) is not None for name in names), dtype=bool, count=len(names))
+        confidence = np.round(self.score(block_hits[block_index], has_suffix), 3)
+        return names, block_index, confidence
+
+    def extract(self, blocks):
+        """Extract scored customer mentions from (source, text) blocks"""
+        blocks = [(source, js_trim(text)) for source, text in blocks]
+        names, block_index, confidence = self.extract_columns([text for _, text in blocks])
+        if not names:
+            return []
+
+        discovered_at = iso_timestamp()
+        return [
+            {
+                "name": name,
+                "source": blocks[i][0],
+                "context": blocks[i][1][:200],
+                "confidence": float(score),
+                "discoveredAt": discovered_at
+            }
+            for name, i, score in zip(names, block_index.tolist(), confidence.tolist())
+        ]
+
+    def deduplicate(self, customers):
+        """Merge mentions of the same customer into one record
+
+        The highest-confidence mention supplies the name, source and context;
+        every source and the mention count are kept.
+        """
+        merged = {}
+        for customer in customers:
+            key = normalize_name(customer["name"])
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = dict(customer, sources=[customer["source"]], mentions=1)
+                continue
+
+            existing["mentions"] += 1
+            if customer["source"] not in existing["sources"]:
+                existing["sources"].append(customer["source"])
+            if customer["confidence"] > existing["confidence"]:
+                existing.update(
+                    name=customer["name"],
+                    source=customer["source"],
+                    context=customer["context"],
+                    confidence=customer["confidence"]
+                )
+        return list(merged.values())
+
+    def discover(self, blocks, max_results=50):
+        """Extract, merge and rank customers the way the discovery actor does"""
+        customers = self.deduplicate(self.extract(blocks))
+        customers.sort(key=lambda customer: customer["confidence"], reverse=True)
+        return customers[:max_results]
@@ -0,0 +1,253 @@
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, unquote, urlsplit
+import gzip
+import http.server
+import itertools
+import json
+import random
+import threading
+import time
+
+# Longest waitForFinish the real API honours
+MAX_WAIT_FOR_FINISH_SECS = 60
+
+# x-apify-pagination-limit the API reports when no limit was asked for
+NO_LIMIT = 999999999999
+
+def iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+class FakeApify:
+    """In-memory actor runs and datasets behind the fake Apify API
+
+    Every run takes run_secs (plus up to run_jitter_secs more), fails with
+    probability failure_rate, and pushes one discovery result holding
+    dataset_size customers. Any request is refused with a 429 with
+    probability rate_limit_rate.
+    """
+
+    def __init__(self, run_secs=1.0, run_jitter_secs=0.0, failure_rate=0.0, rate_limit_rate=0.0,
+                 dataset_size=20, max_concurrent_runs=25, seed=None):
+        self.run_secs = run_secs
+        self.run_jitter_secs = run_jitter_secs
+        self.failure_rate = failure_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.dataset_size = dataset_size
+        self.max_concurrent_runs = max_concurrent_runs
+        self.runs = {}
+        self.datasets = {}
+        self.requests = 0
+        self.rate_limited = 0
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def admit(self):
+        """Count a request; False when it should be refused with a 429"""
+        with self._lock:
+            self.requests += 1
+            if self.rate_limit_rate > 0 and self._random.random() < self.rate_limit_rate:
+                self.rate_limited += 1
+                return False
+            return True
+
+    def result(self, input_data, finished_at):
+        """The record the discovery actor pushes, with synthetic customers"""
+        company_name = input_data.get("companyName") or "Unknown"
+        website = (input_data.get("companyWebsite") or "https://example.com").rstrip("/")
+        customers = [
+            {
+                "name": f"Customer {i + 1} Inc",
+                "source": f"{website}/customers",
+                "context": f"Customer {i + 1} Inc is a happy customer of {company_name}.",
+                "confidence": 0.8,
+                "discoveredAt": iso(finished_at)
+            }
+            for i in range(self.dataset_size)
+        ]
+        return {
+            "companyName": company_name,
+            "companyWebsite": input_data.get("companyWebsite"),
+            "timestamp": iso(finished_at),
+            "customers": customers,
+            "summary": {"totalCustomersFound": len(customers), "averageConfidence": 0.8 if customers else 0, "urlsProcessed": 1},
+            "status": "SUCCESS"
+        }
+
+    def start_run(self, actor_id, input_data, memory_mbytes=None, timeout_secs=None):
+        now = time.time()
+        with self._lock:
+            number = next(self._ids)
+            duration = self.run_secs + self._random.uniform(0, self.run_jitter_secs)
+            failed = self.failure_rate > 0 and self._random.random() < self.failure_rate
+
+        status = "FAILED" if failed else "SUCCEEDED"
+        if timeout_secs and duration > timeout_secs:
+            duration, status = timeout_secs, "TIMED-OUT"
+
+        run_id = f"fake-run-{number}"
+        dataset_id = f"fake-dataset-{number}"
+        self.datasets[dataset_id] = [self.result(input_data, now + duration)] if status == "SUCCEEDED" else []
+        self.runs[run_id] = {
+            "id": run_id,
+            "actId": actor_id,
+            "startedAt": now,
+            "finishesAt": now + duration,
+            "outcome": status,
+            "defaultDatasetId": dataset_id,
+            "options": {"memoryMbytes": memory_mbytes or 1024, "timeoutSecs": timeout_secs or 0}
+        }
+        return self.run(run_id)
+
+    def run(self, run_id):
+        """The run as the API returns it, with its status as of now"""
+        state = self.runs.get(run_id)
+        if state is None:
+            return None
+        now = time.time()
+        finished = state["outcome"] == "ABORTED" or now >= state["finishesAt"]
+        finished_at = min(now, state["finishesAt"]) if finished else None
+        return {
+            "id": run_id,
+            "actId": state["actId"],
+            "status": state["outcome"] if finished else "RUNNING",
+            "startedAt": iso(state["startedAt"]),
+            "finishedAt": iso(finished_at) if finished_at else None,
+            "defaultDatasetId": state["defaultDatasetId"],
+            "options": state["options"],
+            "stats": {"runTimeSecs": round((finished_at or now) - state["startedAt"], 3)}
+        }
+
+    def wait_for_run(self, run_id, wait_secs):
+        """Hold the request until the run finishes or wait_secs pass, like waitForFinish"""
+        state = self.runs.get(run_id)
+        if state is not None and state["outcome"] != "ABORTED":
+            remaining = state["finishesAt"] - time.time()
+            if remaining > 0:
+                time.sleep(min(remaining, wait_secs, MAX_WAIT_FOR_FINISH_SECS))
+        return self.run(run_id)
+
+    def abort_run(self, run_id):
+        state = self.runs.get(run_id)
+        if state is None:
+            return None
+        if time.time() < state["finishesAt"]:
+            state["outcome"] = "ABORTED"
+            state["finishesAt"] = time.time()
+            self.datasets[state["defaultDatasetId"]] = []
+        return self.run(run_id)
+
+    def running(self):
+        now = time.time()
+        return sum(1 for state in list(self.runs.values()) if state["outcome"] != "ABORTED" and now < state["finishesAt"])
+
+    def limits(self):
+        return {
+            "limits": {"maxConcurrentActorJobs": self.max_concurrent_runs},
+            "current": {"activeActorJobCount": self.running()}
+        }
+
+class FakeApifyHandler(http.server.BaseHTTPRequestHandler):
+    """The Apify v2 endpoints ApifyClient uses, answered from a FakeApify"""
+
+    fake = None
+    protocol_version = "HTTP/1.1"
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_api_error(self, status, error_type, message, headers=None):
+        self.send_json(status, {"error": {"type": error_type, "message": message}}, headers)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.headers.get("Content-Encoding") == "gzip":
+            # The SDK compresses request bodies
+            body = gzip.decompress(body)
+        return json.loads(body) if body else {}
+
+    def handle_api(self, method):
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        # Read the body even when refusing, so the kept-alive connection stays in sync
+        body = self.read_json() if method == "POST" else None
+
+        if not self.fake.admit():
+            self.send_api_error(429, "rate-limit-exceeded", "You have exceeded the rate limit", {"Retry-After": "1"})
+            return
+
+        if parts[:1] != ["v2"]:
+            self.send_api_error(404, "page-not-found", "Not found")
+            return
+        parts = parts[1:]
+
+        if method == "POST" and len(parts) == 3 and parts[0] == "acts" and parts[2] == "runs":
+            # The SDK sends "username/actor" as "username~actor"
+            actor_id = parts[1].replace("~", "/")
+            run = self.fake.start_run(
+                actor_id, body,
+                memory_mbytes=int(query["memory"]) if "memory" in query else None,
+                timeout_secs=int(query["timeout"]) if "timeout" in query else None
+            )
+            self.send_json(201, {"data": run})
+        elif method == "GET" and len(parts) == 2 and parts[0] == "actor-runs":
+            run = self.fake.wait_for_run(parts[1], float(query.get("waitForFinish") or 0))
+            self.send_run(run)
+        elif method == "POST" and len(parts) == 3 and parts[0] == "actor-runs" and parts[2] == "abort":
+            self.send_run(self.fake.abort_run(parts[1]))
+        elif method == "GET" and len(parts) == 3 and parts[0] == "datasets" and parts[2] == "items":
+            self.send_items(parts[1], int(query.get("offset") or 0), int(query["limit"]) if "limit" in query else None)
+        elif method == "GET" and parts == ["users", "me", "limits"]:
+            self.send_json(200, {"data": self.fake.limits()})
+        else:
+            self.send_api_error(404, "page-not-found", "Not found")
+
+    def send_run(self, run):
+        if run is None:
+            self.send_api_error(404, "record-not-found", "Actor run was not found")
+        else:
+            self.send_json(200, {"data": run})
+
+    def send_items(self, dataset_id, offset, limit):
+        items = self.fake.datasets.get(dataset_id)
+        if items is None:
+            self.send_api_error(404, "record-not-found", "Dataset was not found")
+            return
+        page = items[offset:None if limit is None else offset + limit]
+        self.send_json(200, page, {
+            "x-apify-pagination-total": str(len(items)),
+            "x-apify-pagination-offset": str(offset),
+            "x-apify-pagination-limit": str(NO_LIMIT if limit is None else limit),
+            "x-apify-pagination-count": str(len(page)),
+            "x-apify-pagination-desc": ""
+        })
+
+    def do_GET(self):
+        self.handle_api("GET")
+
+    def do_POST(self):
+        self.handle_api("POST")
+
+    def log_message(self, format, *args):
+        pass
+
+def start_fake_apify_server(port=0, address="127.0.0.1", fake=None):
+    """Serve a FakeApify from a background thread; its URL is server.url"""
+    fake = fake or FakeApify()
+    handler = type("BoundFakeApifyHandler", (FakeApifyHandler,), {"fake": fake})
+    server = http.server.ThreadingHTTPServer((address, port), handler)
+    server.daemon_threads = True
+    server.fake = fake
+    server.url = f"http://{address}:{server.server_port}"
+    thread = threading.Thread(target=server.serve_forever, name="fake-apify", daemon=True)
+    thread.start()
+    return server
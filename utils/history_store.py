@@ -0,0 +1,233 @@
+from config import Config
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audits (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    company_name TEXT NOT NULL,
+    company_key TEXT NOT NULL,
+    company_website TEXT,
+    created_at TEXT NOT NULL,
+    status TEXT,
+    total_customers INTEGER NOT NULL,
+    avg_confidence REAL,
+    high_confidence_count INTEGER,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_audits_company ON audits (company_key, id DESC);
+CREATE INDEX IF NOT EXISTS idx_audits_created ON audits (created_at);
+
+CREATE TABLE IF NOT EXISTS customers (
+    audit_id INTEGER NOT NULL REFERENCES audits (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    source TEXT,
+    context TEXT,
+    confidence REAL,
+    discovered_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_customers_audit ON customers (audit_id);
+CREATE INDEX IF NOT EXISTS idx_customers_name ON customers (name_key, confidence DESC);
+CREATE INDEX IF NOT EXISTS idx_customers_confidence ON customers (confidence);
+CREATE INDEX IF NOT EXISTS idx_customers_discovered ON customers (discovered_at);
+
+CREATE TABLE IF NOT EXISTS page_states (
+    company_key TEXT NOT NULL,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (company_key, url)
+);
+"""
+
+AUDIT_COLUMNS = "id, company_name, company_website, created_at, status, total_customers, avg_confidence, high_confidence_count"
+CUSTOMER_COLUMNS = ["name", "source", "context", "confidence", "discoveredAt"]
+
+def company_key(name):
+    """Case- and whitespace-insensitive company lookup key"""
+    return " ".join((name or "").lower().split())
+
+def iso_or_none(value):
+    """Store timestamps as ISO strings whatever form they arrive in"""
+    if value is None or value != value:  # None or NaN/NaT
+        return None
+    if hasattr(value, "isoformat"):
+        # Match the actor's toISOString() form so string comparisons line up
+        timespec = "milliseconds" if value.microsecond % 1000 == 0 else "microseconds"
+        value = value.isoformat(timespec=timespec)
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+    return str(value)
+
+class HistoryStore:
+    def __init__(self, path=None):
+        self.path = path or Config.HISTORY_PATH
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def iter_customer_rows(self, audit_id, customers):
+        """Yield insert tuples from a list of dicts or a DataProcessor frame"""
+        if hasattr(customers, "columns"):
+            columns = [customers[c] if c in customers.columns else [None] * len(customers) for c in CUSTOMER_COLUMNS]
+            rows = zip(*columns)
+        else:
+            rows = ((customer.get(c) for c in CUSTOMER_COLUMNS) for customer in customers)
+
+        for name, source, context, confidence, discovered_at in rows:
+            if not isinstance(name, str):
+                continue
+            yield (
+                audit_id,
+                name,
+                company_key(name),
+                None if source is None else str(source),
+                context if isinstance(context, str) else None,
+                None if confidence is None or confidence != confidence else float(confidence),
+                iso_or_none(discovered_at)
+            )
+
+    def save_audit(self, result, summary=None, customers=None):
+        """Store one audit run and its customers; returns the audit id
+
+        customers defaults to result["customers"] and may be the frame
+        built by DataProcessor.
+        """
+        customers = result.get("customers", []) if customers is None else customers
+        summary = summary or {}
+        total = summary.get("total_customers", len(customers))
+
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO audits (company_name, company_key, company_website, created_at, status, "
+                "total_customers, avg_confidence, high_confidence_count, summary) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    result.get("companyName", "Unknown"),
+                    company_key(result.get("companyName")),
+                    result.get("companyWebsite"),
+                    result.get("timestamp") or datetime.now(timezone.utc).isoformat(),
+                    result.get("status"),
+                    int(total),
+                    float(summary["avg_confidence"]) if summary.get("avg_confidence") is not None else None,
+                    int(summary.get("high_confidence_count", 0)),
+                    json.dumps(summary, default=float)
+                )
+            )
+            audit_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO customers (audit_id, name, name_key, source, context, confidence, discovered_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self.iter_customer_rows(audit_id, customers)
+            )
+        return audit_id
+
+    def recent_audits(self, limit=None, before_id=None, company=None):
+        """Newest audits first, paginated by id so every page is an index seek
+
+        Pass the id of the last audit on the previous page as before_id.
+        """
+        limit = limit or Config.HISTORY_PAGE_SIZE
+        clauses = []
+        params = []
+        if before_id is not None:
+            clauses.append("id < ?")
+            params.append(before_id)
+        if company:
+            clauses.append("company_key = ?")
+            params.append(company_key(company))
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {AUDIT_COLUMNS} FROM audits {where} ORDER BY id DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_audit(self, audit_id):
+        """One audit with its summary and customers, or None"""
+        with self._lock:
+            audit = self._conn.execute(
+                f"SELECT {AUDIT_COLUMNS}, summary FROM audits WHERE id = ?", (audit_id,)
+            ).fetchone()
+            if audit is None:
+                return None
+            customers = self._conn.execute(
+                "SELECT name, source, context, confidence, discovered_at AS discoveredAt "
+                "FROM customers WHERE audit_id = ? ORDER BY confidence DESC",
+                (audit_id,)
+            ).fetchall()
+
+        audit = dict(audit)
+        audit["summary"] = json.loads(audit["summary"]) if audit["summary"] else {}
+        audit["customers"] = [dict(row) for row in customers]
+        return audit
+
+    def latest_audit(self, company):
+        """Most recent audit of a company with its customers, or None"""
+        audits = self.recent_audits(limit=1, company=company)
+        return self.get_audit(audits[0]["id"]) if audits else None
+
+    def page_states(self, company):
+        """Validators and content hashes of the pages crawled for a company"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, etag, last_modified, content_hash FROM page_states WHERE company_key = ?",
+                (company_key(company),)
+            ).fetchall()
+        return {
+            row["url"]: {"etag": row["etag"], "lastModified": row["last_modified"], "contentHash": row["content_hash"]}
+            for row in rows
+        }
+
+    def save_page_states(self, company, pages):
+        """Upsert page validators reported by a discovery run"""
+        now = datetime.now(timezone.utc).isoformat()
+        key = company_key(company)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO page_states (company_key, url, etag, last_modified, content_hash, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (key, url, page.get("etag"), page.get("lastModified"), page.get("contentHash"), now)
+                    for url, page in pages.items()
+                    if page.get("contentHash")
+                ]
+            )
+
+    def find_customers(self, name=None, min_confidence=None, since=None, limit=None, offset=0):
+        """Customers across all audits, filtered on indexed columns"""
+        limit = limit or Config.HISTORY_PAGE_SIZE
+        clauses = []
+        params = []
+        if name:
+            clauses.append("c.name_key = ?")
+            params.append(company_key(name))
+        if min_confidence is not None:
+            clauses.append("c.confidence >= ?")
+            params.append(min_confidence)
+        if since is not None:
+            clauses.append("c.discovered_at >= ?")
+            params.append(iso_or_none(since))
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT c.audit_id, a.company_name, c.name, c.source, c.confidence, c.discovered_at AS discoveredAt "
+                f"FROM customers c JOIN audits a ON a.id = c.audit_id {where} "
+                "ORDER BY c.confidence DESC LIMIT ? OFFSET ?",
+                (*params, limit, offset)
+            ).fetchall()
+        return [dict(row) for row in rows]
@@ -0,0 +1,229 @@
+from config import Config
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from urllib.parse import parse_qsl, urlsplit
+from urllib3.util.retry import Retry
+import asyncio
+import httpx
+import requests
+import threading
+import time
+import weakref
+
+# Responses worth retrying: rate limits and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# API responses meaning the account is at a limit rather than the request being wrong
+LIMIT_STATUS_CODES = (402, 429)
+
+def retry_after_secs(response):
+    """Seconds a response's Retry-After header asks to wait, or None"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class LimitResponse(Exception):
+    """A 402/429 raised straight away instead of being retried by the SDK"""
+
+    def __init__(self, response):
+        try:
+            error = response.json().get("error") or {}
+        except ValueError:
+            error = {}
+        super().__init__(error.get("message") or f"HTTP {response.status_code}")
+        self.status_code = response.status_code
+        self.type = error.get("type")
+        self.retry_after = retry_after_secs(response)
+
+async def raise_for_limits(response):
+    # httpx response hook; the SDK doesn't retry exceptions it doesn't know
+    if response.status_code in LIMIT_STATUS_CODES:
+        await response.aread()
+        raise LimitResponse(response)
+
+def pool_limits():
+    """Connection pool sizes shared by every httpx client we build"""
+    return httpx.Limits(
+        max_connections=Config.HTTP_POOL_SIZE,
+        max_keepalive_connections=Config.HTTP_POOL_SIZE,
+        keepalive_expiry=Config.HTTP_KEEPALIVE_SECS
+    )
+
+def is_long_poll(params):
+    """Whether a request's query parameters ask the API to hold it open"""
+    try:
+        return float(params.get("waitForFinish") or 0) > 0
+    except ValueError:
+        return False
+
+class HostLimiter:
+    """Caps concurrent requests to each host across every thread of the process
+
+    Long-polls are counted against their own cap, so runs waiting to finish
+    don't hold the slots other requests need.
+    """
+
+    def __init__(self, max_per_host=None, max_long_polls=None):
+        self.max_per_host = max_per_host or Config.HTTP_MAX_PER_HOST
+        self.max_long_polls = max_long_polls or Config.HTTP_MAX_LONG_POLLS_PER_HOST
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def semaphore(self, host, long_poll=False):
+        with self._lock:
+            semaphore = self._semaphores.get((host, long_poll))
+            if semaphore is None:
+                limit = self.max_long_polls if long_poll else self.max_per_host
+                semaphore = self._semaphores[(host, long_poll)] = threading.BoundedSemaphore(limit)
+            return semaphore
+
+class PooledSession(requests.Session):
+    """requests.Session with tuned pools, jittered retries and per-host limits"""
+
+    def __init__(self, limiter):
+        super().__init__()
+        self.limiter = limiter
+        retry = Retry(
+            total=Config.HTTP_RETRIES,
+            backoff_factor=Config.HTTP_BACKOFF_SECS,
+            backoff_jitter=Config.HTTP_BACKOFF_SECS,
+            status_forcelist=RETRY_STATUSES,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=Config.HTTP_POOL_SIZE, pool_maxsize=Config.HTTP_POOL_SIZE, max_retries=retry)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def send(self, request, **kwargs):
+        # The slot is held until the response headers arrive
+        url = urlsplit(request.url)
+        with self.limiter.semaphore(url.netloc, is_long_poll(dict(parse_qsl(url.query)))):
+            return super().send(request, **kwargs)
+
+class HostLimitedTransport(httpx.HTTPTransport):
+    def __init__(self, limiter, **kwargs):
+        super().__init__(**kwargs)
+        self.limiter = limiter
+
+    def handle_request(self, request):
+        host = request.url.netloc.decode("ascii")
+        with self.limiter.semaphore(host, is_long_poll(request.url.params)):
+            return super().handle_request(request)
+
+class HostLimitedAsyncTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, max_per_host, max_long_polls=None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_per_host = max_per_host
+        self.max_long_polls = max_long_polls or Config.HTTP_MAX_LONG_POLLS_PER_HOST
+        # asyncio semaphores belong to one event loop, like this transport
+        self._semaphores = {}
+
+    async def handle_async_request(self, request):
+        key = (request.url.netloc.decode("ascii"), is_long_poll(request.url.params))
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = self._semaphores[key] = asyncio.Semaphore(self.max_long_polls if key[1] else self.max_per_host)
+        async with semaphore:
+            return await super().handle_async_request(request)
+
+class HttpSessions:
+    """Process-wide HTTP clients, so connections and TLS sessions are reused
+
+    Apify clients are kept per token and API URL; async ones also per event
+    loop, since an httpx pool can't move between loops. run() drives
+    coroutines on one long-lived loop so sync callers keep reusing the same
+    async pools.
+    """
+
+    def __init__(self):
+        self.limiter = HostLimiter()
+        self._session = None
+        self._apify_clients = {}
+        self._async_apify_clients = weakref.WeakKeyDictionary()
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def session(self):
+        """The shared requests session"""
+        with self._lock:
+            if self._session is None:
+                self._session = PooledSession(self.limiter)
+            return self._session
+
+    def apify_client(self, token):
+        """The shared sync Apify SDK client for a token"""
+        # The SDK is slow to import, so it's loaded with the first client
+        from apify_client import ApifyClient as BaseApifyClient
+
+        key = (token, Config.APIFY_API_URL)
+        with self._lock:
+            client = self._apify_clients.get(key)
+            if client is None:
+                client = self._apify_clients[key] = BaseApifyClient(token, api_url=Config.APIFY_API_URL)
+                http = client.http_client
+                # Keep the SDK's headers and timeout, swap in a tuned pool
+                http.httpx_client = httpx.Client(
+                    headers=http.httpx_client.headers,
+                    follow_redirects=True,
+                    timeout=http.httpx_client.timeout,
+                    transport=HostLimitedTransport(self.limiter, limits=pool_limits())
+                )
+            return client
+
+    def apify_client_async(self, token, fail_on_limits=False):
+        """The shared async Apify SDK client for a token on the running loop
+
+        With fail_on_limits, 402/429 responses raise LimitResponse at once
+        instead of being retried inside the SDK, so the run scheduler can back
+        off for as long as the API asks while the slot goes to other work.
+        """
+        from apify_client import ApifyClientAsync
+
+        loop = asyncio.get_running_loop()
+        key = (token, Config.APIFY_API_URL, fail_on_limits)
+        with self._lock:
+            clients = self._async_apify_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = clients[key] = ApifyClientAsync(token, api_url=Config.APIFY_API_URL)
+                http = client.http_client
+                http.httpx_async_client = httpx.AsyncClient(
+                    headers=http.httpx_async_client.headers,
+                    follow_redirects=True,
+                    timeout=http.httpx_async_client.timeout,
+                    transport=HostLimitedAsyncTransport(Config.HTTP_MAX_PER_HOST, limits=pool_limits()),
+                    event_hooks={"response": [raise_for_limits] if fail_on_limits else []}
+                )
+            return client
+
+    def _get_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="http-loop", daemon=True).start()
+            return self._loop
+
+    def run(self, coroutine):
+        """Run a coroutine on the shared loop and wait for its result
+
+        Context variables of the calling thread (e.g. audit timings) carry over.
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._get_loop())
+        try:
+            return future.result()
+        except BaseException:
+            # The caller gave up (e.g. a Streamlit rerun); stop the work too
+            if not future.done():
+                future.cancel()
+            raise
+
+HTTP_SESSIONS = HttpSessions()
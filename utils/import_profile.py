@@ -0,0 +1,49 @@
+from pathlib import Path
+import re
+import subprocess
+import sys
+
+# What the generated Streamlit app imports before its first page renders
+STARTUP_MODULES = ["config", "utils.job_queue", "utils.report_exporter"]
+
+# Libraries that should only load once an audit actually needs them
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "apify_client"]
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# "import time:  self [us] | cumulative | imported package", indented by depth
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def parse_importtime(output):
+    """(module, self µs, cumulative µs, depth) for every line of -X importtime output"""
+    entries = []
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+def profile_imports(modules=None, python=None):
+    """Import modules in a fresh interpreter under -X importtime and parse the result"""
+    modules = modules or STARTUP_MODULES
+    completed = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=ROOT_DIR, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise Exception(f"Importing {', '.join(modules)} failed:\n{completed.stderr[-2000:]}")
+    return parse_importtime(completed.stderr)
+
+def summarize(entries, top=15):
+    """Total import time, the slowest top-level imports and which heavy libraries loaded"""
+    top_level = [entry for entry in entries if entry[3] == 0]
+    loaded = {entry[0] for entry in entries}
+    return {
+        "total_ms": sum(entry[2] for entry in top_level) / 1000,
+        "slowest": [
+            (module, cumulative_us / 1000)
+            for module, _, cumulative_us, _ in sorted(top_level, key=lambda entry: entry[2], reverse=True)[:top]
+        ],
+        "heavy_loaded": [module for module in HEAVY_MODULES if module in loaded]
+    }
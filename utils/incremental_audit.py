@@ -0,0 +1,86 @@
+from utils.data_processor import DataProcessor
+from utils.history_store import HistoryStore
+from utils.http_session import HTTP_SESSIONS
+
+# Default number of customers kept, same as the discovery actor
+DEFAULT_MAX_RESULTS = 50
+
+class IncrementalAuditor:
+    """Re-audits a company by crawling only the pages that changed
+
+    Wraps an Apify client like CachedApifyClient does: batch audits use it
+    in place of the client, and the job queue calls discover() for audits
+    submitted as incremental.
+    """
+
+    def __init__(self, apify_client, history_store=None, data_processor=None):
+        self.apify_client = apify_client
+        self.history_store = history_store or HistoryStore()
+        self.data_processor = data_processor or DataProcessor()
+
+    def __getattr__(self, name):
+        # Everything else goes straight to the wrapped client
+        return getattr(self.apify_client, name)
+
+    def build_input(self, input_data):
+        """Discovery input carrying the validators from the last crawl"""
+        previous_pages = self.history_store.page_states(input_data["companyName"])
+        return {**input_data, "previousPages": previous_pages}
+
+    def merge(self, previous, delta, max_results=DEFAULT_MAX_RESULTS):
+        """Fold a delta run into the previous result
+
+        Customers from pages the delta re-extracted are replaced; customers
+        from unchanged pages, or pages the delta couldn't fetch, are kept.
+        """
+        pages = delta.get("pages", {})
+        if not previous:
+            return delta
+
+        refreshed = {url for url, page in pages.items() if page.get("status") != "unchanged"}
+        kept = [customer for customer in previous.get("customers", []) if customer.get("source") not in refreshed]
+
+        # Spellings of one company across the old and new crawl merge too
+        merged = self.data_processor.resolve_result({**delta, "customers": kept + delta.get("customers", [])}, max_results)
+        merged["summary"]["pagesUnchanged"] = len(pages) - len(refreshed)
+        return {**merged, "incremental": True}
+
+    async def discover_async(self, input_data):
+        """Run a delta crawl and merge it into the last stored audit
+
+        The crawl's page validators are stored for the next run; saving the
+        merged result is left to the caller.
+        """
+        company = input_data["companyName"]
+        previous = self.history_store.latest_audit(company)
+
+        delta = await self.apify_client.run_customer_discovery_async(self.build_input(input_data))
+        if delta is None or delta.get("status") == "ERROR":
+            return delta
+
+        result = self.merge(previous, delta, input_data.get("maxResults") or DEFAULT_MAX_RESULTS)
+        self.history_store.save_page_states(company, delta.get("pages", {}))
+        return result
+
+    def discover(self, input_data):
+        """Run a delta crawl and merge it into the last stored audit"""
+        return HTTP_SESSIONS.run(self.discover_async(input_data))
+
+    async def run_async(self, input_data):
+        """Re-audit a company, crawling only what changed, and store the merged result"""
+        result = await self.discover_async(input_data)
+        if result is None or result.get("status") == "ERROR":
+            return result
+
+        customers_df = self.data_processor.process_customers(result.get("customers") or [])
+        summary = self.data_processor.generate_summary(customers_df)
+        self.history_store.save_audit(result, summary, customers_df)
+        return result
+
+    def run(self, input_data):
+        """Incrementally re-audit a company"""
+        return HTTP_SESSIONS.run(self.run_async(input_data))
+
+    async def run_customer_discovery_async(self, input_data):
+        """Client interface, so batch audits can run through the auditor"""
+        return await self.run_async(input_data)
@@ -0,0 +1,274 @@
+from config import Config
+from datetime import datetime, timezone
+from pathlib import Path
+from utils.data_processor import DataProcessor
+from utils.history_store import HistoryStore
+from utils.metrics import JOBS, audit_timings
+from utils.run_scheduler import scheduling
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+ACTIVE_JOB_STATUSES = ["QUEUED", "RUNNING"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT,
+    input TEXT NOT NULL,
+    status TEXT NOT NULL,
+    stage TEXT,
+    progress TEXT NOT NULL DEFAULT '{}',
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    heartbeat REAL,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_session ON jobs (session_id, id DESC);
+"""
+
+JOB_COLUMNS = "id, session_id, input, status, stage, progress, result, error, created_at, started_at, finished_at"
+
+def utc_now():
+    return datetime.now(timezone.utc).isoformat()
+
+class JobQueue:
+    """SQLite-backed audit queue drained by worker threads
+
+    Jobs survive reruns and navigation; any session can read any job's
+    progress. Tokens are kept in memory only, never written to the file, so
+    a job submitted with one is owned by this queue's process: only its
+    workers claim it, and it fails if the process goes away.
+    """
+
+    def __init__(self, handler, path=None, workers=None):
+        self.handler = handler
+        self.path = path or Config.JOB_QUEUE_PATH
+        self.workers = workers or Config.JOB_WORKERS
+        self.worker_id = uuid.uuid4().hex[:12]
+        self._secrets = {}
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def submit(self, input_data, session_id=None, secret=None):
+        """Queue an audit; returns the job id"""
+        owner = self.worker_id if secret is not None else None
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (session_id, input, status, worker, heartbeat, created_at) "
+                "VALUES (?, ?, 'QUEUED', ?, ?, ?)",
+                (session_id, json.dumps(input_data), owner, time.time(), utc_now())
+            )
+            job_id = cursor.lastrowid
+            if secret is not None:
+                self._secrets[job_id] = secret
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        """One job with its stage progress, or None"""
+        with self._lock:
+            row = self._conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def session_jobs(self, session_id, limit=10):
+        """A session's most recent jobs, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {JOB_COLUMNS} FROM jobs WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                (session_id, limit)
+            ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def _to_job(self, row):
+        job = dict(row)
+        job["input"] = json.loads(job["input"])
+        job["progress"] = json.loads(job["progress"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def claim(self):
+        """Atomically take the oldest queued job this process may run, or return None
+
+        Jobs holding another process's token are left to that process.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "UPDATE jobs SET status = 'RUNNING', worker = ?, heartbeat = ?, started_at = ? "
+                "WHERE id = (SELECT id FROM jobs WHERE status = 'QUEUED' AND (worker IS NULL OR worker = ?) "
+                "ORDER BY id LIMIT 1) "
+                f"RETURNING {JOB_COLUMNS}",
+                (self.worker_id, time.time(), utc_now(), self.worker_id)
+            ).fetchone()
+        return self._to_job(row) if row else None
+
+    def cancel(self, job_id):
+        """Withdraw a job that hasn't started; returns whether it was cancelled"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'CANCELLED', finished_at = ? WHERE id = ? AND status = 'QUEUED'",
+                (utc_now(), job_id)
+            )
+            cancelled = cursor.rowcount > 0
+            if cancelled:
+                self._secrets.pop(job_id, None)
+        if cancelled:
+            JOBS.inc(status="CANCELLED")
+        return cancelled
+
+    def report(self, job_id, stage, data):
+        """Record a finished stage so the UI can show it before the job ends"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET stage = ?, progress = json_set(progress, '$.' || ?, json(?)), heartbeat = ? "
+                "WHERE id = ?",
+                (stage, stage, json.dumps(data, default=str), time.time(), job_id)
+            )
+
+    def finish(self, job_id, result=None, error=None):
+        """Mark a job succeeded or failed"""
+        status = "FAILED" if error else "SUCCEEDED"
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, heartbeat = ? WHERE id = ?",
+                (status, json.dumps(result, default=str) if result is not None else None, error,
+                 utc_now(), time.time(), job_id)
+            )
+            self._secrets.pop(job_id, None)
+        JOBS.inc(status=status)
+
+    def heartbeat(self):
+        """Mark every job this process owns as still alive"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE worker = ? AND status IN ('QUEUED', 'RUNNING')",
+                (time.time(), self.worker_id)
+            )
+
+    def fail_orphaned(self, stale_secs=None):
+        """Fail jobs whose process stopped heart-beating; returns how many
+
+        Their token went with the process, and running them under another
+        one would audit on the wrong account, so they aren't requeued.
+        """
+        stale_secs = stale_secs or Config.JOB_STALE_SECS
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'FAILED', error = ?, finished_at = ? "
+                "WHERE status IN ('QUEUED', 'RUNNING') AND worker != ? AND heartbeat < ?",
+                ("The app process running this job stopped; resubmit it from the app",
+                 utc_now(), self.worker_id, time.time() - stale_secs)
+            )
+        if cursor.rowcount:
+            JOBS.inc(cursor.rowcount, status="FAILED")
+        return cursor.rowcount
+
+    def run_job(self, job):
+        """Run one claimed job through the handler"""
+        secret = self._secrets.get(job["id"])
+        try:
+            # Each session is its own tenant, so one user's queue can't starve another's
+            with scheduling("interactive", tenant=job["session_id"]):
+                result = self.handler(job["input"], secret, lambda stage, data: self.report(job["id"], stage, data))
+        except Exception as e:
+            self.finish(job["id"], error=str(e))
+        else:
+            self.finish(job["id"], result=result)
+
+    def _beat(self):
+        while not self._stopping.wait(Config.JOB_HEARTBEAT_SECS):
+            self.heartbeat()
+            self.fail_orphaned()
+
+    def _work(self):
+        while not self._stopping.is_set():
+            job = self.claim()
+            if job is None:
+                # Submissions from this process wake us; other processes' are polled
+                self._wakeup.wait(Config.JOB_POLL_SECS)
+                self._wakeup.clear()
+                continue
+            self.run_job(job)
+
+    def start(self):
+        """Start the worker threads; safe to call more than once"""
+        with self._lock:
+            if self._threads:
+                return self
+        self.fail_orphaned()
+        threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        # Keeps long runs from looking abandoned; they report no stage for minutes
+        threads.append(threading.Thread(target=self._beat, name="job-heartbeat", daemon=True))
+        with self._lock:
+            self._threads = threads
+        for thread in threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop the workers after their current jobs"""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+class AuditJobHandler:
+    """Runs one queued audit, reporting each stage as it finishes"""
+
+    def __init__(self, client_factory, history_store=None, data_processor=None):
+        self.client_factory = client_factory
+        self.history_store = history_store or HistoryStore()
+        self.data_processor = data_processor or DataProcessor()
+
+    def __call__(self, input_data, token, report):
+        # Never fall back to the process's own token: the job belongs to
+        # whoever submitted it
+        if not token:
+            raise Exception("No Apify token for this job; resubmit it from the app")
+
+        input_data = dict(input_data)
+        incremental = input_data.pop("incremental", False)
+
+        with audit_timings() as timings:
+            client = self.client_factory(token)
+            if incremental:
+                from utils.incremental_audit import IncrementalAuditor
+
+                # Only pages changed since the last stored audit are crawled
+                result = IncrementalAuditor(client, self.history_store, self.data_processor).discover(input_data)
+            else:
+                result = client.run_customer_discovery(input_data)
+                # Kept so a later incremental audit can skip unchanged pages
+                if result and result.get("pages"):
+                    self.history_store.save_page_states(input_data["companyName"], result["pages"])
+            if not result or not result.get("customers"):
+                raise Exception("No customers found or actor failed.")
+            result = self.data_processor.resolve_result(result)
+            report("discovery", result)
+
+            customers_df = self.data_processor.process_customers(result["customers"])
+            summary = self.data_processor.generate_summary(customers_df)
+            report("summary", summary)
+
+            audit_id = self.history_store.save_audit(result, summary, customers_df)
+
+        return {"audit_id": audit_id, "timings": timings.as_rows(), "total_seconds": timings.total()}
@@ -0,0 +1,37 @@
+import importlib
+import importlib.util
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access
+
+    Keeps heavy libraries like pandas out of process startup while the
+    code using them stays written as pd.DataFrame(...).
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+def lazy_import(name, optional=False):
+    """A LazyModule for name; optional modules that aren't installed give None
+
+    Whether an optional module is installed is looked up without importing
+    it, so `module is None` checks stay cheap.
+    """
+    # find_spec() on a dotted name would import its parent, so only the
+    # top-level package is looked up
+    if optional and importlib.util.find_spec(name.partition(".")[0]) is None:
+        return None
+    return LazyModule(name)
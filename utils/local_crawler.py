@@ -0,0 +1,168 @@
+from config import Config
+from urllib.parse import urlsplit
+from utils.extraction_engine import ExtractionEngine, iso_timestamp
+from utils.http_session import pool_limits
+from utils.metrics import timer
+import asyncio
+import hashlib
+import httpx
+import logging
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# Pages the discovery actor crawls on the audited company's own site
+SEARCH_PATHS = ["/customers", "/case-studies", "/testimonials", "/success-stories"]
+
+# Same selector as the actor's customerSections
+CUSTOMER_SELECTOR = '[class*="customer"], [class*="client"], [class*="testimonial"], [class*="case-study"]'
+
+USER_AGENT = "Mozilla/5.0 (compatible; HeroMakingAuditor/1.0)"
+
+def search_urls(company_website):
+    """The URLs a discovery run visits for a company website"""
+    if not company_website:
+        return []
+    parts = urlsplit(company_website if "://" in company_website else f"https://{company_website}")
+    origin = f"{parts.scheme}://{parts.netloc}"
+    return [origin + path for path in SEARCH_PATHS]
+
+def conditional_headers(previous):
+    """Validators from the last crawl, so unchanged pages come back as 304"""
+    headers = {}
+    if previous and previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+    if previous and previous.get("lastModified"):
+        headers["If-Modified-Since"] = previous["lastModified"]
+    return headers
+
+def customer_blocks(html):
+    """Text of every customer-ish element on a page, like the actor's Cheerio pass"""
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+    except ImportError:
+        raise Exception("The local discovery backend requires selectolax (pip install selectolax)")
+
+    tree = LexborHTMLParser(html)
+    return [node.text(deep=True) for node in tree.css(CUSTOMER_SELECTOR)]
+
+class HostPoliteness:
+    """Limits concurrent requests and spaces them out per host"""
+
+    def __init__(self, max_per_host=None, delay_secs=None):
+        self.max_per_host = max_per_host or Config.CRAWL_MAX_PER_HOST
+        self.delay_secs = Config.CRAWL_DELAY_SECS if delay_secs is None else delay_secs
+        # asyncio primitives belong to one loop, so hosts are tracked per loop
+        self._loops = weakref.WeakKeyDictionary()
+
+    async def wait(self, host):
+        """Reserve the host's next request slot; hold the returned semaphore while fetching"""
+        loop = asyncio.get_running_loop()
+        semaphores, next_request = self._loops.setdefault(loop, ({}, {}))
+        semaphore = semaphores.setdefault(host, asyncio.Semaphore(self.max_per_host))
+        await semaphore.acquire()
+        now = loop.time()
+        start = max(now, next_request.get(host, now))
+        next_request[host] = start + self.delay_secs
+        if start > now:
+            await asyncio.sleep(start - now)
+        return semaphore
+
+# Shared by every crawl in the process, so concurrent audits of one site stay polite
+HOST_POLITENESS = HostPoliteness()
+
+class LocalDiscoveryCrawler:
+    """Customer discovery without the hosted actor, returning its result schema"""
+
+    def __init__(self, max_concurrency=None, politeness=None, timeout=None, scorer=None):
+        self.max_concurrency = max_concurrency or Config.CRAWL_MAX_CONCURRENCY
+        self.politeness = politeness or HOST_POLITENESS
+        self.timeout = timeout or Config.CRAWL_TIMEOUT_SECS
+        # A ParallelScorer moves extraction off the event loop onto its pool
+        self.scorer = scorer
+
+    async def fetch_page(self, client, url, previous, semaphore):
+        """Fetch one page; returns (page state, html or None when unchanged)"""
+        async with semaphore:
+            host_slot = await self.politeness.wait(urlsplit(url).netloc)
+            try:
+                response = await client.get(url, headers=conditional_headers(previous))
+            finally:
+                host_slot.release()
+
+        if response.status_code == 304:
+            return {**(previous or {}), "status": "unchanged"}, None
+        response.raise_for_status()
+
+        body = response.content
+        content_hash = hashlib.sha256(body).hexdigest()
+        unchanged = previous is not None and previous.get("contentHash") == content_hash
+        page = {
+            "etag": response.headers.get("etag"),
+            "lastModified": response.headers.get("last-modified"),
+            "contentHash": content_hash,
+            "status": "unchanged" if unchanged else ("changed" if previous else "new")
+        }
+        return page, None if unchanged else response.text
+
+    async def crawl(self, input_data):
+        """Fetch the search pages; returns (customer text blocks, page states)"""
+        previous_pages = input_data.get("previousPages") or {}
+        urls = search_urls(input_data.get("companyWebsite"))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=self.timeout,
+            limits=pool_limits(),
+            headers={"User-Agent": USER_AGENT}
+        ) as client:
+            fetched = await asyncio.gather(
+                *(self.fetch_page(client, url, previous_pages.get(url), semaphore) for url in urls),
+                return_exceptions=True
+            )
+
+        blocks = []
+        pages = {}
+        for url, outcome in zip(urls, fetched):
+            if isinstance(outcome, Exception):
+                # Like the actor, a page that can't be fetched is skipped, not fatal
+                logger.warning("Skipping %s: %s", url, outcome)
+                continue
+            page, html = outcome
+            pages[url] = page
+            if html is not None:
+                blocks.extend((url, text) for text in customer_blocks(html))
+        return blocks, pages
+
+    async def discover_async(self, input_data):
+        """Run discovery locally and return the actor's result record"""
+        company_name = input_data.get("companyName")
+        if not company_name:
+            raise Exception("companyName is required")
+
+        with timer("local_crawl"):
+            blocks, pages = await self.crawl(input_data)
+        max_results = int(input_data.get("maxResults") or 50)
+        if self.scorer is not None:
+            customers = await self.scorer.discover_async(company_name, blocks, max_results)
+        else:
+            customers = ExtractionEngine(company_name).discover(blocks, max_results)
+
+        return {
+            "companyName": company_name,
+            "companyWebsite": input_data.get("companyWebsite"),
+            "timestamp": iso_timestamp(),
+            "customers": customers,
+            "summary": {
+                "totalCustomersFound": len(customers),
+                "averageConfidence": (
+                    round(sum(customer["confidence"] for customer in customers) / len(customers), 3) if customers else 0
+                ),
+                "urlsProcessed": len(search_urls(input_data.get("companyWebsite"))),
+                "pagesUnchanged": sum(1 for page in pages.values() if page["status"] == "unchanged")
+            },
+            "pages": pages,
+            "status": "SUCCESS",
+            "backend": "local"
+        }
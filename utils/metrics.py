@@ -0,0 +1,201 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+
+# Histogram buckets in seconds; audits span milliseconds (local work) to
+# minutes (actor runs)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Stage timings of the audit running in the current thread or task
+_current_timings = ContextVar("hero_audit_timings", default=None)
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(labels), 0)
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series["counts"]):
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            return metric
+
+    def counter(self, name, help_text):
+        return self._get_or_create(Counter, name, help_text)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def expose(self):
+        """Render every metric in the Prometheus text format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram("hero_stage_duration_seconds", "Time spent in each audit stage")
+ACTOR_RUNS = REGISTRY.counter("hero_actor_runs_total", "Actor runs by actor and final status")
+CACHE_LOOKUPS = REGISTRY.counter("hero_cache_lookups_total", "Result cache lookups by outcome")
+DATASET_ITEMS = REGISTRY.counter("hero_dataset_items_total", "Dataset items fetched from Apify")
+JOBS = REGISTRY.counter("hero_jobs_total", "Background audit jobs by final status")
+COALESCED_RUNS = REGISTRY.counter("hero_coalesced_runs_total", "Discovery calls that joined an identical run in flight")
+
+class AuditTimings:
+    """Per-audit breakdown of seconds spent in each stage"""
+
+    def __init__(self):
+        self.stages = {}
+        self.started = time.perf_counter()
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def as_rows(self):
+        """Stages in the order they ran, for display"""
+        return [{"stage": stage, "seconds": round(seconds, 3)} for stage, seconds in self.stages.items()]
+
+def record_stage(stage, seconds):
+    """Record a stage duration in the histogram and the current audit breakdown"""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+@contextmanager
+def timer(stage):
+    """Time a block as one audit stage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+@contextmanager
+def audit_timings():
+    """Collect the stage timings of everything run inside the block"""
+    timings = AuditTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+def metrics_handler():
+    """The /metrics request handler class, built on first use
+
+    http.server is slow to import and only the app process serves /metrics.
+    """
+    global _metrics_handler
+    if _metrics_handler is not None:
+        return _metrics_handler
+
+    import http.server
+
+    class MetricsHandler(http.server.BaseHTTPRequestHandler):
+        registry = REGISTRY
+
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = self.registry.expose().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    _metrics_handler = MetricsHandler
+    return _metrics_handler
+
+_metrics_handler = None
+
+def __getattr__(name):
+    # utils.metrics.MetricsHandler still works, it's just built lazily
+    if name == "MetricsHandler":
+        return metrics_handler()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def start_metrics_server(port, address=""):
+    """Serve /metrics from a background thread of the current process"""
+    import http.server
+
+    server = http.server.ThreadingHTTPServer((address, port), metrics_handler())
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,186 @@
+from concurrent.futures import ProcessPoolExecutor
+from config import Config
+from utils.extraction_engine import ExtractionEngine, iso_timestamp, js_trim, normalize_name
+from utils.lazy import lazy_import
+from utils.metrics import timer
+import asyncio
+import multiprocessing
+import os
+import threading
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow", optional=True)
+
+# Text blocks sent to a worker per task; large enough that the round trip
+# is small next to the regex work
+CHUNK_BLOCKS = 2000
+
+# Fewer blocks than this are scored in-process: shipping them to a worker
+# costs more than it saves
+MIN_PARALLEL_BLOCKS = 4000
+
+# Workers start from a clean server process: forking the app would copy its
+# threads and any locks they hold (event loop, SQLite, HTTP pools) into them
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+def pack_strings(strings):
+    """Arrow's string layout: int32 offsets into one UTF-8 buffer"""
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int32)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    return offsets, b"".join(encoded)
+
+def unpack_strings(offsets, data):
+    """Strings from pack_strings() buffers"""
+    if pa is not None:
+        array = pa.StringArray.from_buffers(len(offsets) - 1, pa.py_buffer(offsets), pa.py_buffer(data))
+        return array.to_pylist()
+    bounds = offsets.tolist()
+    return [data[start:end].decode("utf-8") for start, end in zip(bounds, bounds[1:])]
+
+def score_chunk(company_name, texts):
+    """Extract and score one chunk of stripped text blocks
+
+    Module-level so ProcessPoolExecutor can pickle it. Returns flat NumPy
+    arrays and byte buffers, which pickle as a few memory copies instead
+    of one object per mention.
+    """
+    names, block_index, confidence = ExtractionEngine(company_name).extract_columns(texts)
+    name_offsets, name_data = pack_strings(names)
+    key_offsets, key_data = pack_strings([normalize_name(name) for name in names])
+    return block_index, confidence.astype(np.float32), name_offsets, name_data, key_offsets, key_data
+
+class ParallelScorer:
+    """Runs ExtractionEngine scoring over chunks of text blocks on a process pool
+
+    Results come back as typed DataFrames that DataProcessor takes as they
+    are, and discover() merges and ranks them without building a dict per
+    mention.
+    """
+
+    def __init__(self, workers=None, chunk_blocks=CHUNK_BLOCKS, min_parallel_blocks=MIN_PARALLEL_BLOCKS):
+        self.workers = workers or Config.SCORING_WORKERS or os.cpu_count() or 1
+        self.chunk_blocks = chunk_blocks
+        self.min_parallel_blocks = min_parallel_blocks
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def pool(self):
+        """The worker pool, started on first use"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(START_METHOD)
+                )
+            return self._pool
+
+    def close(self):
+        """Shut the worker processes down"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def _chunks(self, texts):
+        return [texts[start:start + self.chunk_blocks] for start in range(0, len(texts), self.chunk_blocks)]
+
+    def _frame(self, blocks, texts, parts):
+        """Join the chunks' columns into one mention frame"""
+        offset = 0
+        block_index = []
+        confidence = []
+        names = []
+        keys = []
+        for chunk, (chunk_index, chunk_confidence, name_offsets, name_data, key_offsets, key_data) in zip(
+            self._chunks(texts), parts
+        ):
+            block_index.append(chunk_index + offset)
+            confidence.append(chunk_confidence)
+            names.extend(unpack_strings(name_offsets, name_data))
+            keys.extend(unpack_strings(key_offsets, key_data))
+            offset += len(chunk)
+
+        block_index = np.concatenate(block_index) if block_index else np.zeros(0, dtype=np.int32)
+        sources = pd.Categorical([source for source, _ in blocks])
+        contexts = np.array([text[:200] for text in texts], dtype=object)
+        return pd.DataFrame({
+            "name": names,
+            "source": sources.take(block_index),
+            "context": contexts[block_index],
+            "confidence": np.concatenate(confidence) if confidence else np.zeros(0, dtype=np.float32),
+            "discoveredAt": pd.Timestamp(iso_timestamp()),
+            "key": keys
+        })
+
+    def _prepare(self, blocks):
+        blocks = list(blocks)
+        return blocks, [js_trim(text) for _, text in blocks]
+
+    def _score(self, company_name, blocks):
+        blocks, texts = self._prepare(blocks)
+        with timer("scoring"):
+            chunks = self._chunks(texts)
+            if len(texts) < self.min_parallel_blocks:
+                parts = [score_chunk(company_name, chunk) for chunk in chunks]
+            else:
+                parts = list(self.pool().map(score_chunk, [company_name] * len(chunks), chunks))
+            return self._frame(blocks, texts, parts)
+
+    async def _score_async(self, company_name, blocks):
+        # Every chunk goes to the pool, so concurrent audits in one batch
+        # are scored on separate cores while the loop keeps crawling
+        blocks, texts = self._prepare(blocks)
+        with timer("scoring"):
+            pool = self.pool()
+            parts = await asyncio.gather(
+                *(asyncio.wrap_future(pool.submit(score_chunk, company_name, chunk)) for chunk in self._chunks(texts))
+            )
+            return self._frame(blocks, texts, parts)
+
+    def extract_frame(self, company_name, blocks):
+        """Scored mentions of (source, text) blocks as a typed DataFrame"""
+        return self._score(company_name, blocks).drop(columns="key")
+
+    def rank(self, mentions, max_results=50):
+        """ExtractionEngine.deduplicate() and ranking, done on the frame
+
+        Only the customers that are returned are turned into dicts.
+        """
+        if mentions.empty:
+            return []
+
+        mentions = mentions.reset_index(drop=True)
+        # The first best-scoring mention of each name represents it
+        best = mentions.sort_values("confidence", ascending=False, kind="stable").drop_duplicates("key")
+        first_seen = mentions.drop_duplicates("key")
+        best = best.set_index("key").loc[first_seen["key"]]
+        top = best.sort_values("confidence", ascending=False, kind="stable").head(max_results)
+
+        selected = mentions[mentions["key"].isin(top.index)]
+        counts = selected.groupby("key", sort=False).size()
+        sources = {}
+        distinct = selected.drop_duplicates(["key", "source"])
+        for key, source in zip(distinct["key"], distinct["source"].astype(str)):
+            sources.setdefault(key, []).append(source)
+
+        return [
+            {
+                "name": row.name,
+                "source": row.source,
+                "context": row.context,
+                "confidence": round(float(row.confidence), 3),
+                "discoveredAt": row.discoveredAt.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+                "sources": sources[key],
+                "mentions": int(counts[key])
+            }
+            for key, row in zip(top.index, top.itertuples(index=False))
+        ]
+
+    def discover(self, company_name, blocks, max_results=50):
+        """ExtractionEngine.discover() with the scoring spread over the pool"""
+        return self.rank(self._score(company_name, blocks), max_results)
+
+    async def discover_async(self, company_name, blocks, max_results=50):
+        """discover() without blocking the event loop"""
+        return self.rank(await self._score_async(company_name, blocks), max_results)
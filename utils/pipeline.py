@@ -0,0 +1,109 @@
+from config import Config
+from utils.http_session import HTTP_SESSIONS
+import asyncio
+import threading
+import weakref
+
+# Audit stages as (name, actor setting on Config, upstream stages).
+# Stages are listed in dependency order.
+STAGES = [
+    ("discovery", "CUSTOMER_DISCOVERY_ACTOR", ()),
+    ("linkedin", "LINKEDIN_ANALYZER_ACTOR", ("discovery",)),
+    ("content", "CONTENT_ANALYZER_ACTOR", ("discovery",)),
+    ("signals", "SIGNAL_DETECTOR_ACTOR", ("discovery", "linkedin", "content")),
+    ("report", "REPORT_GENERATOR_ACTOR", ("discovery", "linkedin", "content", "signals")),
+]
+
+# Stage slots per event loop and limit, shared by every pipeline run on
+# that loop so concurrent audits together stay under the limit
+_stage_semaphores = weakref.WeakKeyDictionary()
+_stage_semaphores_lock = threading.Lock()
+
+def stage_semaphore(max_concurrent):
+    """The semaphore bounding actor stages on the running loop"""
+    loop = asyncio.get_running_loop()
+    with _stage_semaphores_lock:
+        semaphores = _stage_semaphores.setdefault(loop, {})
+        semaphore = semaphores.get(max_concurrent)
+        if semaphore is None:
+            semaphore = semaphores[max_concurrent] = asyncio.Semaphore(max_concurrent)
+        return semaphore
+
+class AuditPipeline:
+    """Runs the five audit actors as a DAG
+
+    Only the discovery actor ships with this repository, so the app and
+    batch audits call discovery directly; the pipeline is the entry point
+    for accounts that have the analyzer, signal and report actors deployed.
+    """
+
+    def __init__(self, apify_client, max_concurrent=None):
+        self.apify_client = apify_client
+        self.max_concurrent = max_concurrent or Config.MAX_CONCURRENT_ACTORS
+
+    def build_stage_input(self, name, input_data, results):
+        """Build the actor input for a stage from the audit input and upstream results"""
+        if name == "discovery":
+            return input_data
+
+        discovery = results["discovery"]
+        stage_input = {
+            "companyName": input_data.get("companyName"),
+            "companyWebsite": input_data.get("companyWebsite"),
+            "customers": discovery.get("customers", []) if discovery else []
+        }
+
+        if name == "signals":
+            stage_input["linkedinProfiles"] = results["linkedin"]
+            stage_input["contentAnalysis"] = results["content"]
+        elif name == "report":
+            stage_input["discovery"] = discovery
+            stage_input["linkedinProfiles"] = results["linkedin"]
+            stage_input["contentAnalysis"] = results["content"]
+            stage_input["signals"] = results["signals"]
+
+        return stage_input
+
+    async def run_async(self, input_data):
+        """Run all audit stages, starting each one as soon as its inputs are ready"""
+        semaphore = stage_semaphore(self.max_concurrent)
+        tasks = {}
+        results = {}
+
+        async def run_stage(name, actor_setting, upstream):
+            for dependency in upstream:
+                results[dependency] = await tasks[dependency]
+
+            stage_input = self.build_stage_input(name, input_data, results)
+            async with semaphore:
+                # Discovery goes through the client's own entry point, so the
+                # local backend, the result cache and run coalescing apply
+                if name == "discovery":
+                    return await self.apify_client.run_customer_discovery_async(stage_input)
+                return await self.apify_client.run_actor_async(
+                    getattr(Config, actor_setting), stage_input
+                )
+
+        for name, actor_setting, upstream in STAGES:
+            tasks[name] = asyncio.ensure_future(run_stage(name, actor_setting, upstream))
+
+        try:
+            done, pending = await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+            # Downstream stages re-raise their input's error, so collect them
+            # all and report the failure of the earliest stage
+            errors = [task.exception() for task in tasks.values() if task in done]
+            errors = [error for error in errors if error is not None]
+            if errors:
+                raise errors[0]
+        finally:
+            # Cancel the rest on failure and let them abort their actor runs
+            unfinished = [task for task in tasks.values() if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+        return {name: task.result() for name, task in tasks.items()}
+
+    def run(self, input_data):
+        """Run the full audit pipeline"""
+        return HTTP_SESSIONS.run(self.run_async(input_data))
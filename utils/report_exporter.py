@@ -0,0 +1,191 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from utils.customer_records import CustomerRecords
+from utils.data_processor import DataProcessor
+from utils.report_generator import ReportGenerator
+import importlib
+import importlib.util
+import io
+import json
+import os
+import re
+
+EXPORT_FORMATS = ["html", "pdf", "csv", "jsonl", "parquet"]
+
+MIME_TYPES = {
+    "html": "text/html",
+    "pdf": "application/pdf",
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+# Optional packages behind some formats
+FORMAT_PACKAGES = {"pdf": "weasyprint", "parquet": "pyarrow"}
+
+# Results queued per pool worker; keeps a large batch from being pickled
+# into the pool all at once
+PENDING_PER_WORKER = 2
+
+def export_stem(company_name, key=None):
+    """File name stem for a company's exports"""
+    slug = re.sub(r"[^a-z0-9]+", "-", str(company_name or "unknown").lower()).strip("-") or "unknown"
+    # Batch inputs can audit one name against several websites
+    return f"{slug}-{key[:8]}" if key else slug
+
+def compact_result(result):
+    """A result with its customers held as CustomerRecords"""
+    return {**result, "customers": CustomerRecords.from_dicts(result.get("customers") or [])}
+
+def iter_batch_results(path):
+    """Yield (key, result) from batch_audit output or a JSONL file of discovery results
+
+    Customers come back as CustomerRecords, which stay small while results
+    wait for a worker and pickle as a few buffers.
+    """
+    path = Path(path)
+    if path.is_dir():
+        import pyarrow.parquet as pq
+
+        for part in sorted(path.glob("*.parquet")):
+            for batch in pq.ParquetFile(part).iter_batches(columns=["key", "status", "result"]):
+                for record in batch.to_pylist():
+                    if record["status"] == "SUCCEEDED" and record["result"]:
+                        yield record["key"], compact_result(json.loads(record["result"]))
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "result" not in record:
+                yield None, compact_result(record)
+            elif record.get("status") == "SUCCEEDED" and record["result"]:
+                yield record["key"], compact_result(record["result"])
+
+def iter_dataset_results(apify_client, dataset_id):
+    """Yield (None, result) for the discovery results stored in an Apify dataset
+
+    The dataset is streamed page by page, so a scheduled run's whole
+    history never sits in memory at once.
+    """
+    for result in apify_client.iter_dataset_items(dataset_id):
+        yield None, compact_result(result)
+
+def require_format(fmt):
+    """Fail early when a format's optional dependency is missing"""
+    if fmt not in EXPORT_FORMATS:
+        raise Exception(f"Unknown export format: {fmt}")
+    package = FORMAT_PACKAGES.get(fmt)
+    if package is None:
+        return
+    try:
+        importlib.import_module(package)
+    except ImportError:
+        raise Exception(f"{fmt.upper()} export requires {package} (pip install {package})")
+
+def available_formats():
+    """Export formats whose optional dependency is installed
+
+    Only looks the packages up, so offering the formats in the UI doesn't
+    import weasyprint.
+    """
+    return [
+        fmt for fmt in EXPORT_FORMATS
+        if fmt not in FORMAT_PACKAGES or importlib.util.find_spec(FORMAT_PACKAGES[fmt]) is not None
+    ]
+
+class ReportExporter:
+    def __init__(self, data_processor=None, report_generator=None):
+        self.data_processor = data_processor or DataProcessor()
+        self.report_generator = report_generator or ReportGenerator()
+
+    def write(self, result, f, fmt, customers=None):
+        """Write one export of a discovery result to a binary file object
+
+        customers may be the frame already built by DataProcessor.
+        """
+        require_format(fmt)
+        if customers is None:
+            customers = self.data_processor.process_customers(result.get("customers", []))
+
+        if fmt == "parquet":
+            customers.to_parquet(f, index=False)
+            return
+        if fmt == "pdf":
+            from weasyprint import HTML
+
+            HTML(string=self.report_generator.generate_report({**result, "customers": customers})).write_pdf(f)
+            return
+
+        if fmt in ("csv", "jsonl") and "confidence" in customers.columns:
+            # float32 scores would print as 0.9340000153
+            customers = customers.assign(confidence=customers["confidence"].astype("float64").round(3))
+
+        text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+        try:
+            if fmt == "html":
+                self.report_generator.write_report({**result, "customers": customers}, text)
+            elif fmt == "csv":
+                customers.to_csv(text, index=False)
+            else:
+                customers.to_json(text, orient="records", lines=True, date_format="iso")
+                text.write("\n")
+            text.flush()
+        finally:
+            # Leave the caller's file open
+            text.detach()
+
+    def render(self, result, fmt, customers=None):
+        """One export of a discovery result as bytes, e.g. for a download button"""
+        buffer = io.BytesIO()
+        self.write(result, buffer, fmt, customers)
+        return buffer.getvalue()
+
+    def export(self, result, output_dir, formats, key=None):
+        """Write a result's exports into a directory; returns the file paths"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        stem = export_stem(result.get("companyName"), key)
+
+        customers = self.data_processor.process_customers(result.get("customers", []))
+        paths = []
+        for fmt in formats:
+            path = output_dir / f"{stem}.{fmt}"
+            with open(path, "wb") as f:
+                self.write(result, f, fmt, customers)
+            paths.append(str(path))
+        return paths
+
+def _export_in_worker(key, result, output_dir, formats):
+    # Module-level so ProcessPoolExecutor can pickle it
+    return ReportExporter().export(result, output_dir, formats, key)
+
+def export_batch(results, output_dir, formats, workers=None, progress=print):
+    """Export (key, result) pairs on a process pool, writing straight to files"""
+    workers = workers or os.cpu_count() or 1
+    stats = {"exported": 0, "failed": 0, "files": 0}
+    pending = {}
+
+    def collect(futures):
+        for future in futures:
+            company = pending.pop(future)
+            try:
+                stats["files"] += len(future.result())
+                stats["exported"] += 1
+                progress(f"[{stats['exported'] + stats['failed']}] {company}: exported")
+            except Exception as e:
+                stats["failed"] += 1
+                progress(f"[{stats['exported'] + stats['failed']}] {company}: FAILED ({e})")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for key, result in results:
+            future = pool.submit(_export_in_worker, key, result, str(output_dir), list(formats))
+            pending[future] = result.get("companyName", "Unknown")
+            if len(pending) >= workers * PENDING_PER_WORKER:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(list(pending))
+
+    return stats
@@ -1,49 +1,122 @@
 import json
+from html import escape
+from string import Template
+from utils.metrics import timer
 
-class ReportGenerator:
-    def __init__(self):
-        pass
-        
-    def generate_report(self, data):
-        """Generate HTML report"""
-        html = f"""
+# Customers rendered per chunk yielded by iter_report
+CUSTOMERS_PER_CHUNK = 256
+
+REPORT_HEADER = Template("""
         <!DOCTYPE html>
         <html>
         <head>
-            <title>Hero Customer Report - {data.get('companyName', 'Unknown')}</title>
+            <meta charset="utf-8">
+            <title>Hero Customer Report - $company_title</title>
             <style>
-                body {{ font-family: Arial, sans-serif; margin: 40px; }}
-                .header {{ background: #f0f0f0; padding: 20px; border-radius: 5px; }}
-                .customer {{ border: 1px solid #ddd; margin: 10px 0; padding: 15px; border-radius: 5px; }}
-                .confidence {{ font-weight: bold; color: #007bff; }}
+                body { font-family: Arial, sans-serif; margin: 40px; }
+                .header { background: #f0f0f0; padding: 20px; border-radius: 5px; }
+                .customer { border: 1px solid #ddd; margin: 10px 0; padding: 15px; border-radius: 5px; }
+                .confidence { font-weight: bold; color: #007bff; }
             </style>
         </head>
         <body>
             <div class="header">
                 <h1>Hero Customer Report</h1>
-                <h2>{data.get('companyName', 'Unknown Company')}</h2>
-                <p>Generated: {data.get('timestamp', 'Unknown')}</p>
-                <p>Total Customers Found: {len(data.get('customers', []))}</p>
+                <h2>$company_name</h2>
+                <p>Generated: $timestamp</p>
+                $total_line
             </div>
-            
+
             <div class="customers">
                 <h3>Discovered Hero Customers</h3>
-        """
-        
-        for customer in data.get('customers', []):
-            html += f"""
+        """)
+
+CUSTOMER_BLOCK = Template("""
                 <div class="customer">
-                    <h4>{customer.get('name', 'Unknown')}</h4>
-                    <p><span class="confidence">Confidence: {customer.get('confidence', 0):.3f}</span></p>
-                    <p>Source: {customer.get('source', 'Unknown')}</p>
-                    <p>Context: {customer.get('context', 'No context available')[:200]}...</p>
+                    <h4>$name</h4>
+                    <p><span class="confidence">Confidence: $confidence</span></p>
+                    <p>Source: $source</p>
+                    <p>Context: $context...</p>
                 </div>
-            """
-        
-        html += """
+            """)
+
+REPORT_FOOTER = Template("""
             </div>
+            $total_line
         </body>
         </html>
-        """
-        
-        return html
\ No newline at end of file
+        """)
+
+TOTAL_LINE = Template("<p>Total Customers Found: $total</p>")
+
+class ReportGenerator:
+    def __init__(self):
+        pass
+
+    def iter_customers(self, customers):
+        """Yield customer dicts from a list, an iterator, CustomerRecords or a DataProcessor frame"""
+        if not hasattr(customers, "columns"):
+            yield from customers
+            return
+
+        import pandas as pd
+
+        # Walk the frame column-wise rather than materializing every row dict
+        columns = list(customers.columns)
+        for row in zip(*(customers[column] for column in columns)):
+            # List fields like a merged customer's sources are never missing
+            yield {
+                column: value for column, value in zip(columns, row)
+                if not (pd.api.types.is_scalar(value) and pd.isna(value))
+            }
+
+    def render_customer(self, customer):
+        """Render one customer block with scraped text escaped"""
+        return CUSTOMER_BLOCK.substitute(
+            name=escape(str(customer.get('name', 'Unknown'))),
+            confidence=f"{customer.get('confidence', 0):.3f}",
+            source=escape(str(customer.get('source', 'Unknown'))),
+            context=escape(str(customer.get('context', 'No context available'))[:200])
+        )
+
+    def iter_report(self, data):
+        """Yield the HTML report in chunks"""
+        customers = data.get('customers', [])
+
+        # Lists and frames know their size up front; for iterators the
+        # total is only known at the end, so it goes in the footer
+        total = len(customers) if hasattr(customers, '__len__') else None
+        total_line = TOTAL_LINE.substitute(total=total) if total is not None else ""
+
+        yield REPORT_HEADER.substitute(
+            company_title=escape(str(data.get('companyName', 'Unknown'))),
+            company_name=escape(str(data.get('companyName', 'Unknown Company'))),
+            timestamp=escape(str(data.get('timestamp', 'Unknown'))),
+            total_line=total_line
+        )
+
+        count = 0
+        chunk = []
+        for customer in self.iter_customers(customers):
+            chunk.append(self.render_customer(customer))
+            count += 1
+            if len(chunk) >= CUSTOMERS_PER_CHUNK:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+
+        yield REPORT_FOOTER.substitute(
+            total_line=TOTAL_LINE.substitute(total=count) if total is None else ""
+        )
+
+    def write_report(self, data, f):
+        """Stream the HTML report into a writable text file object"""
+        with timer("report_render"):
+            for chunk in self.iter_report(data):
+                f.write(chunk)
+
+    def generate_report(self, data):
+        """Generate HTML report"""
+        with timer("report_render"):
+            return "".join(self.iter_report(data))
@@ -0,0 +1,182 @@
+from config import Config
+from pathlib import Path
+from utils.metrics import CACHE_LOOKUPS
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+# Run input fields that affect discovery output, with the actor's defaults
+CACHE_KEY_FIELDS = {
+    "companyName": None,
+    "companyWebsite": None,
+    "maxResults": 50,
+    "searchDepth": 3,
+}
+
+def normalize_input(input_data):
+    """Reduce a run input to the fields that matter, in canonical form"""
+    normalized = {}
+    for field, default in CACHE_KEY_FIELDS.items():
+        value = input_data.get(field)
+        if value in (None, ""):
+            value = default
+
+        if field == "companyName" and value:
+            value = " ".join(str(value).lower().split())
+        elif field == "companyWebsite" and value:
+            value = str(value).strip().lower()
+            for prefix in ("https://", "http://", "www."):
+                if value.startswith(prefix):
+                    value = value[len(prefix):]
+            value = value.rstrip("/")
+        elif value is not None:
+            value = int(value)
+
+        normalized[field] = value
+
+    # A delta run's output depends on what the last crawl saw, so the
+    # validators it sends are part of the key. Full runs leave the key
+    # as it was, so existing cache entries and batch checkpoints still match.
+    previous_pages = input_data.get("previousPages")
+    if previous_pages:
+        payload = json.dumps(previous_pages, sort_keys=True, separators=(",", ":"))
+        normalized["previousPages"] = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # The local crawler and the actor find different customers for the same
+    # input. Apify runs keep their old keys so existing entries still match.
+    if Config.DISCOVERY_BACKEND != "apify":
+        normalized["backend"] = Config.DISCOVERY_BACKEND
+    return normalized
+
+def cache_key(actor_id, input_data):
+    """Content-addressed key for an actor run"""
+    payload = json.dumps(
+        {"actor": actor_id, "input": normalize_input(input_data)},
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResultCache:
+    def __init__(self, path=None, max_entries=None, ttls=None, default_ttl=None):
+        self.path = path or Config.CACHE_PATH
+        self.max_entries = max_entries or Config.CACHE_MAX_ENTRIES
+        self.ttls = ttls if ttls is not None else Config.CACHE_TTLS
+        self.default_ttl = default_ttl or Config.CACHE_DEFAULT_TTL
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                actor_id TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_last_access ON results (last_access)")
+        self._conn.commit()
+
+    def ttl_for(self, actor_id):
+        """Seconds a result from this actor stays fresh"""
+        return self.ttls.get(actor_id, self.default_ttl)
+
+    def get(self, actor_id, input_data):
+        """Return the cached result for a run input, or None"""
+        key = cache_key(actor_id, input_data)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                CACHE_LOOKUPS.inc(result="miss")
+                return None
+
+            self._conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            CACHE_LOOKUPS.inc(result="hit")
+            return json.loads(row[0])
+
+    def set(self, actor_id, input_data, value):
+        """Store a run result and evict the least recently used overflow"""
+        key = cache_key(actor_id, input_data)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, actor_id, value, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, actor_id, json.dumps(value), now + self.ttl_for(actor_id), now)
+            )
+            self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM results WHERE key IN ("
+                "SELECT key FROM results ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Drop every cached result"""
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0,
+            "entries": entries
+        }
+
+class CachedApifyClient:
+    def __init__(self, apify_client, cache=None):
+        self.apify_client = apify_client
+        self.cache = cache or ResultCache()
+
+    def __getattr__(self, name):
+        # Everything not cached goes straight to the wrapped client
+        return getattr(self.apify_client, name)
+
+    async def run_customer_discovery_async(self, input_data):
+        """Run customer discovery, reusing a fresh cached result when there is one"""
+        actor_id = Config.CUSTOMER_DISCOVERY_ACTOR
+        result = self.cache.get(actor_id, input_data)
+        if result is not None:
+            return result
+
+        result = await self.apify_client.run_customer_discovery_async(input_data)
+        if result is not None and result.get("status") != "ERROR":
+            self.cache.set(actor_id, input_data, result)
+        return result
+
+    def run_customer_discovery(self, input_data):
+        """Run customer discovery, reusing a fresh cached result when there is one"""
+        actor_id = Config.CUSTOMER_DISCOVERY_ACTOR
+        result = self.cache.get(actor_id, input_data)
+        if result is not None:
+            return result
+
+        result = self.apify_client.run_customer_discovery(input_data)
+        if result is not None and result.get("status") != "ERROR":
+            self.cache.set(actor_id, input_data, result)
+        return result
@@ -0,0 +1,217 @@
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from config import Config
+from utils.metrics import timer
+import asyncio
+import math
+import threading
+import time
+
+# Lower runs first; interactive audits overtake queued batch work
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+# Memory assumed for runs we don't size ourselves (the actors' default)
+DEFAULT_RUN_MEMORY_MBYTES = 1024
+
+# maxResults * searchDepth that DEFAULT_TIMEOUT and the default memory fit
+BASELINE_DISCOVERY_WORK = 50 * 3
+MAX_RUN_MEMORY_MBYTES = 8192
+MAX_RUN_TIMEOUT_SECS = 3600
+
+# How often account limits are re-read, and how long to hold off new runs
+# after the platform refuses one without saying for how long
+LIMITS_REFRESH_SECS = 300
+DEFAULT_BACKOFF_SECS = 30
+MAX_LIMIT_RETRIES = 5
+
+# Priority class and tenant of the runs started in the current context
+_scheduling = ContextVar("hero_run_scheduling", default=("interactive", "default"))
+
+class ActorLimitError(Exception):
+    """The Apify account refused a run: concurrency, memory or usage limits"""
+
+    def __init__(self, message, retry_after=None, retryable=True):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+@contextmanager
+def scheduling(priority="interactive", tenant="default"):
+    """Queue the runs started inside the block under a priority class and tenant"""
+    if priority not in PRIORITIES:
+        raise Exception(f"Unknown run priority: {priority}")
+    token = _scheduling.set((priority, tenant or "default"))
+    try:
+        yield
+    finally:
+        _scheduling.reset(token)
+
+def run_options(actor_id, input_data, base_timeout=None):
+    """Memory and timeout for a run, scaled from the size of its input"""
+    base_timeout = base_timeout or Config.DEFAULT_TIMEOUT
+    if actor_id != Config.CUSTOMER_DISCOVERY_ACTOR:
+        return {"memory_mbytes": None, "timeout_secs": base_timeout}
+
+    work = int(input_data.get("maxResults") or 50) * int(input_data.get("searchDepth") or 3)
+    scale = max(1.0, work / BASELINE_DISCOVERY_WORK)
+    # Crawl time grows with the pages visited, memory only with the
+    # growing result set; the platform only accepts powers of two
+    memory = 2 ** math.ceil(math.log2(DEFAULT_RUN_MEMORY_MBYTES * math.sqrt(scale)))
+    return {
+        "memory_mbytes": min(memory, MAX_RUN_MEMORY_MBYTES),
+        "timeout_secs": min(math.ceil(base_timeout * scale), MAX_RUN_TIMEOUT_SECS)
+    }
+
+class RunScheduler:
+    """Admits actor runs within the account's concurrency and memory limits
+
+    Waiting runs are served by priority class, then round-robin across
+    tenants, so one tenant's batch can't starve everyone else's.
+    """
+
+    def __init__(self, max_runs=None, max_memory_mbytes=None):
+        self.max_runs = max_runs or Config.MAX_CONCURRENT_ACTORS
+        self.max_memory_mbytes = max_memory_mbytes or Config.ACCOUNT_MEMORY_MBYTES
+        self.running = 0
+        self.memory_in_use = 0
+        self.paused_until = 0
+        self.exhausted = None
+        self.limits_checked = None
+        self._queues = {priority: OrderedDict() for priority in sorted(PRIORITIES.values())}
+        self._lock = threading.Lock()
+
+    def _fits(self, memory_mbytes):
+        if self.running >= self.max_runs:
+            return False
+        # A run bigger than the whole budget still goes once nothing else runs
+        return self.running == 0 or self.memory_in_use + memory_mbytes <= self.max_memory_mbytes
+
+    def _next_waiter(self):
+        """The waiter due next: best priority, then the tenant longest without a turn"""
+        for tenants in self._queues.values():
+            while tenants:
+                tenant, waiters = next(iter(tenants.items()))
+                while waiters and waiters[0][1].cancelled():
+                    waiters.popleft()
+                if waiters:
+                    return tenants, tenant, waiters
+                del tenants[tenant]
+        return None
+
+    def _dispatch(self):
+        # Called with the lock held
+        while time.monotonic() >= self.paused_until:
+            found = self._next_waiter()
+            if found is None:
+                return
+            tenants, tenant, waiters = found
+            memory_mbytes, future = waiters[0]
+            # Strict order: a large run at the head waits for room rather
+            # than being overtaken indefinitely by small ones
+            if not self._fits(memory_mbytes):
+                return
+            waiters.popleft()
+            # Claims the waiter so it can no longer be cancelled; one that
+            # gave up since _next_waiter() looked is skipped
+            if not future.set_running_or_notify_cancel():
+                continue
+            tenants.move_to_end(tenant)
+            self.running += 1
+            self.memory_in_use += memory_mbytes
+            future.set_result(memory_mbytes)
+
+    async def acquire_async(self, memory_mbytes):
+        """Wait for room to start a run"""
+        if self.exhausted:
+            raise ActorLimitError(self.exhausted, retryable=False)
+
+        priority, tenant = _scheduling.get()
+        future = Future()
+        with self._lock:
+            self._queues[PRIORITIES[priority]].setdefault(tenant, deque()).append((memory_mbytes, future))
+            self._dispatch()
+
+        try:
+            with timer("scheduler_wait"):
+                await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Grants happen under the lock, so holding it settles whether the
+            # slot was granted just as the caller gave up; if so, hand it back
+            with self._lock:
+                granted = not future.cancel()
+            if granted:
+                self.release(memory_mbytes)
+            raise
+
+    def release(self, memory_mbytes):
+        """Return a finished run's slot and memory"""
+        with self._lock:
+            self.running -= 1
+            self.memory_in_use -= memory_mbytes
+            self._dispatch()
+
+    def backoff(self, seconds):
+        """Start no new runs for a while, e.g. after a 429"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        timer_thread = threading.Timer(seconds, self._resume)
+        timer_thread.daemon = True
+        timer_thread.start()
+
+    def _resume(self):
+        with self._lock:
+            self._dispatch()
+
+    def limits_stale(self):
+        return self.limits_checked is None or time.monotonic() - self.limits_checked > LIMITS_REFRESH_SECS
+
+    def update_limits(self, account):
+        """Apply the account's limits, minus what runs outside this process use"""
+        with self._lock:
+            self.limits_checked = time.monotonic()
+            if not account:
+                return
+            limits = account.get("limits") or {}
+            current = account.get("current") or {}
+
+            if limits.get("maxConcurrentActorJobs"):
+                external = max(0, (current.get("activeActorJobCount") or 0) - self.running)
+                self.max_runs = max(1, limits["maxConcurrentActorJobs"] - external)
+            if limits.get("maxActorMemoryGbytes"):
+                used = (current.get("actorMemoryGbytes") or 0) * 1024
+                external = max(0, used - self.memory_in_use)
+                self.max_memory_mbytes = max(DEFAULT_RUN_MEMORY_MBYTES, limits["maxActorMemoryGbytes"] * 1024 - external)
+
+            max_units = limits.get("maxMonthlyActorComputeUnits")
+            if max_units and (current.get("monthlyActorComputeUnits") or 0) >= max_units:
+                self.exhausted = "Monthly Apify compute units are used up"
+            else:
+                self.exhausted = None
+            self._dispatch()
+
+    async def run_async(self, memory_mbytes, function):
+        """Await function() once the account has room for a run of this size"""
+        memory_mbytes = memory_mbytes or DEFAULT_RUN_MEMORY_MBYTES
+        for attempt in range(MAX_LIMIT_RETRIES + 1):
+            await self.acquire_async(memory_mbytes)
+            try:
+                return await function()
+            except ActorLimitError as e:
+                if not e.retryable or attempt == MAX_LIMIT_RETRIES:
+                    raise
+                self.backoff(e.retry_after or DEFAULT_BACKOFF_SECS)
+            finally:
+                self.release(memory_mbytes)
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+def get_scheduler(token):
+    """The process-wide scheduler of the Apify account behind a token"""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(token)
+        if scheduler is None:
+            scheduler = _schedulers[token] = RunScheduler()
+        return scheduler
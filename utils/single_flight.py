@@ -0,0 +1,262 @@
+from concurrent.futures import Future
+from config import Config
+from pathlib import Path
+from utils.http_session import HTTP_SESSIONS
+from utils.metrics import COALESCED_RUNS
+from utils.result_cache import cache_key
+from utils.run_scheduler import ActorLimitError
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+# Seconds between checks on a run another process holds the lease for
+LEASE_POLL_SECS = 1
+
+# A lease its holder stopped renewing for this long is presumed dead and
+# the run is taken over
+LEASE_TTL_SECS = 60
+
+# How often the holder renews its lease while the run (including any wait
+# for a scheduler slot) goes on
+LEASE_RENEW_SECS = 20
+
+# Finished runs stay readable this long, so callers that were still
+# polling when the run ended pick up its result. Failures are only handed
+# to those callers; a caller arriving later runs the actor again.
+RESULT_RETENTION_SECS = 60
+
+class LeaderCancelled(Exception):
+    """The caller running a shared call gave up before it finished"""
+
+def dump_error(error):
+    """An exception as lease-file text, keeping what ActorLimitError carries"""
+    if isinstance(error, ActorLimitError):
+        return json.dumps({"message": str(error), "limit": True, "retryAfter": error.retry_after,
+                           "retryable": error.retryable})
+    return json.dumps({"message": str(error)})
+
+def load_error(text):
+    """The exception dump_error() stored"""
+    error = json.loads(text)
+    if error.get("limit"):
+        return ActorLimitError(error["message"], retry_after=error.get("retryAfter"), retryable=error.get("retryable", True))
+    return Exception(error["message"])
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key
+
+    Works across threads and event loops of one process: followers wait on
+    the leader's concurrent.futures.Future.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key):
+        """Return the call's future and whether this caller has to run it"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _finish(self, key, future):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def in_flight(self):
+        """Keys with a call currently running"""
+        with self._lock:
+            return list(self._calls)
+
+    async def do_async(self, key, function):
+        """Await function(), or the identical call already in flight"""
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                COALESCED_RUNS.inc(scope="process")
+                try:
+                    # Shielded so a follower giving up doesn't cancel the call for everyone
+                    return await asyncio.shield(asyncio.wrap_future(future))
+                except LeaderCancelled:
+                    continue
+
+            try:
+                result = await function()
+            except asyncio.CancelledError:
+                # Followers retry; one of them becomes the new leader
+                self._finish(key, future)
+                future.set_exception(LeaderCancelled(key))
+                raise
+            except Exception as e:
+                self._finish(key, future)
+                future.set_exception(e)
+                raise
+            self._finish(key, future)
+            future.set_result(result)
+            return result
+
+class RunLease:
+    """Cross-process single flight through a lease row in a shared SQLite file
+
+    The process holding a key's lease runs the call and stores its outcome;
+    other processes poll until it is there.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or Config.LEASE_PATH
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS run_leases (
+                key TEXT PRIMARY KEY,
+                token TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                result TEXT,
+                error TEXT,
+                finished_at REAL
+            )
+        """)
+        self._conn.commit()
+
+    def acquire(self, key, ttl):
+        """Take the lease on a key; returns a token, or None if someone else holds it"""
+        token = uuid.uuid4().hex
+        now = time.time()
+
+        with self._lock, self._conn:
+            # A single upsert is atomic across processes: the row is only
+            # taken over when its holder has expired, its run failed or its
+            # outcome is stale
+            self._conn.execute(
+                "INSERT INTO run_leases (key, token, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET token = excluded.token, expires_at = excluded.expires_at, "
+                "result = NULL, error = NULL, finished_at = NULL "
+                "WHERE (finished_at IS NULL AND expires_at <= ?) OR error IS NOT NULL OR finished_at <= ?",
+                (key, token, now + ttl, now, now - RESULT_RETENTION_SECS)
+            )
+            row = self._conn.execute("SELECT token FROM run_leases WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "DELETE FROM run_leases WHERE finished_at <= ?", (now - RESULT_RETENTION_SECS,)
+            )
+        return token if row and row[0] == token else None
+
+    def complete(self, key, token, result=None, error=None):
+        """Publish the outcome of a leased call to the processes waiting on it
+
+        error is the exception the call raised (or its message).
+        """
+        if isinstance(error, str):
+            error = Exception(error)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE run_leases SET result = ?, error = ?, finished_at = ? WHERE key = ? AND token = ?",
+                (None if error else json.dumps(result), dump_error(error) if error else None, time.time(), key, token)
+            )
+
+    def renew(self, key, token, ttl):
+        """Extend a lease still held; returns False once it has been lost"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE run_leases SET expires_at = ? WHERE key = ? AND token = ? AND finished_at IS NULL",
+                (time.time() + ttl, key, token)
+            )
+        return cursor.rowcount > 0
+
+    def release(self, key, token):
+        """Give the lease up without an outcome so a waiting process takes over"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM run_leases WHERE key = ? AND token = ?", (key, token))
+
+    def poll(self, key):
+        """("done", result), ("running", None) or (None, None) when nobody holds the key"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, result, error, finished_at FROM run_leases WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None, None
+        expires_at, result, error, finished_at = row
+        if finished_at is not None:
+            if error:
+                raise load_error(error)
+            return "done", json.loads(result)
+        if expires_at <= time.time():
+            return None, None
+        return "running", None
+
+class CoalescingApifyClient:
+    def __init__(self, apify_client, single_flight=None, lease=None):
+        self.apify_client = apify_client
+        self.single_flight = single_flight or SINGLE_FLIGHT
+        self.lease = lease
+
+    def __getattr__(self, name):
+        # Everything not coalesced goes straight to the wrapped client
+        return getattr(self.apify_client, name)
+
+    async def _renew_lease(self, key, token):
+        while await asyncio.to_thread(self.lease.renew, key, token, LEASE_TTL_SECS):
+            await asyncio.sleep(LEASE_RENEW_SECS)
+
+    async def _run_leased_async(self, key, input_data):
+        """Run discovery once across processes sharing the lease file
+
+        Lease calls go through worker threads: SQLite waits out a locked file
+        for up to 30s, which would stall every audit on the shared loop.
+        """
+        while True:
+            token = await asyncio.to_thread(self.lease.acquire, key, LEASE_TTL_SECS)
+            if token is not None:
+                # Runs can queue for a slot and then take up to an hour, so
+                # the lease is kept alive for as long as this holder is
+                renewing = asyncio.ensure_future(self._renew_lease(key, token))
+                try:
+                    result = await self.apify_client.run_customer_discovery_async(input_data)
+                except asyncio.CancelledError:
+                    await asyncio.to_thread(self.lease.release, key, token)
+                    raise
+                except Exception as e:
+                    await asyncio.to_thread(self.lease.complete, key, token, error=e)
+                    raise
+                finally:
+                    renewing.cancel()
+                await asyncio.to_thread(self.lease.complete, key, token, result=result)
+                return result
+
+            COALESCED_RUNS.inc(scope="lease")
+            while True:
+                state, result = await asyncio.to_thread(self.lease.poll, key)
+                if state == "done":
+                    return result
+                if state is None:
+                    # The holder died or gave up; race for the lease again
+                    break
+                await asyncio.sleep(LEASE_POLL_SECS)
+
+    async def run_customer_discovery_async(self, input_data):
+        """Run customer discovery, sharing the run of any identical call in flight"""
+        key = cache_key(Config.CUSTOMER_DISCOVERY_ACTOR, input_data)
+        if self.lease is None:
+            return await self.single_flight.do_async(
+                key, lambda: self.apify_client.run_customer_discovery_async(input_data)
+            )
+        return await self.single_flight.do_async(key, lambda: self._run_leased_async(key, input_data))
+
+    def run_customer_discovery(self, input_data):
+        """Run customer discovery, sharing the run of any identical call in flight"""
+        return HTTP_SESSIONS.run(self.run_customer_discovery_async(input_data))
+
+# One per process, so every session and thread coalesces with every other
+SINGLE_FLIGHT = SingleFlight()